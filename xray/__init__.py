@@ -1,6 +1,11 @@
 from .core.alignment import align, concat
 from .core.variable import Variable, Coordinate
-from .core.dataset import Dataset, open_dataset
+from .core.dataset import Dataset, open_dataset, save_mfdataset
+from .core.catalog import build_catalog, open_catalog
+from .core.serialization import (pack_dataset, unpack_dataset,
+                                 publish_dataset, attach_dataset)
 from .core.dataarray import DataArray
+from .core.expression import evaluate
+from .core.options import set_options
 
 from .version import version as __version__
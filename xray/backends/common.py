@@ -1,7 +1,7 @@
 import numpy as np
 
 from ..core.utils import FrozenOrderedDict
-from ..core.pycompat import iteritems
+from ..core.pycompat import iteritems, basestring
 
 
 NONE_VAR_NAME = '__values__'
@@ -33,6 +33,62 @@ class AbstractDataStore(object):
                                   self.open_store_variable(v))
                                  for k, v in iteritems(self.store_variables))
 
+    def load_variables(self, names=None, drop_variables=None):
+        """Open only some of the variables in this store.
+
+        Variables that are not needed are skipped entirely, so none of their
+        metadata (e.g., attributes or chunking) is read.
+
+        Parameters
+        ----------
+        names : sequence of str, optional
+            Names of variables to open. The variables used as their
+            coordinates (index variables along their dimensions and variables
+            listed in their 'coordinates' attribute) are also opened.
+        drop_variables : sequence of str, optional
+            Names of variables to skip.
+
+        Returns
+        -------
+        variables : FrozenOrderedDict
+            Opened variables, in the order in which they are stored.
+        """
+        store_variables = self.store_variables
+        all_names = [_decode_variable_name(k) for k in store_variables]
+        opened = {}
+
+        def open_variable(name):
+            if name not in opened:
+                key = _encode_variable_name(name)
+                opened[name] = self.open_store_variable(store_variables[key])
+            return opened[name]
+
+        if names is None:
+            needed = set(all_names)
+        else:
+            missing = [k for k in names if k not in all_names]
+            if missing:
+                raise ValueError('variables not found in this store: %r'
+                                 % missing)
+            needed = set()
+            pending = list(names)
+            while pending:
+                name = pending.pop()
+                if name in needed:
+                    continue
+                needed.add(name)
+                var = open_variable(name)
+                coords = var.attrs.get('coordinates', '')
+                if not isinstance(coords, basestring):
+                    coords = ''
+                pending.extend(k for k in list(var.dims) + coords.split()
+                               if k in all_names and k not in needed)
+        if drop_variables is not None:
+            needed.difference_update(drop_variables)
+
+        return FrozenOrderedDict((k, open_variable(k)) for k in all_names
+                                 if k in needed)
+
     def sync(self):
         pass
 
@@ -1,3 +1,4 @@
+import itertools
 import warnings
 
 import numpy as np
@@ -8,13 +9,47 @@ from ..core import indexing
 from ..core.utils import FrozenOrderedDict, NDArrayMixin
 from ..core.pycompat import iteritems, basestring, OrderedDict
 
-from .common import AbstractWritableDataStore
+from .common import AbstractWritableDataStore, _encode_variable_name
 from .netcdf3 import encode_nc3_variable, maybe_convert_to_char_array
 
 
+def _is_direct_key(key):
+    """Whether an indexer along one axis selects a contiguous block"""
+    return isinstance(key, (int, np.integer)) or (isinstance(key, slice)
+                                                  and key.step in [None, 1])
+
+
+def _chunk_aligned_reads(key, size, chunksize):
+    """Plan the reads along one axis for an orthogonal indexer into a chunked
+    netCDF4 variable.
+
+    Returns a list of (read, local, out) tuples, one for each chunk holding
+    selected values: `read` is the slice of the axis covered by the chunk,
+    `local` the positions of the selected values in the values read (or None
+    if all of them are selected, in order) and `out` the positions of these
+    values in the result. Each chunk is only read (and decompressed) once.
+    """
+    positions = np.arange(size)[key]
+    if not positions.size:
+        return []
+    chunks = positions // chunksize
+    order = np.argsort(chunks, kind='mergesort')
+    breaks = (np.diff(chunks[order]) != 0).nonzero()[0] + 1
+    reads = []
+    for out in np.split(order, breaks):
+        start = chunks[out[0]] * chunksize
+        read = slice(start, min(start + chunksize, size))
+        local = positions[out] - start
+        if np.array_equal(local, np.arange(read.stop - start)):
+            local = None
+        reads.append((read, local, out))
+    return reads
+
+
 class NetCDF4ArrayWrapper(NDArrayMixin):
-    def __init__(self, array):
+    def __init__(self, array, chunksizes=None):
         self.array = array
+        self.chunksizes = chunksizes
 
     @property
     def dtype(self):
@@ -26,12 +61,43 @@ class NetCDF4ArrayWrapper(NDArrayMixin):
             dtype = np.dtype('O')
         return dtype
 
+    def _chunked_getitem(self, key):
+        if all(_is_direct_key(k) for k in key):
+            return self.array[key]
+
+        # read one chunk at a time and copy the selected values from it into
+        # the result, so at most one chunk is held in memory besides the
+        # result
+        axis_reads = []
+        shape = []
+        for k, size, chunksize in zip(key, self.array.shape, self.chunksizes):
+            if isinstance(k, (int, np.integer)):
+                axis_reads.append([(k, None, None)])
+            else:
+                reads = _chunk_aligned_reads(k, size, chunksize)
+                axis_reads.append(reads)
+                shape.append(sum(out.size for _, _, out in reads))
+        data = np.empty(shape, dtype=self.dtype)
+        for block in itertools.product(*axis_reads):
+            values = self.array[tuple(read for read, _, _ in block)]
+            outs = [out for _, _, out in block if out is not None]
+            axis = 0
+            for _, local, out in block:
+                if out is not None:
+                    if local is not None:
+                        values = values.take(local, axis=axis)
+                    axis += 1
+            data[np.ix_(*outs)] = values
+        return data
+
     def __getitem__(self, key):
         if self.ndim == 0:
             # work around for netCDF4-python's broken handling of 0-d
             # arrays (slicing them always returns a 1-dimensional array):
             # https://github.com/Unidata/netcdf4-python/pull/220
             data = np.asscalar(self.array[key])
+        elif self.chunksizes is not None and self.array.dtype is not str:
+            data = self._chunked_getitem(key)
         else:
             data = self.array[key]
         return data
@@ -73,6 +139,68 @@ def _nc4_group(ds, group):
         return ds
 
 
+_CHUNKING_PRESETS = ['timeseries', 'spatial', 'balanced']
+
+_ENCODING_KEYS = set(['zlib', 'complevel', 'shuffle', 'fletcher32',
+                      'contiguous', 'chunksizes', 'endian',
+                      'least_significant_digit'])
+
+
+def _balanced_chunks(shape, n_elements):
+    """Chunk sizes with about `n_elements` values in total, split as evenly as
+    possible between the axes of `shape`
+    """
+    chunks = [None] * len(shape)
+    # fill the shortest axes first, so their leftover goes to the other axes
+    order = sorted(range(len(shape)), key=lambda n: shape[n])
+    for count, axis in enumerate(order):
+        remaining_axes = len(shape) - count
+        size = int(round(n_elements ** (1.0 / remaining_axes)))
+        chunks[axis] = max(1, min(shape[axis], size))
+        n_elements = max(1, n_elements // chunks[axis])
+    return chunks
+
+
+def chunk_shape(shape, itemsize, chunking='balanced', target_bytes=2 ** 20):
+    """Calculate the chunk sizes of a netCDF4 variable for an access pattern.
+
+    Dimensions are assumed to be in the CF order (time, level, y, x): the
+    first axis is time and the last two axes are horizontal.
+
+    Parameters
+    ----------
+    shape : tuple of int
+        Shape of the variable.
+    itemsize : int
+        Number of bytes used by each value.
+    chunking : {'timeseries', 'spatial', 'balanced'}, optional
+        'timeseries' chunks hold as much of the first axis as possible (for
+        reading long time series at a few locations), 'spatial' chunks hold
+        as much of the last two axes as possible (for reading maps at a few
+        times) and 'balanced' chunks are about equally long along every axis.
+    target_bytes : int, optional
+        Approximate size of each chunk in bytes.
+
+    Returns
+    -------
+    chunks : tuple of int
+    """
+    if chunking not in _CHUNKING_PRESETS:
+        raise ValueError('chunking must be one of %r' % _CHUNKING_PRESETS)
+    shape = [max(1, int(s)) for s in shape]
+    n_elements = max(1, int(target_bytes) // itemsize)
+    if chunking == 'timeseries' and len(shape) > 1:
+        first = min(shape[0], n_elements)
+        chunks = [first] + _balanced_chunks(shape[1:], n_elements // first)
+    elif chunking == 'spatial' and len(shape) > 2:
+        last = _balanced_chunks(shape[-2:], n_elements)
+        chunks = _balanced_chunks(shape[:-2],
+                                  n_elements // (last[0] * last[1])) + last
+    else:
+        chunks = _balanced_chunks(shape, n_elements)
+    return tuple(chunks)
+
+
 def _ensure_fill_value_valid(data, attributes):
     # work around for netCDF4/scipy issue where _FillValue has the wrong type:
     # https://github.com/Unidata/netcdf4-python/issues/271
@@ -84,24 +212,45 @@ class NetCDF4DataStore(AbstractWritableDataStore):
     """Store for reading and writing data via the Python-NetCDF4 library.
 
     This store supports NetCDF3, NetCDF4 and OpenDAP datasets.
+
+    When writing NetCDF4 files, `chunking` selects a preset (see
+    `chunk_shape`) for the chunk sizes of all variables with at least one
+    dimension, and `encoding` maps variable names to netCDF4 specific encoding
+    options (e.g., `zlib`, `complevel`, `shuffle` or `chunksizes`) that
+    take precedence over those of the variables and the chunking preset.
+    Dimensions listed in `unlimited_dims` are created as unlimited
+    dimensions, so they can be extended later with `append`.
     """
     def __init__(self, filename, mode='r', clobber=True, diskless=False,
-                 persist=False, format='NETCDF4', group=None):
+                 persist=False, format='NETCDF4', group=None, chunking=None,
+                 target_chunk_bytes=2 ** 20, encoding=None,
+                 unlimited_dims=None):
         import netCDF4 as nc4
+        if chunking is not None and chunking not in _CHUNKING_PRESETS:
+            raise ValueError('chunking must be one of %r' % _CHUNKING_PRESETS)
+        encoding = {} if encoding is None else encoding
+        for name, options in iteritems(encoding):
+            invalid = set(options) - _ENCODING_KEYS
+            if invalid:
+                raise ValueError('invalid encoding options for variable %r: '
+                                 '%s' % (name, ', '.join(sorted(invalid))))
         ds = nc4.Dataset(filename, mode=mode, clobber=clobber,
                          diskless=diskless, persist=persist,
                          format=format)
         self.ds = _nc4_group(ds, group)
-        self.format = format
+        # the format of an existing file is not necessarily `format`
+        self.format = format if mode == 'w' else ds.data_model
+        self.chunking = chunking
+        self.target_chunk_bytes = target_chunk_bytes
+        self.encoding = encoding
+        self.unlimited_dims = set(unlimited_dims or [])
         self._filename = filename
 
     def open_store_variable(self, var):
         var.set_auto_maskandscale(False)
         dimensions = var.dimensions
-        data = indexing.LazilyIndexedArray(NetCDF4ArrayWrapper(var))
         attributes = OrderedDict((k, var.getncattr(k))
                                  for k in var.ncattrs())
-        _ensure_fill_value_valid(data, attributes)
         # netCDF4 specific encoding; save _FillValue for later
         encoding = {}
         filters = var.filters()
@@ -115,6 +264,9 @@ class NetCDF4DataStore(AbstractWritableDataStore):
             else:
                 encoding['contiguous'] = False
                 encoding['chunksizes'] = tuple(chunking)
+        data = indexing.LazilyIndexedArray(
+            NetCDF4ArrayWrapper(var, encoding.get('chunksizes')))
+        _ensure_fill_value_valid(data, attributes)
         # TODO: figure out how to round-trip "endian-ness" without raising
         # warnings from netCDF4
         # encoding['endian'] = var.endian()
@@ -135,6 +287,8 @@ class NetCDF4DataStore(AbstractWritableDataStore):
                                  for k, v in iteritems(self.ds.dimensions))
 
     def set_dimension(self, name, length):
+        if name in self.unlimited_dims:
+            length = None
         self.ds.createDimension(name, size=length)
 
     def set_attribute(self, key, value):
@@ -156,7 +310,14 @@ class NetCDF4DataStore(AbstractWritableDataStore):
             # doesn't like setting fill_value to an empty string
             fill_value = None
 
-        encoding = variable.encoding
+        encoding = dict(variable.encoding)
+        if (self.chunking is not None and variable.size > 0
+                and variable.ndim > 0 and self.format.startswith('NETCDF4')):
+            encoding['contiguous'] = False
+            encoding['chunksizes'] = chunk_shape(
+                variable.shape, variable.dtype.itemsize, self.chunking,
+                self.target_chunk_bytes)
+        encoding.update(self.encoding.get(name, {}))
         nc4_var = self.ds.createVariable(
             varname=name,
             datatype=datatype,
@@ -177,6 +338,93 @@ class NetCDF4DataStore(AbstractWritableDataStore):
             # OrderedDict as the input to setncatts
             nc4_var.setncattr(k, v)
 
+    def _set_variable_region(self, name, variable, region):
+        nc4_var = self.ds.variables[name]
+        # encode the new values like the values already in the file (e.g.,
+        # with the same time units)
+        encoding = dict(variable.encoding)
+        for k in ['units', 'calendar', 'scale_factor', 'add_offset',
+                  '_FillValue']:
+            if k in nc4_var.ncattrs():
+                encoding[k] = nc4_var.getncattr(k)
+        if nc4_var.dtype is not str:
+            encoding['dtype'] = nc4_var.dtype
+        variable = encode_cf_variable(
+            Variable(variable.dims, variable.values, encoding=encoding))
+        if self.format == 'NETCDF4':
+            variable, _ = _nc4_values_and_dtype(variable)
+        else:
+            variable = encode_nc3_variable(variable)
+        if variable.dims != nc4_var.dimensions:
+            raise ValueError('dimensions %r of variable %r do not match the '
+                             'dimensions %r in the file'
+                             % (variable.dims, name, nc4_var.dimensions))
+        key = tuple(region.get(dim, slice(None)) for dim in variable.dims)
+        nc4_var.set_auto_maskandscale(False)
+        nc4_var[key] = variable.values
+
+    def _set_variables_region(self, variables, region):
+        for name, var in iteritems(variables):
+            name = _encode_variable_name(name)
+            if any(dim in region for dim in var.dims):
+                if name not in self.ds.variables:
+                    raise ValueError('variable %r not found in the file'
+                                     % name)
+                self._set_variable_region(name, var, region)
+            elif name not in self.ds.variables:
+                self.set_variable(name, var)
+
+    def set_region(self, variables, region):
+        """Write variables into part of the existing variables in the file.
+
+        Parameters
+        ----------
+        variables : dict-like
+            Variables to write. Variables without any of the dimensions in
+            `region` are only written if they are not yet in the file.
+        region : dict
+            Mapping from dimension names to slices with the positions along
+            these dimensions to overwrite.
+        """
+        for dim, key in iteritems(region):
+            if dim not in self.ds.dimensions:
+                raise ValueError('dimension %r not found in the file' % dim)
+            if not isinstance(key, slice) or key.step not in [None, 1]:
+                raise ValueError('region must map dimension names to '
+                                 'slices with a step of 1')
+            size = len(range(*key.indices(len(self.ds.dimensions[dim]))))
+            for name, var in iteritems(variables):
+                if dim in var.dims and var.shape[var.get_axis_num(dim)] != size:
+                    raise ValueError('variable %r has length %s along '
+                                     'dimension %r, but the region has '
+                                     'length %s' % (name, var.shape[
+                                         var.get_axis_num(dim)], dim, size))
+        self._set_variables_region(variables, region)
+
+    def append(self, variables, dim):
+        """Append variables along an unlimited dimension of the file.
+
+        Only the new records are written. Variables without `dim` are only
+        written if they are not yet in the file.
+        """
+        if dim not in self.ds.dimensions:
+            raise ValueError('dimension %r not found in the file' % dim)
+        if not self.ds.dimensions[dim].isunlimited():
+            raise ValueError('dimension %r is not unlimited, so it cannot be '
+                             'appended to' % dim)
+        lengths = set(var.shape[var.get_axis_num(dim)]
+                      for var in variables.values() if dim in var.dims)
+        if not lengths:
+            raise ValueError('no variables found with dimension %r' % dim)
+        if len(lengths) > 1:
+            raise ValueError('variables to append have different lengths '
+                             'along dimension %r: %s'
+                             % (dim, sorted(lengths)))
+        length, = lengths
+        start = len(self.ds.dimensions[dim])
+        region = {dim: slice(start, start + length)}
+        self._set_variables_region(variables, region)
+
     def del_attribute(self, key):
         self.ds.delncattr(key)
 
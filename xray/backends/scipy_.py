@@ -43,8 +43,8 @@ class ScipyDataStore(AbstractWritableDataStore):
 
         import scipy.io
         # if filename is a NetCDF3 bytestring we store it in a StringIO
-        if (isinstance(filename_or_obj, basestring)
-                and filename_or_obj.startswith('CDF')):
+        if (isinstance(filename_or_obj, bytes)
+                and filename_or_obj.startswith(b'CDF')):
             # TODO: this check has the unfortunate side-effect that
             # paths to files cannot start with 'CDF'.
             filename_or_obj = BytesIO(filename_or_obj)
@@ -68,6 +68,23 @@ def align(*objects, **kwargs):
     return tuple(obj.reindex(copy=copy, **joined_indexes) for obj in objects)
 
 
+def get_fill_value_and_dtype(dtype):
+    """Return a missing value and a data type able to hold it for arrays of
+    the given dtype that need to be filled in with missing values.
+    """
+    # N.B. these casting rules should match pandas
+    if np.issubdtype(dtype, np.datetime64):
+        fill_value = np.datetime64('NaT')
+    elif any(np.issubdtype(dtype, t) for t in (int, float)):
+        # convert to floating point so NaN is valid
+        dtype = float
+        fill_value = np.nan
+    else:
+        dtype = object
+        fill_value = np.nan
+    return fill_value, dtype
+
+
 def reindex_variables(variables, indexes, indexers, copy=True):
     """Conform a dictionary of variables onto a new set of coordinates, filling
     in missing values with NaN.
@@ -128,19 +145,6 @@ def reindex_variables(variables, indexes, indexers, copy=True):
     def var_indexers(var, indexers):
         return tuple(indexers.get(d, slice(None)) for d in var.dims)
 
-    def get_fill_value_and_dtype(dtype):
-        # N.B. these casting rules should match pandas
-        if np.issubdtype(dtype, np.datetime64):
-            fill_value = np.datetime64('NaT')
-        elif any(np.issubdtype(dtype, t) for t in (int, float)):
-            # convert to floating point so NaN is valid
-            dtype = float
-            fill_value = np.nan
-        else:
-            dtype = object
-            fill_value = np.nan
-        return fill_value, dtype
-
     # create variables for the new dataset
     reindexed = OrderedDict()
     for name, var in iteritems(variables):
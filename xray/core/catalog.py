@@ -0,0 +1,264 @@
+"""Catalogs of the metadata of collections of netCDF files
+"""
+import functools
+import glob
+import os.path
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+import numpy as np
+import pandas as pd
+
+from .. import conventions
+from .alignment import concat
+from .dataset import open_dataset, _open_store
+from .pycompat import basestring, iteritems, OrderedDict
+from .utils import worker_pool
+
+
+class FileSummary(object):
+    """Dimensions, coordinates, variable schemas and attributes of one file
+    in a Catalog.
+
+    Attributes
+    ----------
+    path : str
+        Path to the file.
+    mtime : float
+        Modification time of the file when it was scanned.
+    dims : OrderedDict
+        Mapping from dimension names to lengths.
+    coords : OrderedDict
+        Mapping from dimension names to a pandas.Index with the values of the
+        index variable along that dimension (if the file contains one).
+    variables : OrderedDict
+        Mapping from variable names to `(dims, dtype)` tuples.
+    attrs : OrderedDict
+        Global attributes of the file.
+    """
+    def __init__(self, path, mtime, dims, coords, variables, attrs):
+        self.path = path
+        self.mtime = mtime
+        self.dims = dims
+        self.coords = coords
+        self.variables = variables
+        self.attrs = attrs
+
+    def __repr__(self):
+        dims = ', '.join('%s: %s' % (k, v) for k, v in iteritems(self.dims))
+        return '<%s %r (%s)>' % (type(self).__name__, self.path, dims)
+
+
+def scan_file(path, decode_times=True):
+    """Read the metadata of a netCDF file into a FileSummary.
+
+    Only the values of index variables (1-dimensional variables with the same
+    name as their dimension) are read from the file.
+    """
+    mtime = os.path.getmtime(path)
+    store = _open_store(path)
+    try:
+        variables = conventions.decode_cf_variables(
+            store.variables, decode_times=decode_times)
+        dims = OrderedDict((k, v) for k, v in iteritems(store.dimensions))
+        coords = OrderedDict((k, pd.Index(np.asarray(v.values), name=k))
+                             for k, v in iteritems(variables)
+                             if v.dims == (k,))
+        schemas = OrderedDict((k, (v.dims, v.dtype))
+                              for k, v in iteritems(variables))
+        attrs = OrderedDict(store.attrs)
+    finally:
+        store.close()
+    return FileSummary(path, mtime, dims, coords, schemas, attrs)
+
+
+def _file_indexer(index, label):
+    """Return a positional indexer for the values of `label` found in `index`,
+    or None if none are found
+    """
+    if isinstance(label, slice):
+        indexer = index.slice_indexer(label.start, label.stop, label.step)
+        if not len(range(*indexer.indices(len(index)))):
+            return None
+    elif np.ndim(label) == 0:
+        try:
+            indexer = index.get_loc(label)
+        except KeyError:
+            return None
+    else:
+        indexer = index.get_indexer(np.asarray(label))
+        indexer = indexer[indexer >= 0]
+        if not indexer.size:
+            return None
+    return indexer
+
+
+class Catalog(object):
+    """Metadata of a collection of netCDF files.
+
+    A catalog records the dimensions, index coordinate values, variable
+    schemas and attributes of every file, so the files and slices needed for
+    a selection can be found without opening any other file. Catalogs can be
+    saved to a local index file and loaded again with `open_catalog`.
+
+    You should create a Catalog with `build_catalog`.
+    """
+    def __init__(self, files):
+        self.files = list(files)
+
+    def __len__(self):
+        return len(self.files)
+
+    def __iter__(self):
+        return iter(self.files)
+
+    def __repr__(self):
+        return '<xray.%s (%s files)>' % (type(self).__name__, len(self))
+
+    @property
+    def paths(self):
+        """Paths of all files in this catalog"""
+        return [f.path for f in self.files]
+
+    def save(self, path):
+        """Save this catalog to a local index file.
+
+        The file is a pickle, so only load index files you trust.
+        """
+        with open(path, 'wb') as f:
+            pickle.dump(self, f, protocol=2)
+
+    def plan(self, **indexers):
+        """Find the files and positions within each file needed for a label
+        based selection, like `Dataset.sel`.
+
+        Parameters
+        ----------
+        **indexers : {dim: indexer, ...}
+            Labels (scalars, arrays or slices) to select along index
+            coordinates. Files that do not contain a dimension are not
+            restricted along it.
+
+        Returns
+        -------
+        plan : OrderedDict
+            Mapping from the path of every file with selected values to
+            location based indexers for `Dataset.isel`.
+        """
+        plan = OrderedDict()
+        for f in self.files:
+            isel = {}
+            for dim, label in iteritems(indexers):
+                if dim not in f.dims:
+                    continue
+                if dim not in f.coords:
+                    raise ValueError('file %r has no index coordinate for '
+                                     'dimension %r' % (f.path, dim))
+                indexer = _file_indexer(f.coords[dim], label)
+                if indexer is None:
+                    break
+                isel[dim] = indexer
+            else:
+                plan[f.path] = isel
+        return plan
+
+    def open(self, concat_dim=None, **indexers):
+        """Open and combine only the files needed for a label based selection.
+
+        Parameters
+        ----------
+        concat_dim : str, optional
+            Dimension along which to concatenate the selections from several
+            files. Required if more than one file is selected.
+        **indexers : {dim: indexer, ...}
+            Labels to select along index coordinates, like `Dataset.sel`.
+
+        Returns
+        -------
+        dataset : Dataset
+            The selected data, loaded into memory.
+        """
+        plan = self.plan(**indexers)
+        if not plan:
+            raise ValueError('no files contain the selected values')
+        if len(plan) > 1 and concat_dim is None:
+            raise ValueError('concat_dim is required to combine the '
+                             'selections from %s files' % len(plan))
+        datasets = []
+        for path, isel in iteritems(plan):
+            with open_dataset(path) as ds:
+                datasets.append(ds.isel(**isel).load_data())
+        if len(datasets) == 1:
+            return datasets[0]
+        return concat(datasets, concat_dim)
+
+
+def _expand_paths(paths):
+    if isinstance(paths, basestring):
+        if os.path.isdir(paths):
+            paths = os.path.join(paths, '*.nc')
+        paths = sorted(glob.glob(paths))
+    return list(paths)
+
+
+def build_catalog(paths, n_workers=None, backend='thread', decode_times=True,
+                  previous=None):
+    """Scan the metadata of a collection of netCDF files into a Catalog.
+
+    Parameters
+    ----------
+    paths : str or sequence of str
+        A directory (all files ending with '.nc' are scanned), a glob pattern
+        or a list of paths.
+    n_workers : int, optional
+        If given, scan files in parallel in a pool of this many worker
+        threads or processes.
+    backend : {'thread', 'process'}, optional
+        Whether the pool uses threads or processes. Processes are safer if
+        the netCDF4 library was not built to be thread-safe.
+    decode_times : bool, optional
+        If True, decode time coordinates into datetime values.
+    previous : Catalog, optional
+        An earlier catalog of these files. Files that have not been modified
+        since they were scanned for it are not scanned again.
+
+    Returns
+    -------
+    catalog : Catalog
+    """
+    paths = _expand_paths(paths)
+    known = {} if previous is None else dict((f.path, f) for f in previous)
+    files = OrderedDict()
+    for path in paths:
+        f = known.get(path)
+        if f is not None and f.mtime == os.path.getmtime(path):
+            files[path] = f
+    pending = [path for path in paths if path not in files]
+
+    scan = functools.partial(scan_file, decode_times=decode_times)
+    if n_workers is None or len(pending) < 2:
+        scanned = [scan(path) for path in pending]
+    else:
+        pool = worker_pool(n_workers, backend)
+        try:
+            scanned = pool.map(scan, pending)
+        finally:
+            pool.terminate()
+            pool.join()
+    files.update((f.path, f) for f in scanned)
+    return Catalog(files[path] for path in paths)
+
+
+def open_catalog(path):
+    """Load a Catalog from a local index file written by `Catalog.save`.
+
+    The file is a pickle, so only load index files you trust.
+    """
+    with open(path, 'rb') as f:
+        catalog = pickle.load(f)
+    if not isinstance(catalog, Catalog):
+        raise TypeError('%r is not a catalog index file' % path)
+    return catalog
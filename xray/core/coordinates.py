@@ -1,7 +1,7 @@
 from collections import Mapping
 from contextlib import contextmanager
 
-from .pycompat import iteritems, basestring
+from .pycompat import basestring
 from . import formatting
 from . import utils
 
@@ -9,9 +9,13 @@ from . import utils
 def _coord_merge_finalize(target, other, target_conflicts, other_conflicts):
     for k in target_conflicts:
         del target[k]
-    for k, v in iteritems(other):
-        if k not in other_conflicts:
-            target[k] = v.variable
+    target_arrays = target._dataset._arrays
+    other_arrays = other._dataset._arrays
+    for k in other:
+        # skip coordinates that are already shared by both objects
+        if (k not in other_conflicts
+                and target_arrays.get(k) is not other_arrays[k]):
+            target[k] = other_arrays[k]
 
 
 class AbstractCoordinates(Mapping):
@@ -70,10 +74,12 @@ class AbstractCoordinates(Mapping):
         """
         self_conflicts = set()
         other_conflicts = set()
+        other_arrays = other._dataset._arrays
         for k in self:
             if k in other:
                 var = self._dataset._arrays[k]
-                if not var.equals(other[k]):
+                other_var = other_arrays[k]
+                if var is not other_var and not var.equals(other_var):
                     in_self_dims = k in self.dims
                     in_other_dims = k in other.dims
                     if in_self_dims and in_other_dims:
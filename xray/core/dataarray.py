@@ -2,11 +2,14 @@ import contextlib
 import functools
 import warnings
 
+import numpy as np
 import pandas as pd
 
 from . import indexing
 from . import groupby
 from . import ops
+from . import resample
+from . import rolling
 from . import utils
 from . import variable
 from .common import AbstractArray
@@ -14,7 +17,7 @@ from .coordinates import DataArrayCoordinates, Indexes
 from .dataset import Dataset
 from .pycompat import iteritems, basestring, OrderedDict, zip
 from .utils import FrozenOrderedDict
-from .variable import as_variable, _as_compatible_data, Coordinate
+from .variable import as_variable, _as_compatible_data, Variable, Coordinate
 
 
 def _infer_coords_and_dims(shape, coords, dims):
@@ -592,9 +595,12 @@ class DataArray(AbstractArray):
 
         Parameters
         ----------
-        group : str, DataArray or Coordinate
+        group : str, DataArray, Coordinate or list of these
             Array whose unique values should be used to group this array. If a
             string, must be the name of a variable contained in this dataset.
+            If a list, this array is grouped by the unique combinations of
+            values of all its arrays. Arrays with more than one dimension are
+            also supported.
         squeeze : boolean, optional
             If "group" is a diension of this array, `squeeze` controls
             whether the subarrays have a dimension of length 1 along that
@@ -602,17 +608,162 @@ class DataArray(AbstractArray):
 
         Returns
         -------
-        grouped : GroupBy
+        grouped : GroupBy or MultiGroupBy
             A `GroupBy` object patterned after `pandas.GroupBy` that can be
             iterated over in the form of `(unique_value, grouped_array)` pairs
             or over which grouped operations can be applied with the `apply`
             and `reduce` methods (and the associated aliases `mean`, `sum`,
-            `std`, etc.).
+            `std`, etc.). If grouped by several arrays or by a
+            multi-dimensional array, a `MultiGroupBy` object that supports
+            only reductions, whose results have one dimension for each group
+            array.
         """
+        if isinstance(group, (list, tuple)):
+            groups = [self.coords[g] if isinstance(g, basestring) else g
+                      for g in group]
+            if len(groups) != 1:
+                return groupby.ArrayMultiGroupBy(self, groups)
+            group, = groups
         if isinstance(group, basestring):
             group = self.coords[group]
+        if getattr(group, 'ndim', 1) > 1:
+            return groupby.ArrayMultiGroupBy(self, [group])
         return groupby.ArrayGroupBy(self, group, squeeze=squeeze)
 
+    def groupby_bins(self, group, bins, right=True, labels=None):
+        """Returns a GroupBy object for performing grouped operations on the
+        bins of a variable, like ``pandas.cut``.
+
+        Each value of `group` is assigned to a bin with a single call to
+        ``np.digitize``. Values that are not in any bin (including missing
+        values) are left out of all groups.
+
+        Parameters
+        ----------
+        group : str, DataArray or Coordinate
+            1-dimensional array whose binned values should be used to group
+            this array. If a string, must be the name of a coordinate of this
+            array.
+        bins : array-like
+            Monotonically increasing bin edges.
+        right : bool, optional
+            Whether bins include their right edge (like ``(0, 10]``, the
+            default) or their left edge (like ``[0, 10)``).
+        labels : array-like, optional
+            Labels of the bins; there must be one fewer label than bin edges.
+            Defaults to interval labels like ``'(0, 10]'``.
+
+        Returns
+        -------
+        grouped : GroupBy
+            A `GroupBy` object grouped by a new variable named after `group`
+            with the suffix ``'_bins'``, whose unique values are the labels
+            of the non-empty bins.
+        """
+        if isinstance(group, basestring):
+            group = self.coords[group]
+        return groupby.ArrayGroupBy(self, group, bins=bins, right=right,
+                                    labels=labels)
+
+    def histogram(self, bins, dim=None, right=True, labels=None):
+        """Count the values of this array in each bin along some
+        dimension(s).
+
+        Bins are assigned to all values at once with ``np.digitize`` and
+        counted with ``np.bincount``, without grouping the array.
+
+        Parameters
+        ----------
+        bins : array-like
+            Monotonically increasing bin edges.
+        dim : str or sequence of str, optional
+            Dimension(s) over which to count values. By default, values are
+            counted over all dimensions.
+        right : bool, optional
+            Whether bins include their right edge (like ``(0, 10]``, the
+            default) or their left edge (like ``[0, 10)``).
+        labels : array-like, optional
+            Labels of the bins; there must be one fewer label than bin edges.
+            Defaults to interval labels like ``'(0, 10]'``.
+
+        Returns
+        -------
+        counts : DataArray
+            Number of values in each bin, with the counted dimensions removed
+            and a new last dimension named after this array with the suffix
+            ``'_bins'``. Missing values and values outside of all bins are
+            not counted.
+        """
+        if dim is None:
+            dim = self.dims
+        elif isinstance(dim, basestring):
+            dim = [dim]
+        missing = [d for d in dim if d not in self.dims]
+        if missing:
+            raise ValueError('%s does not contain the dimensions: %s'
+                             % (type(self).__name__, missing))
+        if labels is None:
+            labels = groupby.bin_labels(np.asarray(bins), right)
+        elif len(labels) != len(bins) - 1:
+            raise ValueError('there must be one fewer label than bin edges')
+        n_bins = len(labels)
+
+        kept = [d for d in self.dims if d not in dim]
+        values = self.transpose(*(kept + list(dim))).values
+        kept_shape = values.shape[:len(kept)]
+        codes = groupby.bin_codes(values, bins, right)
+        codes = codes.reshape(int(np.prod(kept_shape)), -1)
+        flat = (np.arange(codes.shape[0])[:, np.newaxis] * n_bins + codes)
+        counts = np.bincount(flat[codes >= 0],
+                             minlength=codes.shape[0] * n_bins)
+        counts = counts.reshape(kept_shape + (n_bins,))
+
+        bins_name = 'bins' if self.name is None else '%s_bins' % self.name
+        drop = set(k for k, v in iteritems(self._dataset._arrays)
+                   if set(dim).intersection(v.dims))
+        ds = self._dataset.drop_vars(*drop)
+        ds[bins_name] = Coordinate(bins_name, labels)
+        ds[self.name] = Variable(kept + [bins_name], counts)
+        return ds[self.name]
+
+    def rolling(self, min_periods=None, center=False, **windows):
+        """Returns a Rolling object for performing moving window operations.
+
+        Parameters
+        ----------
+        min_periods : int, optional
+            Minimum number of values in a window that must not be missing for
+            the result to be valid. Defaults to the window size.
+        center : bool, optional
+            If True, label each window at its center instead of at its end.
+        **windows : {dim: window}
+            Name of the dimension along which to move the window and the size
+            of the window, e.g., ``arr.rolling(time=3)``.
+
+        Returns
+        -------
+        rolling : Rolling
+            A `Rolling` object with the methods `mean`, `sum`, `min`, `max`
+            and `count`, which are calculated in a single pass over the data,
+            and `reduce` for applying any function to views of the windows.
+        """
+        return rolling.Rolling(self, min_periods, center, **windows)
+
+    def resample(self, freq, dim='time', how='mean', skipna=False,
+                 closed=None, label=None, base=0, keep_attrs=False):
+        """Resample this array to a new temporal frequency.
+
+        See `Dataset.resample` for a description of the arguments.
+
+        Returns
+        -------
+        resampled : DataArray
+            Array with the new index along `dim`.
+        """
+        ds = resample.resample(self._dataset, freq, dim, how, skipna, closed,
+                               label, base, keep_attrs)
+        return ds[self.name]
+
     def transpose(self, *dims):
         """Return a new DataArray object with transposed dimensions.
 
@@ -629,8 +780,8 @@ class DataArray(AbstractArray):
 
         Notes
         -----
-        Although this operation returns a view of this array's data, it is
-        not lazy -- the data will be fully loaded.
+        This operation returns a view of this array's data. It is lazy for
+        data that has not yet been loaded from disk.
 
         See Also
         --------
@@ -659,8 +810,8 @@ class DataArray(AbstractArray):
 
         Notes
         -----
-        Although this operation returns a view of this array's data, it is
-        not lazy -- the data will be fully loaded.
+        This operation returns a view of this array's data. It is lazy for
+        data that has not yet been loaded from disk.
 
         See Also
         --------
@@ -757,23 +908,33 @@ class DataArray(AbstractArray):
         """Convert this array into a pandas.Series.
 
         The Series is indexed by the Cartesian product of index coordinates
-        (in the form of a :py:class:`pandas.MultiIndex`).
+        (in the form of a :py:class:`pandas.MultiIndex`). If this array's data
+        is stored sparsely, the Series only includes the stored values.
         """
+        if self.variable._is_sparse:
+            data = self.variable._data
+            index = utils.index_from_labels(
+                [self.coords[d].to_index() for d in self.dims],
+                list(data.coords), self.dims)
+            return pd.Series(data.data, index=index, name=self.name)
         index = self.coords.to_index()
         return pd.Series(self.values.reshape(-1), index=index, name=self.name)
 
     @classmethod
-    def from_series(cls, series):
+    def from_series(cls, series, sparse=False):
         """Convert a pandas.Series into an xray.DataArray
 
         If the series's index is a MultiIndex, it will be expanded into a
         tensor product of one-dimensional coordinates (filling in missing values
         with NaN). Thus this operation should be the inverse of the `to_series`
         method.
+
+        If `sparse` is True, the data is stored sparsely instead of filling in
+        missing values; see ``Dataset.from_dataframe``.
         """
         # TODO: add a 'name' parameter
         df = pd.DataFrame({series.name: series})
-        ds = Dataset.from_dataframe(df)
+        ds = Dataset.from_dataframe(df, sparse=sparse)
         return ds[series.name]
 
     def _all_compat(self, other, compat_str):
@@ -2,6 +2,7 @@ from collections import Mapping
 import functools
 from io import BytesIO
 import warnings
+import pickle
 import sys
 
 import numpy as np
@@ -16,13 +17,45 @@ from . import indexing
 from . import variable
 from . import utils
 from . import ops
+from . import resample
+from . import serialization
 from .coordinates import DatasetCoordinates, Indexes
-from .utils import (Frozen, SortedKeysDict, ChainMap,
-                    multi_index_from_product)
+from .options import OPTIONS
+from .sparse import SparseArray
+from .utils import Frozen, SortedKeysDict, ChainMap
 from .pycompat import iteritems, itervalues, basestring, OrderedDict
 
 import gzip
 
+def _open_store(nc, *args, **kwargs):
+    """Open the appropriate backends.*DataStore for reading `nc`, a path, URL,
+    file-like object or netCDF3 bytestring
+    """
+    # move this to a classmethod Dataset.open?
+    # TODO: this check has the unfortunate side-effect that
+    # paths to files cannot start with 'CDF'.
+    if isinstance(nc, basestring):
+        # If the initialization nc is a string and
+        if nc.endswith('.gz'):
+           # the name ends with .gz, then gunzip and open as netcdf file
+           # FIXME: does ScipyDataStore handle NetCDF4 files?
+           if sys.version_info[:2] < (2, 7):
+              raise ValueError('reading a gzipped netCDF not supported on Python 2.6')
+           store = backends.ScipyDataStore(gzip.open(nc), *args, **kwargs)
+        elif not nc.startswith('CDF'):
+           # it does not appear to be the contents of a netcdf file we load
+           # it using the netCDF4 package
+           store = backends.NetCDF4DataStore(nc, *args, **kwargs)
+        else:
+           # the contents of a netCDF3 file (a byte string on Python 2)
+           store = backends.ScipyDataStore(nc, *args, **kwargs)
+    else:
+        # If nc is a file-like object we read it using
+        # the scipy.io.netcdf package
+        store = backends.ScipyDataStore(nc, *args, **kwargs)
+    return store
+
+
 def open_dataset(nc, decode_cf=True, mask_and_scale=True, decode_times=True,
                  concat_characters=True, *args, **kwargs):
     """Load a dataset from a file or file-like object.
@@ -49,6 +82,14 @@ def open_dataset(nc, decode_cf=True, mask_and_scale=True, decode_times=True,
         form string arrays. Dimensions will only be concatenated over (and
         removed) if they have no corresponding variable and if they are only
         used as the last dimension of character arrays.
+    variables : sequence of str, optional
+        Keyword only. If given, only load these variables and the variables
+        used as their coordinates (index variables along their dimensions and
+        variables listed in their 'coordinates' attribute). Other variables
+        are skipped without reading any of their metadata, which makes
+        opening files with many variables much faster.
+    drop_variables : sequence of str, optional
+        Keyword only. Names of variables to skip.
     *args, **kwargs : optional
         Format specific loading options passed on to the datastore.
 
@@ -57,29 +98,74 @@ def open_dataset(nc, decode_cf=True, mask_and_scale=True, decode_times=True,
     dataset : Dataset
         The newly created dataset.
     """
-    # move this to a classmethod Dataset.open?
-    # TODO: this check has the unfortunate side-effect that
-    # paths to files cannot start with 'CDF'.
-    if isinstance(nc, basestring):
-        # If the initialization nc is a string and
-        if nc.endswith('.gz'):
-           # the name ends with .gz, then gunzip and open as netcdf file
-           # FIXME: does ScipyDataStore handle NetCDF4 files?
-           if sys.version_info[:2] < (2, 7):
-              raise ValueError('reading a gzipped netCDF not supported on Python 2.6')
-           store = backends.ScipyDataStore(gzip.open(nc), *args, **kwargs)
-        elif not nc.startswith('CDF'):
-           # it does not appear to be the contents of a netcdf file we load
-           # it using the netCDF4 package
-           store = backends.NetCDF4DataStore(nc, *args, **kwargs)
-    else:
-        # If nc is a file-like object we read it using
-        # the scipy.io.netcdf package
-        store = backends.ScipyDataStore(nc, *args, **kwargs)
+    variables = kwargs.pop('variables', None)
+    drop_variables = kwargs.pop('drop_variables', None)
+    store = _open_store(nc, *args, **kwargs)
     return Dataset.load_store(store, decode_cf=decode_cf,
                               mask_and_scale=mask_and_scale,
                               decode_times=decode_times,
-                              concat_characters=concat_characters)
+                              concat_characters=concat_characters,
+                              variables=variables,
+                              drop_variables=drop_variables)
+
+
+def _save_file(item):
+    """Write one dataset in a worker thread or process of save_mfdataset"""
+    dataset, path, kwargs = item
+    dataset.to_netcdf(path, **kwargs)
+    return path
+
+
+def save_mfdataset(datasets, paths, n_workers=None, backend='thread',
+                   progress=None, **kwargs):
+    """Write many datasets to netCDF files at once.
+
+    Each dataset is encoded and written by a separate call to
+    `Dataset.to_netcdf`, optionally in parallel, e.g., to save a dataset
+    split by year with `groupby` into one file per year.
+
+    Parameters
+    ----------
+    datasets : sequence of Dataset
+        Datasets to save.
+    paths : sequence of str
+        Path of the file to which to save each dataset.
+    n_workers : int, optional
+        If given, write files in parallel in a pool of this many worker
+        threads or processes. At most this many files are written at once.
+    backend : {'thread', 'process'}, optional
+        Whether the pool uses threads or processes. Processes are safer if
+        the netCDF4 library was not built to be thread-safe, but datasets
+        must be pickled to send them to the workers.
+    progress : callable, optional
+        Function called in the form `progress(path, n_done, n_total)` after
+        each file is written.
+    **kwargs : optional
+        Additional arguments for `Dataset.to_netcdf`.
+    """
+    datasets = list(datasets)
+    paths = list(paths)
+    if len(datasets) != len(paths):
+        raise ValueError('%s datasets were given, but %s paths'
+                         % (len(datasets), len(paths)))
+    if len(set(paths)) != len(paths):
+        raise ValueError('paths must be unique')
+
+    items = [(ds, path, kwargs) for ds, path in zip(datasets, paths)]
+    if n_workers is None or len(items) < 2:
+        written = (_save_file(item) for item in items)
+        pool = None
+    else:
+        pool = utils.worker_pool(n_workers, backend)
+        written = pool.imap_unordered(_save_file, items)
+    try:
+        for n, path in enumerate(written):
+            if progress is not None:
+                progress(path, n + 1, len(items))
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
 
 
 # list of attributes of pd.DatetimeIndex that are ndarrays of time info
@@ -89,31 +175,52 @@ _DATETIMEINDEX_COMPONENTS = ['year', 'month', 'day', 'hour', 'minute',
                              'quarter']
 
 
+_VIRTUAL_SUFFIXES = _DATETIMEINDEX_COMPONENTS + ['season']
+
+
 def _list_virtual_variables(variables):
     """A frozenset of variable names that don't exist in this dataset but
     for which could be created on demand (because they can be calculated
     from other dataset variables)
     """
-    def _castable_to_timestamp(obj):
-        try:
-            pd.Timestamp(obj)
-        except:
-            return False
-        else:
-            return True
-
     virtual_vars = []
     for k, v in iteritems(variables):
-        if ((v.dtype.kind == 'M' and isinstance(v, variable.Coordinate))
-                or (v.ndim == 0 and _castable_to_timestamp(v.values))):
-            # nb. dtype.kind == 'M' is datetime64
-            for suffix in _DATETIMEINDEX_COMPONENTS + ['season']:
+        # nb. dtype.kind == 'M' is datetime64
+        if v.dtype.kind == 'M' and (isinstance(v, variable.Coordinate)
+                                    or v.ndim == 0):
+            for suffix in _VIRTUAL_SUFFIXES:
                 name = '%s.%s' % (k, suffix)
                 if name not in variables:
                     virtual_vars.append(name)
     return frozenset(virtual_vars)
 
 
+def _datetime_component(date, suffix):
+    if suffix == 'season':
+        # seasons = np.array(['DJF', 'MAM', 'JJA', 'SON'])
+        month = date.month
+        return (month // 3) % 4 + 1
+    else:
+        return getattr(date, suffix)
+
+
+def _cached_datetime_component(coord, suffix):
+    """Return a date/time component of a datetime Coordinate.
+
+    Components are cached on the coordinate, so repeated access (e.g., by
+    calling ``groupby('time.season')`` more than once) only needs to copy
+    them. The cache is cleared if the coordinate's values are replaced.
+    """
+    if coord._components is None:
+        coord._components = {}
+    if suffix not in coord._components:
+        data = np.array(_datetime_component(coord.to_index(), suffix))
+        # the cached array is private; callers get a copy of it
+        data.flags.writeable = False
+        coord._components[suffix] = data
+    return coord._components[suffix].copy()
+
+
 def _get_virtual_variable(variables, key):
     """Get a virtual variable (e.g., 'time.year') from a dict of xray.Variable
     objects (if possible)
@@ -127,17 +234,14 @@ def _get_virtual_variable(variables, key):
 
     ref_var_name, suffix = split_key
     ref_var = variables[ref_var_name]
+    if suffix not in _VIRTUAL_SUFFIXES or ref_var.dtype.kind != 'M':
+        raise KeyError(key)
     if isinstance(ref_var, variable.Coordinate):
-        date = ref_var.to_index()
+        data = _cached_datetime_component(ref_var, suffix)
     elif ref_var.ndim == 0:
-        date = pd.Timestamp(ref_var.values)
-
-    if suffix == 'season':
-        # seasons = np.array(['DJF', 'MAM', 'JJA', 'SON'])
-        month = date.month
-        data = (month // 3) % 4 + 1
+        data = _datetime_component(pd.Timestamp(ref_var.values), suffix)
     else:
-        data = getattr(date, suffix)
+        raise KeyError(key)
     return ref_var_name, variable.Variable(ref_var.dims, data)
 
 
@@ -388,11 +492,15 @@ class Dataset(Mapping, common.ImplementsDatasetReduce):
 
     @classmethod
     def load_store(cls, store, decode_cf=True, mask_and_scale=True,
-                   decode_times=True, concat_characters=True):
+                   decode_times=True, concat_characters=True, variables=None,
+                   drop_variables=None):
         """Create a new dataset from the contents of a backends.*DataStore
         object
         """
-        variables = store.variables
+        if variables is None and drop_variables is None:
+            variables = store.variables
+        else:
+            variables = store.load_variables(variables, drop_variables)
         if decode_cf:
             variables = conventions.decode_cf_variables(
                 variables, mask_and_scale=mask_and_scale,
@@ -424,6 +532,14 @@ class Dataset(Mapping, common.ImplementsDatasetReduce):
         state['_file_obj'] = None
         return state
 
+    def __reduce_ex__(self, protocol):
+        if protocol >= 5 and hasattr(pickle, 'PickleBuffer'):
+            # pickle values as buffers, which can be sent out-of-band
+            header, buffers = serialization.to_buffers(self)
+            return (serialization.from_buffers,
+                    (header, [pickle.PickleBuffer(b) for b in buffers]))
+        return super(Dataset, self).__reduce_ex__(protocol)
+
     @property
     def variables(self):
         """Deprecated; do not use"""
@@ -576,6 +692,11 @@ class Dataset(Mapping, common.ImplementsDatasetReduce):
         "time.season" (for climatological season, starting with 1 for "DJF") is
         the only such variable which is not directly implemented in pandas.
 
+        Virtual variables are listed based only on the dtype of existing
+        variables. The values of virtual variables derived from an index are
+        calculated once and then cached (as read-only arrays) until the index
+        is modified.
+
         References
         ----------
         .. [1] http://pandas.pydata.org/pandas-docs/stable/api.html#time-date-components
@@ -781,12 +902,78 @@ class Dataset(Mapping, common.ImplementsDatasetReduce):
         store.set_attributes(self.attrs)
         store.sync()
 
-    def to_netcdf(self, filepath, **kwdargs):
+    def to_netcdf(self, filepath, mode='w', append_dim=None, region=None,
+                  chunking=None, target_chunk_bytes=2 ** 20, encoding=None,
+                  **kwdargs):
         """Dump dataset contents to a location on disk using the netCDF4
         package.
+
+        Parameters
+        ----------
+        filepath : str
+            Path to which to save this dataset.
+        mode : {'w', 'a'}, optional
+            Write a new file ('w') or update an existing file ('a'), either
+            by appending along `append_dim` or by overwriting a `region`.
+        append_dim : str, optional
+            With mode='w', this dimension is created as an unlimited
+            dimension, so the file can be appended to later. With mode='a',
+            the values along this dimension are appended after the values
+            already in the file, which must have it as an unlimited dimension.
+        region : dict, optional
+            With mode='a', a mapping from dimension names to slices with the
+            positions in the file to overwrite with the values along these
+            dimensions.
+        chunking : {'timeseries', 'spatial', 'balanced'}, optional
+            If given, calculate the chunk sizes of every variable for this
+            access pattern instead of using the chunk sizes in its encoding.
+            Dimensions are assumed to be ordered like (time, level, y, x):
+            'timeseries' is fastest for reading all times at a few points,
+            'spatial' for reading whole maps at a few times and 'balanced'
+            is a compromise between them.
+        target_chunk_bytes : int, optional
+            Approximate size of each chunk in bytes, if `chunking` is given.
+        encoding : dict, optional
+            Mapping from variable names to dictionaries of netCDF4 encoding
+            options, e.g., ``{'foo': {'zlib': True, 'complevel': 5,
+            'shuffle': True}}``. These take precedence over the chunking
+            preset and the encoding of the variable.
+        **kwdargs : optional
+            Additional arguments for `backends.NetCDF4DataStore` (e.g.,
+            `format`).
+
+        Notes
+        -----
+        With mode='a', only variables with `append_dim` or one of the
+        dimensions in `region` are written to variables already in the file,
+        encoded like the values in the file (e.g., with the same time
+        units). Other variables are only written if they are not yet in the
+        file, and attributes are not updated.
         """
-        with backends.NetCDF4DataStore(filepath, mode='w', **kwdargs) as store:
-            self.dump_to_store(store)
+        if mode == 'w':
+            if region is not None:
+                raise ValueError("region can only be written with mode='a'")
+            unlimited_dims = [] if append_dim is None else [append_dim]
+            with backends.NetCDF4DataStore(
+                    filepath, mode='w', chunking=chunking,
+                    target_chunk_bytes=target_chunk_bytes, encoding=encoding,
+                    unlimited_dims=unlimited_dims, **kwdargs) as store:
+                self.dump_to_store(store)
+        elif mode == 'a':
+            if (append_dim is None) == (region is None):
+                raise ValueError("exactly one of append_dim and region is "
+                                 "required with mode='a'")
+            with backends.NetCDF4DataStore(
+                    filepath, mode='a', chunking=chunking,
+                    target_chunk_bytes=target_chunk_bytes, encoding=encoding,
+                    **kwdargs) as store:
+                if append_dim is not None:
+                    store.append(self._arrays, append_dim)
+                else:
+                    store.set_region(self._arrays, region)
+                store.sync()
+        else:
+            raise ValueError("mode must be 'w' or 'a'")
 
     dump = to_netcdf
 
@@ -1145,9 +1332,12 @@ class Dataset(Mapping, common.ImplementsDatasetReduce):
 
         Parameters
         ----------
-        group : str, DataArray or Coordinate
+        group : str, DataArray, Coordinate or list of these
             Array whose unique values should be used to group this array. If a
             string, must be the name of a variable contained in this dataset.
+            If a list, this dataset is grouped by the unique combinations of
+            values of all its arrays. Arrays with more than one dimension are
+            also supported.
         squeeze : boolean, optional
             If "group" is a dimension of any arrays in this dataset, `squeeze`
             controls whether the subarrays have a dimension of length 1 along
@@ -1155,14 +1345,104 @@ class Dataset(Mapping, common.ImplementsDatasetReduce):
 
         Returns
         -------
-        grouped : GroupBy
+        grouped : GroupBy or MultiGroupBy
             A `GroupBy` object patterned after `pandas.GroupBy` that can be
             iterated over in the form of `(unique_value, grouped_array)` pairs.
+            If grouped by several arrays or by a multi-dimensional array, a
+            `MultiGroupBy` object that supports only reductions, whose results
+            have one dimension for each group array.
         """
+        if isinstance(group, (list, tuple)):
+            groups = [self[g] if isinstance(g, basestring) else g
+                      for g in group]
+            if len(groups) != 1:
+                return groupby.DatasetMultiGroupBy(self, groups)
+            group, = groups
         if isinstance(group, basestring):
             group = self[group]
+        if getattr(group, 'ndim', 1) > 1:
+            return groupby.DatasetMultiGroupBy(self, [group])
         return groupby.DatasetGroupBy(self, group, squeeze=squeeze)
 
+    def groupby_bins(self, group, bins, right=True, labels=None):
+        """Returns a GroupBy object for performing grouped operations on the
+        bins of a variable, like ``pandas.cut``.
+
+        Each value of `group` is assigned to a bin with a single call to
+        ``np.digitize``. Values that are not in any bin (including missing
+        values) are left out of all groups.
+
+        Parameters
+        ----------
+        group : str, DataArray or Coordinate
+            1-dimensional array whose binned values should be used to group
+            this dataset. If a string, must be the name of a variable
+            contained in this dataset.
+        bins : array-like
+            Monotonically increasing bin edges.
+        right : bool, optional
+            Whether bins include their right edge (like ``(0, 10]``, the
+            default) or their left edge (like ``[0, 10)``).
+        labels : array-like, optional
+            Labels of the bins; there must be one fewer label than bin edges.
+            Defaults to interval labels like ``'(0, 10]'``.
+
+        Returns
+        -------
+        grouped : GroupBy
+            A `GroupBy` object grouped by a new variable named after `group`
+            with the suffix ``'_bins'``, whose unique values are the labels
+            of the non-empty bins.
+        """
+        if isinstance(group, basestring):
+            group = self[group]
+        return groupby.DatasetGroupBy(self, group, bins=bins, right=right,
+                                      labels=labels)
+
+    def resample(self, freq, dim='time', how='mean', skipna=False,
+                 closed=None, label=None, base=0, keep_attrs=False):
+        """Resample this dataset to a new temporal frequency.
+
+        Values are binned along a dimension indexed by a sorted
+        ``pandas.DatetimeIndex``, like ``pandas.DataFrame.resample``. Each bin
+        holds consecutive values, so bins are sliced instead of indexed with
+        arrays, and sums, means, products, minima and maxima are computed in a
+        single pass over each variable with ``ufunc.reduceat``.
+
+        Parameters
+        ----------
+        freq : str
+            Offset string or object indicating the new frequency, e.g., 'D'
+            for daily or '6H' for six hourly.
+        dim : str, optional
+            Name of the dimension to resample along.
+        how : str or function, optional
+            How to combine the values in each bin: the name of a reduction
+            method (e.g., 'mean', 'sum', 'max', 'std'), 'first', 'last' or
+            'count', or a function which can be called in the form
+            `func(x, axis=axis)`.
+        skipna : bool, optional
+            If True, skip missing values in each bin.
+        closed : {'left', 'right'}, optional
+            Which side of each bin interval is closed.
+        label : {'left', 'right'}, optional
+            Which bin edge to use for the new index labels.
+        base : int, optional
+            For frequencies that evenly subdivide 1 day, the origin of the
+            aggregated intervals.
+        keep_attrs : bool, optional
+            If True, attributes are copied from the original object.
+
+        Returns
+        -------
+        resampled : Dataset
+            Dataset with the new index along `dim`. Bins without any values
+            are filled with NaN, and variables along `dim` that are not data
+            variables are dropped.
+        """
+        return resample.resample(self, freq, dim, how, skipna, closed, label,
+                                 base, keep_attrs)
+
     def transpose(self, *dims):
         """Return a new Dataset object with all array dimensions transposed.
 
@@ -1183,8 +1463,8 @@ class Dataset(Mapping, common.ImplementsDatasetReduce):
 
         Notes
         -----
-        Although this operation returns a view of each array's data, it
-        is not lazy -- the data will be fully loaded into memory.
+        This operation returns a view of each array's data. It is lazy for
+        data that has not yet been loaded from disk.
 
         See Also
         --------
@@ -1224,8 +1504,8 @@ class Dataset(Mapping, common.ImplementsDatasetReduce):
 
         Notes
         -----
-        Although this operation returns a view of each variable's data, it is
-        not lazy -- all variable data will be fully loaded.
+        This operation returns a view of each variable's data. It is lazy for
+        data that has not yet been loaded from disk.
 
         See Also
         --------
@@ -1440,26 +1720,88 @@ class Dataset(Mapping, common.ImplementsDatasetReduce):
         Non-index variables in this dataset form the columns of the
         DataFrame. The DataFrame is be indexed by the Cartesian product of
         this dataset's indices.
+
+        If every non-index variable is stored sparsely (see
+        ``Dataset.from_dataframe``) at the same positions, the DataFrame only
+        includes rows for the stored values.
         """
         columns = [k for k in self if k not in self.dims]
-        data = []
-        # we need a template to broadcast all dataset variables against
-        # using stride_tricks lets us make the ndarray for broadcasting without
-        # having to allocate memory
-        shape = tuple(self.dims.values())
-        empty_data = np.lib.stride_tricks.as_strided(np.array(0), shape=shape,
-                                                     strides=[0] * len(shape))
-        template = variable.Variable(self.dims.keys(), empty_data)
+        dims = list(self.dims.keys())
+        index = self._sparse_index(columns, dims)
+        if index is not None:
+            data = [self._arrays[k]._data.data for k in columns]
+        else:
+            shape = tuple(self.dims.values())
+            data = [_flat_broadcast_values(self._arrays[k], dims, shape)
+                    for k in columns]
+            index = self.coords.to_index()
+        return pd.DataFrame(OrderedDict(zip(columns, data)), index=index)
+
+    def _sparse_index(self, columns, dims):
+        """Return an index for the stored values of the given variables if
+        they are all sparse and store values at the same positions; otherwise
+        return None.
+        """
+        labels = None
         for k in columns:
-            _, var = variable.broadcast_variables(template, self._arrays[k])
-            _, var_data = np.broadcast_arrays(template.values, var.values)
-            data.append(var_data.reshape(-1))
+            var = self._arrays[k]
+            if not var._is_sparse or set(var.dims) != set(dims):
+                return None
+            coords = dict(zip(var.dims, var._data.coords))
+            var_labels = [coords[d] for d in dims]
+            if labels is None:
+                labels = var_labels
+            elif not all(a is b or np.array_equal(a, b)
+                         for a, b in zip(labels, var_labels)):
+                return None
+        if labels is None:
+            return None
+        return utils.index_from_labels([self[d].to_index() for d in dims],
+                                       labels, dims)
+
+    def iter_dataframes(self, chunksize, dim=None):
+        """Iterate over this dataset as a sequence of pandas.DataFrame objects.
+
+        Each DataFrame has the same columns as the result of ``to_dataframe``
+        and holds the rows for up to `chunksize` consecutive labels along a
+        single dimension, so a large dataset can be converted without ever
+        holding the full table in memory. Data which has not yet been loaded
+        from disk is only read one chunk at a time.
 
-        index = self.coords.to_index()
-        return pd.DataFrame(OrderedDict(zip(columns, data)), index=index)
+        Parameters
+        ----------
+        chunksize : int
+            Number of labels along `dim` to include in each DataFrame.
+        dim : str, optional
+            Dimension along which to split the dataset. By default, use the
+            leading dimension (the first level of the DataFrame's index).
+
+        Returns
+        -------
+        iterator of pandas.DataFrame
+
+        See Also
+        --------
+        Dataset.to_dataframe
+        """
+        if chunksize < 1:
+            raise ValueError('chunksize must be a positive integer')
+        if dim is None:
+            if not self.dims:
+                return iter([self.to_dataframe()])
+            dim = list(self.dims.keys())[0]
+        elif dim not in self.dims:
+            raise ValueError('dimension %r not found' % dim)
+        size = self.dims[dim]
+
+        def iter_chunks():
+            for start in range(0, size, chunksize):
+                chunk = self.isel(**{dim: slice(start, start + chunksize)})
+                yield chunk.to_dataframe()
+        return iter_chunks()
 
     @classmethod
-    def from_dataframe(cls, dataframe):
+    def from_dataframe(cls, dataframe, sparse=False):
         """Convert a pandas.DataFrame into an xray.Dataset
 
         Each column will be converted into an independent variable in the
@@ -1469,6 +1811,23 @@ class Dataset(Mapping, common.ImplementsDatasetReduce):
         that on which the 'to_dataframe' method was called, except with
         possibly redundant dimensions (since all dataset variables will have
         the same dimensionality).
+
+        Parameters
+        ----------
+        dataframe : pandas.DataFrame
+            DataFrame from which to copy data and indices.
+        sparse : bool, optional
+            If True and the dataframe's index is a MultiIndex, store the data
+            of each variable sparsely (only the values found in the dataframe
+            and their positions) instead of filling in the entire tensor
+            product with NaN. This can use far less memory if most
+            combinations of index labels are missing. Indexing, reductions and
+            ``to_dataframe`` use the stored values directly; accessing
+            ``values`` creates a dense copy.
+
+        Returns
+        -------
+        Dataset
         """
         # TODO: Add an option to remove dimensions along which the variables
         # are constant, to enable consistent serialization to/from a dataframe,
@@ -1479,25 +1838,49 @@ class Dataset(Mapping, common.ImplementsDatasetReduce):
 
         if hasattr(idx, 'levels'):
             # it's a multi-index
-            # expand the DataFrame to include the product of all levels
-            full_idx = multi_index_from_product(idx.levels, idx.names)
-            dataframe = dataframe.reindex(full_idx)
+            # expand the DataFrame to include the product of all levels, by
+            # scattering each column into place using the integer labels of
+            # the MultiIndex instead of reindexing the entire DataFrame
+            if not idx.is_unique:
+                raise ValueError('cannot convert a DataFrame with a '
+                                 'non-unique MultiIndex into xray.Dataset')
             dims = [name if name is not None else 'level_%i' % n
                     for n, name in enumerate(idx.names)]
             for dim, lev in zip(dims, idx.levels):
                 obj[dim] = (dim, lev)
-            shape = [lev.size for lev in idx.levels]
+            shape = tuple(lev.size for lev in idx.levels)
+            labels = [np.asarray(lab, dtype=np.intp)
+                      for lab in utils.multi_index_labels(idx)]
+            # rows with a missing (NaN) label don't have a place in the result
+            valid = np.logical_and.reduce([lab >= 0 for lab in labels])
+            if not valid.all():
+                labels = [lab[valid] for lab in labels]
+            else:
+                valid = None
+            labels = tuple(labels)
+            is_full = len(labels[0]) == int(np.prod(shape))
+
+            for name, series in iteritems(dataframe):
+                values = series.values
+                if valid is not None:
+                    values = values[valid]
+                if sparse:
+                    fill_value, dtype = alignment.get_fill_value_and_dtype(
+                        values.dtype)
+                    data = SparseArray(labels, values, shape, fill_value,
+                                       dtype)
+                else:
+                    data = _scatter_values(values, labels, shape, is_full)
+                obj[name] = (dims, data)
         else:
             if idx.size:
                 dims = (idx.name if idx.name is not None else 'index',)
                 obj[dims[0]] = (dims, idx)
             else:
                 dims = []
-            shape = -1
 
-        for name, series in iteritems(dataframe):
-            data = series.values.reshape(shape)
-            obj[name] = (dims, data)
+            for name, series in iteritems(dataframe):
+                obj[name] = (dims, series.values.reshape(-1))
         return obj
 
     @staticmethod
@@ -1531,18 +1914,88 @@ class Dataset(Mapping, common.ImplementsDatasetReduce):
                 return NotImplemented
             other_coords = getattr(other, 'coords', None)
             with self.coords._merge_inplace(other_coords):
-                # make a defensive copy of variables to modify in-place so we
-                # can rollback in case of an exception
-                # note: when/if we support automatic alignment, only copy the
-                # variables that will actually be included in the result
-                dest_vars = dict((k, self._arrays[k].copy())
-                                 for k in self.vars)
+                if OPTIONS['transactional_inplace']:
+                    # make a defensive copy of variables to modify in-place so
+                    # we can rollback in case of an exception
+                    # note: when/if we support automatic alignment, only copy
+                    # the variables that will actually be included in the
+                    # result
+                    dest_vars = dict((k, self._arrays[k].copy())
+                                     for k in self.vars)
+                else:
+                    # check that the operation will succeed for every variable
+                    # before modifying any data
+                    _calculate_binary_op(_inplace_dry_run(f), self, other, {})
+                    dest_vars = dict((k, self._arrays[k]) for k in self.vars)
                 _calculate_binary_op(f, dest_vars, other, dest_vars)
                 self._arrays.update(dest_vars)
             return self
         return func
 
 
+def _flat_broadcast_values(var, dims, shape):
+    """Return the values of a variable broadcast against the given dimensions
+    and flattened into a 1-dimensional array.
+
+    Only a single copy of the data is made: the values are written directly
+    into the flattened result with broadcasting assignment.
+    """
+    var = var.transpose(*[d for d in dims if d in var.dims])
+    expand = tuple(slice(None) if d in var.dims else np.newaxis for d in dims)
+    values = np.asarray(var.values)[expand]
+    flat = np.empty(shape, dtype=values.dtype)
+    flat[...] = values
+    return flat.reshape(-1)
+
+
+def _scatter_values(values, labels, shape, is_full):
+    """Scatter a 1-dimensional array of values into a new array with the given
+    shape at the positions given by a tuple of integer label arrays.
+
+    If the labels don't cover every position in the result (`is_full` is
+    False), the remaining positions are filled with missing values, promoting
+    the dtype if necessary to hold them.
+    """
+    if is_full:
+        dtype = values.dtype
+        data = np.empty(shape, dtype=dtype)
+    else:
+        fill_value, dtype = alignment.get_fill_value_and_dtype(values.dtype)
+        data = np.empty(shape, dtype=dtype)
+        data[...] = fill_value
+    data[labels] = values
+    return data
+
+
+def _inplace_dry_run(f):
+    """Wrap an in-place binary operation on variables so that it is instead
+    applied to single element stand-ins for its arguments. This raises the
+    same exceptions as the original operation for incompatible dimensions or
+    data types, but doesn't modify any data.
+    """
+    def func(var, other):
+        sample = variable.Variable(var.dims,
+                                   np.zeros((1,) * var.ndim, var.dtype))
+        if hasattr(other, 'dims'):
+            other = getattr(other, 'variable', other)
+            # the same checks as for the full variables, since the samples
+            # may take a shortcut that skips them
+            variable.validate_broadcast(var, other)
+            other = variable.Variable(other.dims, np.zeros((1,) * other.ndim,
+                                                           other.dtype))
+        elif not utils.is_scalar(other):
+            other = np.asarray(other)
+            shape = (1,) * (var.ndim - other.ndim) + other.shape
+            if (other.ndim > var.ndim
+                    or any(n not in (1, m) for n, m in zip(shape, var.shape))):
+                raise ValueError('operands could not be broadcast together '
+                                 'in-place with shapes %s and %s'
+                                 % (var.shape, other.shape))
+            other = np.zeros((1,) * other.ndim, other.dtype)
+        f(sample, other)
+    return func
+
+
 def _calculate_binary_op(f, dataset, other, dest_vars):
     dataset_arrays = getattr(dataset, '_arrays', dataset)
     dataset_vars = getattr(dataset, 'vars', dataset)
@@ -0,0 +1,157 @@
+from __future__ import division
+
+import __future__
+import ast
+from numbers import Number
+
+import numpy as np
+
+from . import variable
+from .pycompat import range
+
+
+_ALLOWED_NODES = (ast.Expression, ast.Load, ast.Name, ast.BinOp,
+                  ast.UnaryOp, ast.Compare, ast.Add, ast.Sub, ast.Mult,
+                  ast.Div, ast.Pow, ast.Mod, ast.BitAnd, ast.BitOr, ast.USub,
+                  ast.UAdd, ast.Invert, ast.Lt, ast.LtE, ast.Gt, ast.GtE,
+                  ast.Eq, ast.NotEq)
+# numbers are parsed as constants on newer versions of Python
+_NUMBER_NODES = tuple(getattr(ast, name) for name in ['Num', 'Constant']
+                      if hasattr(ast, name))
+
+
+def _parse_expression(expr):
+    """Parse an arithmetic expression and return it along with the names of
+    the variables it uses, in order of appearance
+    """
+    try:
+        tree = ast.parse(expr, mode='eval')
+    except SyntaxError:
+        raise ValueError('invalid expression %r' % expr)
+    names = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name):
+            if node.id not in names:
+                names.append(node.id)
+        elif isinstance(node, _NUMBER_NODES):
+            value = getattr(node, 'value', getattr(node, 'n', None))
+            if not isinstance(value, Number):
+                raise ValueError('unsupported constant %r in expression %r'
+                                 % (value, expr))
+        elif not isinstance(node, _ALLOWED_NODES):
+            raise ValueError('unsupported syntax %r in expression %r; only '
+                             'arithmetic and comparisons of variables and '
+                             'numbers are supported'
+                             % (type(node).__name__, expr))
+    return tree, names
+
+
+def _broadcast_all(variables):
+    """Given a list of Variables from the same Dataset, return the union of
+    their dimensions (in order of appearance) and views of their data that
+    are numpy broadcast compatible along those dimensions
+    """
+    dims = []
+    for var in variables:
+        dims.extend(d for d in var.dims if d not in dims)
+    arrays = []
+    for var in variables:
+        var = var.transpose(*[d for d in dims if d in var.dims])
+        key = tuple(slice(None) if d in var.dims else np.newaxis
+                    for d in dims)
+        arrays.append(np.asarray(var.values)[key])
+    return tuple(dims), arrays
+
+
+def _evaluate_blocked(code, arrays, shape, block_size):
+    """Evaluate compiled code on numpy arrays in blocks along the first axis,
+    so that temporary arrays stay small enough to fit in the CPU cache
+    """
+    namespace = {'__builtins__': {}}
+    if not shape:
+        return eval(code, namespace, arrays)
+
+    row_size = int(np.prod(shape[1:]))
+    rows = max(block_size // row_size, 1) if row_size else shape[0]
+    result = None
+    for start in range(0, shape[0], rows):
+        key = slice(start, start + rows)
+        block_arrays = dict((k, v if v.shape[0] == 1 else v[key])
+                            for k, v in arrays.items())
+        block = eval(code, namespace, block_arrays)
+        if result is None:
+            result = np.empty(shape, dtype=np.asarray(block).dtype)
+        result[key] = block
+    return result
+
+
+def evaluate(expr, obj, engine=None, block_size=65536):
+    """Evaluate an arithmetic expression of the variables in a Dataset or the
+    coordinates of a DataArray.
+
+    Unlike using the arithmetic operators on xray objects directly, no
+    intermediate DataArray objects or full size temporary arrays are created:
+    the variables are broadcast against each other once, by dimension name,
+    and the expression is evaluated in a single pass over the data.
+
+    Parameters
+    ----------
+    expr : str
+        Expression to evaluate, e.g., ``'a * b + c'``. Names refer to
+        variables in `obj`. Arithmetic operators (``+``, ``-``, ``*``, ``/``,
+        ``**``, ``%``), comparisons and the bitwise operators ``&``, ``|`` and
+        ``~`` are supported.
+    obj : Dataset or DataArray
+        Object whose variables are used in the expression. For a DataArray,
+        the array itself (by name) and its coordinates are available.
+    engine : {'numexpr', 'numpy'}, optional
+        Library used to evaluate the expression. By default, numexpr is used
+        if it is installed. Otherwise, the expression is evaluated with numpy
+        in blocks of at most `block_size` elements.
+    block_size : int, optional
+        Approximate number of elements in each block evaluated with numpy.
+
+    Returns
+    -------
+    evaluated : DataArray
+        Result of the expression, with dimensions given by the union of the
+        dimensions of all variables in the expression, in order of
+        appearance. Coordinates are copied from `obj`.
+    """
+    if engine is None:
+        try:
+            import numexpr  # noqa
+            engine = 'numexpr'
+        except ImportError:
+            engine = 'numpy'
+    if engine not in ['numexpr', 'numpy']:
+        raise ValueError("engine must be either 'numexpr' or 'numpy'")
+
+    expr = expr.strip()
+    tree, names = _parse_expression(expr)
+    ds = getattr(obj, '_dataset', obj)
+    missing = [k for k in names if k not in ds._arrays]
+    if missing:
+        raise ValueError('expression refers to variables not found in the '
+                         'object: %r' % missing)
+
+    if names:
+        dims, arrays = _broadcast_all([ds._arrays[k] for k in names])
+        arrays = dict(zip(names, arrays))
+        shape = tuple(ds.dims[d] for d in dims)
+    else:
+        dims = ()
+        arrays = {}
+        shape = ()
+
+    if engine == 'numexpr':
+        import numexpr
+        data = numexpr.evaluate(expr, local_dict=arrays)
+    else:
+        code = compile(tree, '<expression>', 'eval',
+                       __future__.division.compiler_flag, True)
+        data = _evaluate_blocked(code, arrays, shape, block_size)
+
+    result = ds.coords.to_dataset()
+    result[None] = variable.Variable(dims, data)
+    return result[None]
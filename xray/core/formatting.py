@@ -5,6 +5,7 @@ import itertools
 import numpy as np
 import pandas as pd
 
+from .options import OPTIONS
 from .pycompat import (OrderedDict, iteritems, itervalues, unicode_type,
                        bytes_type)
 
@@ -52,6 +53,21 @@ def first_n_items(x, n_desired):
     return np.asarray(x).flat[:n_desired]
 
 
+def preview_items(x, n_desired):
+    """Like first_n_items, but cache the items on the underlying variable if
+    its data has not been loaded into memory, so that printing an object more
+    than once only reads from disk or a remote source the first time
+    """
+    variable = getattr(x, 'variable', x)
+    if getattr(variable, '_in_memory', True):
+        return first_n_items(x, n_desired)
+    preview = getattr(variable, '_preview', None)
+    if preview is None or preview.size < min(n_desired, variable.size):
+        preview = first_n_items(variable, n_desired)
+        variable._preview = preview
+    return preview[:n_desired]
+
+
 def format_item(x):
     """Returns a succinct summary of an object as a string"""
     if isinstance(x, (np.datetime64, datetime)):
@@ -80,7 +96,7 @@ def format_array_flat(items_ndarray, max_width):
     """
     # every item will take up at least two characters
     max_possibly_relevant = int(np.ceil(max_width / 2.0))
-    relevant_items = first_n_items(items_ndarray, max_possibly_relevant)
+    relevant_items = preview_items(items_ndarray, max_possibly_relevant)
     pprint_items = list(map(format_item, relevant_items))
 
     end_padding = ' ...'
@@ -121,14 +137,20 @@ def _not_remote(var):
     return True
 
 
+def _show_values(var, is_index=False):
+    if not OPTIONS['display_values'] and not var._in_memory:
+        return False
+    return is_index or _not_remote(var)
+
+
 def summarize_var(name, var, col_width):
-    show_values = _not_remote(var)
+    show_values = _show_values(var)
     return _summarize_var_or_coord(name, var, col_width, show_values)
 
 
 def summarize_coord(name, var, col_width):
     is_index = name in var.dims
-    show_values = is_index or _not_remote(var)
+    show_values = _show_values(var, is_index)
     marker = '*' if is_index else ' '
     return _summarize_var_or_coord(name, var, col_width, show_values, marker)
 
@@ -188,7 +210,7 @@ def array_repr(arr):
 
     summary = ['<xray.%s %s(%s)>'% (type(arr).__name__, name_str, dim_summary)]
 
-    if arr.size < 1e5 or arr._in_memory:
+    if arr._in_memory or (arr.size < 1e5 and OPTIONS['display_values']):
         summary.append(repr(arr.values))
     else:
         summary.append('[%s values with dtype=%s]' % (arr.size, arr.dtype))
@@ -1,12 +1,15 @@
 import functools
+import traceback
+
 import numpy as np
+import pandas as pd
 
 from . import ops
-from .alignment import concat
+from .alignment import concat, get_fill_value_and_dtype
 from .common import ImplementsArrayReduce, ImplementsDatasetReduce
-from .pycompat import zip
-from .utils import peek_at
-from .variable import Variable, Coordinate
+from .pycompat import basestring, iteritems, zip, OrderedDict
+from .utils import peek_at, worker_pool
+from .variable import as_variable, Variable, Coordinate
 
 
 def unique_value_groups(ar):
@@ -32,6 +35,134 @@ def unique_value_groups(ar):
     return values, groups
 
 
+def sorted_value_groups(ar):
+    """Group a sorted 1-D array by its unique values.
+
+    Every group holds a contiguous range of positions, so groups are returned
+    as slices. Indexing with a slice creates a view instead of a copy.
+
+    Parameters
+    ----------
+    ar : array-like
+        Sorted, 1-dimensional input array.
+
+    Returns
+    -------
+    values : np.ndarray
+        Sorted, unique values.
+    slices : list of slice
+        Each element provides the positions in `ar` with values given by the
+        corresponding value in `values`.
+    """
+    ar = np.asarray(ar)
+    starts = (ar[1:] != ar[:-1]).nonzero()[0] + 1
+    if ar.size:
+        starts = np.concatenate([[0], starts])
+    stops = np.append(starts[1:], ar.size)
+    slices = [slice(start, stop) for start, stop in zip(starts, stops)]
+    return ar[starts], slices
+
+
+def bin_labels(bins, right=True):
+    """Return interval labels like '(0, 10]' for the bins between consecutive
+    bin edges
+    """
+    template = '(%s, %s]' if right else '[%s, %s)'
+    return np.array([template % (lower, upper)
+                     for lower, upper in zip(bins[:-1], bins[1:])])
+
+
+def bin_codes(ar, bins, right=True):
+    """Return the index of the bin containing each value in an array.
+
+    Parameters
+    ----------
+    ar : array-like
+        Values to bin.
+    bins : array-like
+        Monotonically increasing bin edges.
+    right : bool, optional
+        Whether bins include their right edge (like ``(0, 10]``) or their left
+        edge (like ``[0, 10)``).
+
+    Returns
+    -------
+    codes : np.ndarray
+        Integer array of the same shape as `ar`, with -1 for values that are
+        not in any bin (including missing values).
+    """
+    bins = np.asarray(bins)
+    if bins.ndim != 1 or bins.size < 2:
+        raise ValueError('bins must be a 1-dimensional array of at least two '
+                         'bin edges')
+    if (np.diff(bins) <= 0).any():
+        raise ValueError('bins must be monotonically increasing')
+    codes = np.digitize(np.asarray(ar).ravel(), bins, right=right) - 1
+    codes[(codes < 0) | (codes >= bins.size - 1)] = -1
+    return codes.reshape(np.shape(ar))
+
+
+def code_groups(codes):
+    """Group a 1-D array of non-negative integer codes without a Python loop
+    over its elements.
+
+    Returns
+    -------
+    values : np.ndarray
+        Sorted, unique codes.
+    indices : list of slice or np.ndarray
+        Each element provides the positions in `codes` with the corresponding
+        value in `values`. If `codes` is sorted, these are slices.
+    """
+    codes = np.asarray(codes)
+    if pd.Index(codes).is_monotonic:
+        return sorted_value_groups(codes)
+    order = np.argsort(codes, kind='mergesort')
+    values, starts = np.unique(codes[order], return_index=True)
+    return values, np.split(order, starts[1:])
+
+
+class _GroupFunction(object):
+    """Picklable wrapper for applying a function to a (key, group) pair in a
+    worker thread or process.
+
+    Errors are returned instead of raised, so they can be reported with the
+    key of the group in the parent process.
+    """
+    def __init__(self, func, kwargs):
+        self.func = func
+        self.kwargs = kwargs
+
+    def __call__(self, item):
+        key, obj = item
+        try:
+            return True, self.func(obj, **self.kwargs)
+        except Exception as e:
+            return False, (key, type(e), str(e), traceback.format_exc())
+
+
+def _raise_group_error(key, error_type, message, worker_traceback):
+    message = ('error applying function to group %r: %s\n\n'
+               'Traceback from the worker:\n%s'
+               % (key, message, worker_traceback))
+    try:
+        error = error_type(message)
+    except Exception:
+        error = RuntimeError(message)
+    raise error
+
+
+def _iter_parallel(pool, func, items):
+    try:
+        for success, result in pool.imap(func, items):
+            if not success:
+                _raise_group_error(*result)
+            yield result
+    finally:
+        pool.terminate()
+        pool.join()
+
+
 class GroupBy(object):
     """A object that implements the split-apply-combine pattern.
 
@@ -48,7 +179,8 @@ class GroupBy(object):
     Dataset.groupby
     DataArray.groupby
     """
-    def __init__(self, obj, group, squeeze=True):
+    def __init__(self, obj, group, squeeze=True, bins=None, right=True,
+                 labels=None):
         """Create a GroupBy object
 
         Parameters
@@ -61,6 +193,15 @@ class GroupBy(object):
             If "group" is a coordinate of object, `squeeze` controls whether
             the subarrays have a dimension of length 1 along that coordinate or
             if the dimension is squeezed out.
+        bins : array-like, optional
+            If given, group by the bins between these monotonically increasing
+            bin edges instead of by unique values. Values that are not in any
+            bin are left out of `obj`.
+        right : bool, optional
+            Whether bins include their right edge (default) or their left
+            edge.
+        labels : array-like, optional
+            Labels of the bins. Defaults to interval labels like '(0, 10]'.
         """
         if group.ndim != 1:
             # TODO: remove this limitation?
@@ -81,7 +222,27 @@ class GroupBy(object):
                              'match the length of this variable along its '
                              'dimension')
 
-        if group.name in obj.dims:
+        if bins is not None:
+            codes = bin_codes(group.values, bins, right)
+            if (codes < 0).any():
+                keep = (codes >= 0).nonzero()[0]
+                obj = obj.isel(**{self.group_dim: keep})
+                codes = codes[keep]
+            if labels is None:
+                labels = bin_labels(np.asarray(bins), right)
+            elif len(labels) != len(bins) - 1:
+                raise ValueError('there must be one fewer label than bin '
+                                 'edges')
+            labels = np.asarray(labels)
+            name = group.name + '_bins'
+            from .dataarray import DataArray
+            index = as_dataset(obj)._arrays[self.group_dim]
+            self.obj = obj
+            self.group = DataArray(labels[codes], {self.group_dim: index},
+                                   group.dims, name=name)
+            present, group_indices = code_groups(codes)
+            unique_coord = Coordinate(name, labels[present])
+        elif group.name in obj.dims:
             # assume that group already has sorted, unique values
             if group.dims != (group.name,):
                 raise ValueError('`group` is required to be a coordinate if '
@@ -92,6 +253,11 @@ class GroupBy(object):
                 # use slices to do views instead of fancy indexing
                 group_indices = [slice(i, i + 1) for i in group_indices]
             unique_coord = group
+        elif pd.Index(np.asarray(group.values)).is_monotonic:
+            # each group is a contiguous range (e.g., the years of a sorted
+            # time coordinate), so we can use slices to do views
+            unique_values, group_indices = sorted_value_groups(group.values)
+            unique_coord = Coordinate(group.name, unique_values)
         else:
             # look through group to find the unique values
             unique_values, group_indices = unique_value_groups(group)
@@ -120,6 +286,20 @@ class GroupBy(object):
         for indices in self.group_indices:
             yield self.obj.isel(**{self.group_dim: indices})
 
+    def _map_grouped(self, func, grouped, kwargs, n_workers=None,
+                     backend='thread'):
+        """Apply `func` to each item of `grouped`, and iterate over the
+        results in order.
+
+        If `n_workers` is given, `func` is called in a pool of worker threads
+        or processes.
+        """
+        if n_workers is None:
+            return (func(obj, **kwargs) for obj in grouped)
+        pool = worker_pool(n_workers, backend)
+        items = zip(self.unique_coord.values, grouped)
+        return _iter_parallel(pool, _GroupFunction(func, kwargs), items)
+
     def _infer_concat_args(self, applied_example):
         if self.group_dim in applied_example.dims:
             concat_dim = self.group
@@ -138,9 +318,53 @@ class GroupBy(object):
         return func
 
     def _apply_binary(self, func, other):
+        expanded = self._expand_other(other)
+        if expanded is not None:
+            return func(self.obj, expanded)
         applied = self._iter_binary_applied(func, other)
         return self._concat(applied)
 
+    def _expand_other(self, other):
+        """Index `other` by the group value of every element along the grouped
+        dimension, so a binary operation with it can be applied to the whole
+        object in one step.
+
+        Returns None if `other` is not indexed by the group values, in which
+        case the operation must be applied group by group.
+        """
+        from .dataset import as_dataset, Dataset
+
+        name = self.group.name
+        if (not hasattr(other, 'indexes') or name not in other.dims
+                or getattr(other, 'name', None) == name
+                or (self.group_dim != name and self.group_dim in other.dims)
+                or not self._can_expand):
+            return None
+        indexer = other.indexes[name].get_indexer(self.group.values)
+        if (indexer < 0).any():
+            return None
+
+        ds = as_dataset(other)
+        variables = OrderedDict()
+        for k, v in iteritems(ds._arrays):
+            if k == name:
+                continue
+            if name in v.dims:
+                data = np.asarray(v.values).take(indexer, v.get_axis_num(name))
+                dims = tuple(self.group_dim if d == name else d
+                             for d in v.dims)
+                v = Variable(dims, data, v.attrs)
+            variables[k] = v
+        variables[self.group_dim] = as_dataset(self.obj)._arrays[self.group_dim]
+        if name != self.group_dim:
+            # like concatenating the groups, add the group as a coordinate
+            variables[name] = Variable(self.group.dims, self.group.values)
+
+        expanded = Dataset(variables, attrs=ds.attrs)
+        expanded._coord_names = (set(k for k in ds.coords if k in variables)
+                                 | set([self.group_dim, name]))
+        return expanded if other is ds else expanded[other.name]
+
     def _iter_binary_applied(self, func, other):
         for group_value, obj in self:
             try:
@@ -169,6 +393,8 @@ class GroupBy(object):
 class ArrayGroupBy(GroupBy, ImplementsArrayReduce):
     """GroupBy object specialized to grouping DataArray objects
     """
+    _can_expand = True
+
     def _iter_grouped_shortcut(self):
         """Fast version of `_iter_grouped` that yields Variables without
         metadata
@@ -219,7 +445,8 @@ class ArrayGroupBy(GroupBy, ImplementsArrayReduce):
         new_order = sorted(stacked.dims, key=lookup_order)
         return stacked.transpose(*new_order)
 
-    def apply(self, func, shortcut=False, **kwargs):
+    def apply(self, func, shortcut=False, n_workers=None, backend='thread',
+              **kwargs):
         """Apply a function over each array in the group and concatenate them
         together into a new array.
 
@@ -248,6 +475,16 @@ class ArrayGroupBy(GroupBy, ImplementsArrayReduce):
             If these conditions are satisfied `shortcut` provides significant
             speedup. This should be the case for many common groupby operations
             (e.g., applying numpy ufuncs).
+        n_workers : int, optional
+            If given, apply `func` in parallel in a pool of this many worker
+            threads or processes. Results are still combined in order. Errors
+            raised by `func` are raised again with the key of the group.
+        backend : {'thread', 'process'}, optional
+            Whether the pool uses threads or processes. Threads work best if
+            `func` spends most of its time in code that releases the GIL
+            (e.g., numpy functions). Processes can run any CPU-bound code in
+            parallel, but each group and result is pickled, so `func` must be
+            picklable (e.g., defined at the top level of a module).
         **kwargs
             Used to call `func(ar, **kwargs)` for each array `ar`.
 
@@ -260,7 +497,7 @@ class ArrayGroupBy(GroupBy, ImplementsArrayReduce):
             grouped = self._iter_grouped_shortcut()
         else:
             grouped = self._iter_grouped()
-        applied = (func(arr, **kwargs) for arr in grouped)
+        applied = self._map_grouped(func, grouped, kwargs, n_workers, backend)
         return self._concat(applied, shortcut=shortcut)
 
     def _concat(self, applied, shortcut=False):
@@ -316,7 +553,14 @@ ops.inject_binary_ops(ArrayGroupBy)
 
 
 class DatasetGroupBy(GroupBy, ImplementsDatasetReduce):
-    def apply(self, func, **kwargs):
+    @property
+    def _can_expand(self):
+        # applied group by group, variables without the grouped dimension are
+        # only stacked along it if the results differ between groups
+        return all(self.group_dim in self.obj._arrays[k].dims
+                   for k in self.obj.vars)
+
+    def apply(self, func, n_workers=None, backend='thread', **kwargs):
         """Apply a function over each Dataset in the group and concatenate them
         together into a new Dataset.
 
@@ -335,6 +579,11 @@ class DatasetGroupBy(GroupBy, ImplementsDatasetReduce):
         ----------
         func : function
             Callable to apply to each sub-dataset.
+        n_workers : int, optional
+            If given, apply `func` in parallel in a pool of this many worker
+            threads or processes. See `ArrayGroupBy.apply` for details.
+        backend : {'thread', 'process'}, optional
+            Whether the pool uses threads or processes.
         **kwargs
             Used to call `func(ds, **kwargs)` for each sub-dataset `ar`.
 
@@ -344,7 +593,8 @@ class DatasetGroupBy(GroupBy, ImplementsDatasetReduce):
             The result of splitting, applying and combining this dataset.
         """
         kwargs.pop('shortcut', None) # ignore shortcut if set (for now)
-        applied = (func(ds, **kwargs) for ds in self._iter_grouped())
+        applied = self._map_grouped(func, self._iter_grouped(), kwargs,
+                                    n_workers, backend)
         return self._concat(applied)
 
     def _concat(self, applied):
@@ -388,3 +638,273 @@ class DatasetGroupBy(GroupBy, ImplementsDatasetReduce):
 
 ops.inject_reduce_methods(DatasetGroupBy)
 ops.inject_binary_ops(DatasetGroupBy)
+
+
+def _reduceat_name(func):
+    """Return the name of a reduction that can be calculated for all groups
+    in a single pass with `ops.reduce_bins`, or None
+    """
+    name = getattr(func, '__name__', None)
+    if name in ops.REDUCEAT_UFUNCS and (func is ops.REDUCE_FUNCTIONS[name]
+                                        or func is getattr(np, name)):
+        return name
+    return None
+
+
+class MultiGroupBy(object):
+    """A object that implements grouped reductions over several group
+    variables, or over group variables with more than one dimension.
+
+    Groups are given by the unique combinations of the values of all group
+    variables. Reductions are calculated for all groups in a single pass, and
+    their results have one dimension for each group variable, with missing
+    values for combinations that do not occur.
+
+    You should create a MultiGroupBy object by using the `DataArray.groupby`
+    or `Dataset.groupby` methods with a list of group variables, or with a
+    multi-dimensional group variable.
+    """
+    def __init__(self, obj, groups):
+        """Create a MultiGroupBy object
+
+        Parameters
+        ----------
+        obj : Dataset or DataArray
+            Object to group.
+        groups : list of DataArray or Coordinate
+            Named arrays with the group values. Their dimensions must be
+            dimensions of `obj`.
+        """
+        from .dataset import as_dataset
+        dims = as_dataset(obj).dims
+        names = []
+        for group in groups:
+            if getattr(group, 'name', None) is None:
+                raise ValueError('`group` must have a name')
+            if not hasattr(group, 'dims'):
+                raise ValueError("`group` must have a 'dims' attribute")
+            if group.name in names:
+                raise ValueError('group names must be unique: %r'
+                                 % group.name)
+            if any(dims.get(d) != s for d, s in zip(group.dims, group.shape)):
+                raise ValueError('the dimensions of group %r do not match '
+                                 'the dimensions of this object' % group.name)
+            names.append(group.name)
+
+        self.obj = obj
+        self.names = names
+        self.group_dims = tuple(d for d in obj.dims
+                                if any(d in g.dims for g in groups))
+
+        # factorize each group variable, then combine the codes of all groups
+        # into a single code for each position along the grouped dimensions
+        codes = []
+        self.unique_coords = []
+        for group in groups:
+            var = as_variable(group).transpose(
+                *[d for d in self.group_dims if d in group.dims])
+            unique_values, inverse = np.unique(var.values,
+                                               return_inverse=True)
+            self.unique_coords.append(Coordinate(group.name, unique_values))
+            key = tuple(slice(None) if d in var.dims else np.newaxis
+                        for d in self.group_dims)
+            codes.append(inverse.reshape(var.shape)[key])
+        self.shape = tuple(c.size for c in self.unique_coords)
+        self.codes = np.ravel_multi_index(np.broadcast_arrays(*codes),
+                                          self.shape)
+        self._bins_cache = {}
+
+    def _bins(self, repeats=1):
+        """Return the order that sorts the group codes (repeated `repeats`
+        times) and the codes, start positions and sizes of the non-empty
+        groups in sorted order
+        """
+        if repeats not in self._bins_cache:
+            codes = np.tile(self.codes.ravel(), repeats)
+            order = np.argsort(codes, kind='mergesort')
+            present, starts = np.unique(codes[order], return_index=True)
+            counts = np.diff(np.append(starts, codes.size))
+            self._bins_cache[repeats] = order, present, starts, counts
+        return self._bins_cache[repeats]
+
+    def __len__(self):
+        return self._bins()[1].size
+
+    def __iter__(self):
+        if len(self.group_dims) != 1:
+            raise NotImplementedError('iterating over groups along more than '
+                                      'one dimension is not supported; use '
+                                      'a reduce method instead')
+        dim, = self.group_dims
+        order, present, starts, counts = self._bins()
+        for code, start, count in zip(present, starts, counts):
+            positions = np.unravel_index(code, self.shape)
+            key = tuple(coord.values[n]
+                        for coord, n in zip(self.unique_coords, positions))
+            yield key, self.obj.isel(**{dim: order[start:start + count]})
+
+    def _reduce_dims(self, dim):
+        if dim is None:
+            dims = set(self.obj.dims)
+        elif isinstance(dim, basestring):
+            dims = set([dim])
+        else:
+            dims = set(dim)
+        missing = [d for d in dims if d not in self.obj.dims]
+        if missing:
+            raise ValueError('%s does not contain the dimensions: %s'
+                             % (type(self.obj).__name__, missing))
+        return dims | set(self.group_dims)
+
+    def _reduce_variable(self, var, func, dims, kwargs):
+        """Reduce a Variable with all the grouped dimensions over the groups
+        and the other dimensions in `dims`
+        """
+        kept = [d for d in var.dims if d not in dims]
+        other = [d for d in var.dims if d in dims and d not in self.group_dims]
+        var = var.transpose(*(kept + other + list(self.group_dims)))
+        values = np.asarray(var.values)
+        kept_shape = values.shape[:len(kept)]
+        values = values.reshape(kept_shape + (-1,))
+        order, present, starts, counts = self._bins(
+            values.shape[-1] // max(self.codes.size, 1))
+        values = values.take(order, axis=-1)
+
+        name = _reduceat_name(func)
+        if (name is not None and values.dtype.kind in 'biufc'
+                and all(k == 'skipna' for k in kwargs)):
+            data = ops.reduce_bins(values, name, -1, starts, counts,
+                                   **kwargs)
+        else:
+            data = np.concatenate(
+                [np.expand_dims(func(values[..., start:start + count],
+                                     axis=-1, **kwargs), -1)
+                 for start, count in zip(starts, counts)], axis=-1)
+
+        size = int(np.prod(self.shape))
+        if present.size != size:
+            fill_value, dtype = get_fill_value_and_dtype(data.dtype)
+            filled = np.empty(kept_shape + (size,), dtype=dtype)
+            filled[...] = fill_value
+            filled[..., present] = data
+            data = filled
+        data = data.reshape(kept_shape + self.shape)
+        return Variable(kept + self.names, data)
+
+    def _finalize(self, variables, dims, coord_names, attrs):
+        """Combine reduced variables with the coordinates of the original
+        object that were not reduced and the unique group values
+        """
+        from .dataset import as_dataset, Dataset
+        ds = as_dataset(self.obj)
+        for k, v in iteritems(ds._arrays):
+            if k in ds.coords and not dims.intersection(v.dims):
+                variables[k] = v
+                coord_names.add(k)
+        for coord in self.unique_coords:
+            variables[coord.name] = coord
+            coord_names.add(coord.name)
+        obj = Dataset(variables, attrs=attrs)
+        obj._coord_names = coord_names
+        return obj
+
+
+class ArrayMultiGroupBy(MultiGroupBy, ImplementsArrayReduce):
+    """MultiGroupBy object specialized to grouping DataArray objects
+    """
+    def reduce(self, func, dim=None, axis=None, keep_attrs=False, **kwargs):
+        """Reduce the items in each group by applying `func` over the grouped
+        dimensions and any other given dimension(s).
+
+        Parameters
+        ----------
+        func : function
+            Function which can be called in the form
+            `func(x, axis=-1, **kwargs)` to return the result of collapsing an
+            np.ndarray over its last axis.
+        dim : str or sequence of str, optional
+            Dimension(s) to reduce in addition to the grouped dimensions. By
+            default, all dimensions are reduced.
+        axis : None
+            Not supported; use `dim` instead.
+        keep_attrs : bool, optional
+            If True, the array's attributes (`attrs`) will be copied from the
+            original object to the new one.  If False (default), the new
+            object will be returned without attributes.
+        **kwargs : dict
+            Additional keyword arguments passed on to `func`.
+
+        Returns
+        -------
+        reduced : DataArray
+            Array with summarized data, the reduced dimensions removed and one
+            new dimension for each group variable.
+        """
+        if axis is not None:
+            raise ValueError('cannot reduce grouped arrays by axis; use the '
+                             'dim argument instead')
+        dims = self._reduce_dims(dim)
+        var = self._reduce_variable(self.obj.variable, func, dims, kwargs)
+        if keep_attrs:
+            var.attrs.update(self.obj.attrs)
+        name = self.obj.name
+        ds = self._finalize(OrderedDict([(name, var)]), dims, set(), {})
+        return ds[name]
+
+ops.inject_reduce_methods(ArrayMultiGroupBy)
+
+
+class DatasetMultiGroupBy(MultiGroupBy, ImplementsDatasetReduce):
+    """MultiGroupBy object specialized to grouping Dataset objects
+    """
+    def reduce(self, func, dim=None, keep_attrs=False, **kwargs):
+        """Reduce the items in each group by applying `func` over the grouped
+        dimensions and any other given dimension(s).
+
+        Variables with all of the grouped dimensions are reduced for each
+        group. Other variables are reduced over all their dimensions that
+        would be reduced, like in `Dataset.reduce`.
+
+        Parameters
+        ----------
+        func : function
+            Function which can be called in the form
+            `func(x, axis=axis, **kwargs)` to return the result of collapsing
+            an np.ndarray over an integer valued axis.
+        dim : str or sequence of str, optional
+            Dimension(s) to reduce in addition to the grouped dimensions. By
+            default, all dimensions are reduced.
+        keep_attrs : bool, optional
+            If True, the datasets's attributes (`attrs`) will be copied from
+            the original object to the new one.  If False (default), the new
+            object will be returned without attributes.
+        **kwargs : dict
+            Additional keyword arguments passed on to `func`.
+
+        Returns
+        -------
+        reduced : Dataset
+            Dataset with summarized data, the reduced dimensions removed and
+            one new dimension for each group variable.
+        """
+        dims = self._reduce_dims(dim)
+        variables = OrderedDict()
+        for name, var in iteritems(self.obj._arrays):
+            if name in self.obj.coords:
+                continue
+            try:
+                if all(d in var.dims for d in self.group_dims):
+                    var = self._reduce_variable(var, func, dims, kwargs)
+                else:
+                    reduce_dims = [d for d in var.dims if d in dims]
+                    if reduce_dims:
+                        var = var.reduce(func, dim=reduce_dims, **kwargs)
+            except TypeError:
+                # array (e.g., string) does not support this reduction, so
+                # skip it, like Dataset.reduce
+                continue
+            variables[name] = var
+        attrs = self.obj.attrs if keep_attrs else {}
+        return self._finalize(variables, dims, set(), attrs)
+
+ops.inject_reduce_methods(DatasetMultiGroupBy)
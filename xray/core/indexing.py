@@ -1,4 +1,5 @@
 import numpy as np
+import pandas as pd
 
 from . import utils
 from .pycompat import iteritems, range
@@ -128,12 +129,111 @@ def convert_label_indexer(index, label, index_name=''):
     return indexer
 
 
+def _probe(coord, n):
+    """Read (and cache) the values at positions n and n + 1 (or n - 1 and n
+    at the end) of a Coordinate whose values are not in memory.
+
+    Returns the two values as a pandas.Index and the position of n in it.
+    Using two values ensures pandas can tell which way the index is sorted.
+    """
+    start = min(n, coord.size - 2)
+    if start not in coord._probes:
+        coord._probes[start] = pd.Index(
+            np.asarray(coord._data[start:start + 2]))
+    return coord._probes[start], n - start
+
+
+def _probes_increasing(coord):
+    """Whether all values read so far by `_probe` are strictly increasing in
+    the order of their positions
+    """
+    values = {}
+    for start, index in iteritems(coord._probes):
+        values[start], values[start + 1] = index
+    ordered = [values[n] for n in sorted(values)]
+    try:
+        return all(a < b for a, b in zip(ordered[:-1], ordered[1:]))
+    except TypeError:
+        return False
+
+
+def _bisect(coord, before, lo, hi):
+    """Return the first position in [lo, hi) for which `before` is False,
+    given that it is True for all positions before it.
+
+    Returns None if a value read during the search shows that the coordinate
+    is not strictly increasing.
+    """
+    while lo < hi:
+        mid = (lo + hi) // 2
+        probe = _probe(coord, mid)
+        if not _probes_increasing(coord):
+            return None
+        if before(*probe):
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def lazy_slice_indexer(coord, label):
+    """Find the positions selected by a slice of labels along a Coordinate
+    whose values are not in memory, without loading all of its values.
+
+    Coordinate variables in netCDF files are strictly monotonic (by CF
+    conventions), so the slice bounds are found by binary search with a few
+    point reads. Each value read is compared with the slice bounds by pandas
+    (e.g., so partial datetime strings work like for a pandas.Index). All
+    values read are checked to be strictly increasing in the order of their
+    positions.
+
+    Returns None if the search is not possible (e.g., if the values read show
+    that the coordinate is not strictly increasing), in which case the full
+    index should be used instead.
+    """
+    size = coord.size
+    if label.step is not None or size < 2:
+        return None
+    _probe(coord, 0)
+    _probe(coord, size - 1)
+    if not _probes_increasing(coord):
+        return None
+
+    if label.start is None:
+        start = 0
+    else:
+        start = _bisect(coord,
+                        lambda x, n: x.slice_locs(label.start, None)[0] > n,
+                        0, size)
+        if start is None:
+            return None
+    if label.stop is None:
+        stop = size
+    else:
+        stop = _bisect(coord,
+                       lambda x, n: x.slice_locs(None, label.stop)[1] > n,
+                       start, size)
+        if stop is None:
+            return None
+    return slice(start, stop)
+
+
 def remap_label_indexers(data_obj, indexers):
     """Given an xray data object and label based indexers, return a mapping
     of equivalent location based indexers.
+
+    Slices along coordinates that have not been loaded into memory are
+    resolved with `lazy_slice_indexer` if possible.
     """
-    return dict((dim, convert_label_indexer(data_obj[dim].to_index(), label, dim))
-                for dim, label in iteritems(indexers))
+    def remap(dim, label):
+        coord = data_obj[dim].variable
+        if isinstance(label, slice) and not coord._in_memory:
+            indexer = lazy_slice_indexer(coord, label)
+            if indexer is not None:
+                return indexer
+        return convert_label_indexer(coord.to_index(), label, dim)
+
+    return dict((dim, remap(dim, label)) for dim, label in iteritems(indexers))
 
 
 def _expand_slice(slice_, size):
@@ -228,3 +328,61 @@ class LazilyIndexedArray(utils.NDArrayMixin):
     def __repr__(self):
         return ('%s(array=%r, key=%r)' %
                 (type(self).__name__, self.array, self.key))
+
+
+class LazilyTransposedArray(utils.NDArrayMixin):
+    """Wrap an array that handles orthogonal indexing to make transposing lazy
+
+    The permutation of axes is only applied when the array is converted into a
+    numpy.ndarray. Indexing is translated back into the axis order of the
+    wrapped array, so indexing a transposed LazilyIndexedArray is still lazy.
+    """
+    def __init__(self, array, axes):
+        """
+        Parameters
+        ----------
+        array : array_like
+            Array like object to transpose.
+        axes : tuple of int
+            Permutation of the axes of `array`, as for `numpy.transpose`.
+        """
+        if isinstance(array, LazilyTransposedArray):
+            # compose permutations instead of nesting wrappers
+            axes = tuple(array.axes[a] for a in axes)
+            array = array.array
+        self.array = array
+        self.axes = tuple(axes)
+
+    @property
+    def shape(self):
+        return tuple(self.array.shape[a] for a in self.axes)
+
+    def _source_key(self, key):
+        key = canonicalize_indexer(key, self.ndim)
+        source_key = [None] * self.ndim
+        for axis, k in zip(self.axes, key):
+            source_key[axis] = k
+        # axes indexed by an integer are dropped, so the remaining axes of the
+        # result need to be renumbered in the order of the source array
+        kept = [axis for axis, k in zip(self.axes, key)
+                if not isinstance(k, (int, np.integer))]
+        new_axes = tuple(sorted(kept).index(axis) for axis in kept)
+        return tuple(source_key), new_axes
+
+    def __array__(self, dtype=None):
+        return np.asarray(self.array, dtype=dtype).transpose(self.axes)
+
+    def __getitem__(self, key):
+        source_key, new_axes = self._source_key(key)
+        array = self.array[source_key]
+        if isinstance(array, np.ndarray):
+            # the wrapped array wasn't lazy, so transposing is just a view
+            return array.transpose(new_axes)
+        elif new_axes == tuple(range(len(new_axes))):
+            return array
+        else:
+            return type(self)(array, new_axes)
+
+    def __repr__(self):
+        return ('%s(array=%r, axes=%r)' %
+                (type(self).__name__, self.array, self.axes))
@@ -5,6 +5,12 @@ import pandas as pd
 
 from .pycompat import PY3
 
+try:
+    import bottleneck as bn
+except ImportError:
+    # use numpy's nan-skipping functions instead
+    bn = None
+
 
 UNARY_OPS = ['neg', 'pos', 'abs', 'invert']
 CMP_BINARY_OPS = ['lt', 'le', 'eq', 'ne', 'ge', 'gt']
@@ -25,6 +31,11 @@ PANDAS_UNARY_FUNCTIONS = ['isnull', 'notnull']
 NUMPY_REDUCE_METHODS = ['all', 'any', 'argmax', 'argmin', 'max', 'mean', 'min',
                         'prod', 'ptp', 'std', 'sum', 'var']
 # TODO: wrap cumprod/cumsum, take, dot, sort
+# reductions for which low precision floats are accumulated in float64
+PRECISE_REDUCE_METHODS = ['mean', 'std', 'sum', 'var']
+# reductions with nan-skipping versions in bottleneck
+BOTTLENECK_REDUCE_METHODS = ['argmax', 'argmin', 'max', 'mean', 'min', 'std',
+                             'sum', 'var']
 
 
 def _values_method_wrapper(name):
@@ -57,6 +68,180 @@ def _func_slash_method_wrapper(f, name):
     return func
 
 
+def _nanany(values, axis=None, **kwargs):
+    return np.any(np.where(pd.isnull(values), False, values), axis=axis,
+                  **kwargs)
+
+
+def _nanall(values, axis=None, **kwargs):
+    return np.all(np.where(pd.isnull(values), True, values), axis=axis,
+                  **kwargs)
+
+
+def _nanprod(values, axis=None, **kwargs):
+    # np.nanprod is new in numpy 1.10
+    return np.prod(np.where(pd.isnull(values), 1, values), axis=axis,
+                   **kwargs)
+
+
+def _nanptp(values, axis=None, **kwargs):
+    return (np.nanmax(values, axis=axis, **kwargs)
+            - np.nanmin(values, axis=axis, **kwargs))
+
+
+def _nansum(values, axis=None, **kwargs):
+    return np.sum(np.where(pd.isnull(values), 0, values), axis=axis, **kwargs)
+
+
+def _nanmean(values, axis=None, **kwargs):
+    total = _nansum(values, axis=axis, **kwargs)
+    count = np.sum(~pd.isnull(values), axis=axis)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return total / count
+
+
+def _nanvar(values, axis=None, ddof=0, **kwargs):
+    valid = ~pd.isnull(values)
+    count = np.sum(valid, axis=axis, keepdims=True)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = _nansum(values, axis=axis, keepdims=True, **kwargs) / count
+        squares = np.abs(np.where(valid, values - mean, 0)) ** 2
+        return (np.sum(squares, axis=axis, **kwargs)
+                / (np.sum(valid, axis=axis) - ddof))
+
+
+def _nanstd(values, axis=None, **kwargs):
+    variance = np.asarray(_nanvar(values, axis=axis, **kwargs))
+    if variance.dtype.kind == 'O':
+        variance = variance.astype(float)
+    return np.sqrt(variance)
+
+
+_NAN_FUNCTIONS = {'all': _nanall, 'any': _nanany, 'prod': _nanprod,
+                  'ptp': _nanptp}
+# versions based on pd.isnull, which also work for object arrays
+_ISNULL_NAN_FUNCTIONS = {'sum': _nansum, 'mean': _nanmean, 'var': _nanvar,
+                         'std': _nanstd}
+if not hasattr(np, 'nanmean'):
+    # np.nanmean, np.nanstd and np.nanvar and the dtype argument of np.nansum
+    # are new in numpy 1.8
+    _NAN_FUNCTIONS.update(_ISNULL_NAN_FUNCTIONS)
+
+
+def _use_bottleneck(name, values, axis, kwargs):
+    return (bn is not None and name in BOTTLENECK_REDUCE_METHODS
+            and values.dtype.kind == 'f'
+            and (axis is None or isinstance(axis, (int, np.integer)))
+            and all(k == 'ddof' for k in kwargs))
+
+
+def _create_reduce_function(name):
+    numpy_func = getattr(np, name)
+
+    def func(values, axis=None, skipna=False, **kwargs):
+        values = np.asarray(values)
+        # only these dtypes can hold missing values marked by NaN
+        skipna = skipna and values.dtype.kind in 'cfO'
+
+        dtype = values.dtype
+        if (name in PRECISE_REDUCE_METHODS and dtype.kind == 'f'
+                and dtype.itemsize < 8 and 'dtype' not in kwargs):
+            # accumulate low precision floats in float64 to avoid rounding
+            # errors growing with the number of values
+            kwargs['dtype'] = np.float64
+            cast_to = dtype
+        else:
+            cast_to = None
+
+        if not skipna:
+            result = numpy_func(values, axis=axis, **kwargs)
+        elif cast_to is None and _use_bottleneck(name, values, axis, kwargs):
+            result = getattr(bn, 'nan' + name)(values, axis=axis, **kwargs)
+        else:
+            if dtype.kind == 'O' and name in _ISNULL_NAN_FUNCTIONS:
+                # numpy's nan functions fail for objects
+                nan_func = _ISNULL_NAN_FUNCTIONS[name]
+            else:
+                nan_func = (_NAN_FUNCTIONS.get(name)
+                            or getattr(np, 'nan' + name))
+            result = nan_func(values, axis=axis, **kwargs)
+
+        if cast_to is not None:
+            result = result.astype(cast_to)
+        return result
+
+    func.__name__ = name
+    func.__doc__ = numpy_func.__doc__
+    return func
+
+
+REDUCE_FUNCTIONS = dict((name, _create_reduce_function(name))
+                        for name in NUMPY_REDUCE_METHODS)
+
+
+# ufuncs for the reductions of bins that can be calculated in a single pass
+REDUCEAT_UFUNCS = {'sum': np.add, 'mean': np.add, 'prod': np.multiply,
+                   'min': np.minimum, 'max': np.maximum}
+# values that don't change the result of these ufuncs, used to skip NaN
+_SKIPNA_FILL_VALUES = {'sum': 0, 'mean': 0, 'prod': 1, 'min': np.inf,
+                       'max': -np.inf}
+
+
+def reduce_bins(values, name, axis, starts, counts, skipna=False):
+    """Reduce contiguous bins of values along an axis in a single pass.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        Values to reduce.
+    name : str
+        Name of the reduction, one of the keys of REDUCEAT_UFUNCS.
+    axis : int
+        Axis along which the bins are found.
+    starts : np.ndarray
+        Start position of each bin. Every bin must contain at least one
+        value.
+    counts : np.ndarray
+        Number of values in each bin.
+    skipna : bool, optional
+        If True, skip missing values.
+
+    Returns
+    -------
+    reduced : np.ndarray
+        Array with one item for each bin along `axis`.
+    """
+    ufunc = REDUCEAT_UFUNCS[name]
+    if values.dtype.kind == 'b':
+        # np.add of booleans is a logical or
+        values = values.astype(int)
+
+    if skipna and values.dtype.kind in 'cf':
+        valid = ~pd.isnull(values)
+        values = np.where(valid, values, _SKIPNA_FILL_VALUES[name])
+        counts = np.add.reduceat(valid.astype(int), starts, axis=axis)
+    else:
+        shape = [1] * values.ndim
+        shape[axis] = -1
+        counts = counts.reshape(shape)
+
+    dtype = values.dtype
+    if (name in PRECISE_REDUCE_METHODS and dtype.kind == 'f'
+            and dtype.itemsize < 8):
+        result = ufunc.reduceat(values, starts, axis=axis, dtype=np.float64)
+    else:
+        result = ufunc.reduceat(values, starts, axis=axis)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if name == 'mean':
+            result = result / counts
+        elif name in ['min', 'max'] and skipna:
+            result = np.where(counts > 0, result, np.nan)
+    if dtype.kind == 'f':
+        result = result.astype(dtype)
+    return result
+
+
 _REDUCE_DOCSTRING_TEMPLATE = \
         """Reduce this {cls}'s data by applying `{name}` along some
         dimension(s).
@@ -64,6 +249,10 @@ _REDUCE_DOCSTRING_TEMPLATE = \
         Parameters
         ----------
         {extra_args}
+        skipna : bool, optional
+            If True, skip missing values (as marked by NaN) by using a nan-aware
+            version of `{name}`. By default, missing values propagate to the
+            result, as in numpy.
         keep_attrs : bool, optional
             If True, the attributes (`attrs`) will be copied from the original
             object to the new one.  If False (default), the new object will be
@@ -81,7 +270,7 @@ _REDUCE_DOCSTRING_TEMPLATE = \
 def inject_reduce_methods(cls):
     # change these to use methods instead of numpy functions?
     for name in NUMPY_REDUCE_METHODS:
-        func = cls._reduce_method(getattr(np, name))
+        func = cls._reduce_method(REDUCE_FUNCTIONS[name])
         func.__name__ = name
         func.__doc__ = _REDUCE_DOCSTRING_TEMPLATE.format(
             name='numpy.' + name, cls=cls.__name__,
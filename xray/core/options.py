@@ -0,0 +1,44 @@
+OPTIONS = {'display_values': True, 'transactional_inplace': False}
+
+
+class set_options(object):
+    """Set global options for xray in a controlled context.
+
+    Currently supported options:
+
+    - ``display_values``: if False, don't show the values of variables whose
+      data has not been loaded into memory when printing xray objects, so that
+      printing never reads data from disk or a remote source. Default: True.
+    - ``transactional_inplace``: if True, in-place arithmetic on a Dataset
+      (e.g., ``ds += 1``) modifies copies of its variables, so the dataset is
+      left unchanged if the operation fails for any variable. Otherwise, the
+      operation is checked for every variable and then modifies the data
+      directly, without making copies. In that case, objects that share data
+      with the dataset also change: e.g., after ``da = ds['foo']; ds += 1``,
+      ``da`` is incremented too, as are shallow copies made with
+      ``ds.copy()``. Default: False.
+
+    You can use ``set_options`` either as a context manager:
+
+    >>> ds = xray.open_dataset('big_file.nc')
+    >>> with xray.set_options(display_values=False):
+    ...     print(ds)
+
+    Or to set global options:
+
+    >>> xray.set_options(display_values=False)
+    """
+    def __init__(self, **kwargs):
+        invalid = [k for k in kwargs if k not in OPTIONS]
+        if invalid:
+            raise ValueError('invalid options %r; valid options are %r'
+                             % (invalid, list(OPTIONS)))
+        self.old = OPTIONS.copy()
+        OPTIONS.update(kwargs)
+
+    def __enter__(self):
+        return
+
+    def __exit__(self, type, value, traceback):
+        OPTIONS.clear()
+        OPTIONS.update(self.old)
@@ -0,0 +1,121 @@
+"""Resampling along a dimension indexed by a pandas.DatetimeIndex
+"""
+import numpy as np
+import pandas as pd
+
+from . import ops
+from . import utils
+from .alignment import get_fill_value_and_dtype
+from .pycompat import iteritems, basestring, OrderedDict
+from .variable import Variable, Coordinate
+
+
+def resample_bins(index, freq, closed=None, label=None, base=0):
+    """Split a sorted DatetimeIndex into contiguous bins.
+
+    Parameters
+    ----------
+    index : pandas.DatetimeIndex
+        Monotonically increasing index to resample.
+    freq, closed, label, base :
+        Arguments used to create a `pandas.TimeGrouper`.
+
+    Returns
+    -------
+    labels : pandas.DatetimeIndex
+        Label of each bin, including empty bins.
+    starts, stops : np.ndarray
+        Integer positions in `index` where each bin starts and stops.
+    """
+    if not isinstance(index, pd.DatetimeIndex):
+        raise TypeError('only a dimension indexed by datetime values can be '
+                        'resampled')
+    if not index.is_monotonic:
+        raise ValueError('index must be monotonically increasing to resample')
+    grouper = pd.TimeGrouper(freq, closed=closed, label=label, base=base)
+    counts = pd.Series(np.ones(len(index), dtype=int), index)
+    counts = counts.groupby(grouper).count()
+    stops = np.cumsum(counts.values)
+    starts = stops - counts.values
+    return counts.index, starts, stops
+
+
+def _resample_values(values, how, axis, starts, stops, skipna):
+    """Resample the values of one variable from the start and stop positions
+    of non-empty bins
+    """
+    if isinstance(how, basestring) and how in ops.REDUCEAT_UFUNCS \
+            and values.dtype.kind in 'biufc':
+        return ops.reduce_bins(values, how, axis, starts, stops - starts,
+                               skipna)
+    elif how == 'first':
+        return values.take(starts, axis=axis)
+    elif how == 'last':
+        return values.take(stops - 1, axis=axis)
+    elif how == 'count':
+        valid = (~utils.isnull(values)).astype(int)
+        return np.add.reduceat(valid, starts, axis=axis)
+
+    if isinstance(how, basestring):
+        if how not in ops.REDUCE_FUNCTIONS:
+            raise ValueError('invalid resampling method %r' % how)
+        func = ops.REDUCE_FUNCTIONS[how]
+        kwargs = {'skipna': skipna}
+    else:
+        func = how
+        kwargs = {}
+    indexer = [slice(None)] * values.ndim
+    results = []
+    for start, stop in zip(starts, stops):
+        indexer[axis] = slice(start, stop)
+        result = func(values[tuple(indexer)], axis=axis, **kwargs)
+        results.append(np.expand_dims(result, axis))
+    return np.concatenate(results, axis=axis)
+
+
+def resample(dataset, freq, dim, how='mean', skipna=False, closed=None,
+             label=None, base=0, keep_attrs=False):
+    """Implementation of Dataset.resample and DataArray.resample"""
+    if dim not in dataset.dims:
+        raise ValueError('dimension %r not found' % dim)
+    labels, starts, stops = resample_bins(dataset.indexes[dim], freq,
+                                          closed, label, base)
+    nonempty = stops > starts
+
+    variables = OrderedDict()
+    for name, var in iteritems(dataset._arrays):
+        if name == dim:
+            variables[name] = Coordinate(dim, labels)
+        elif dim not in var.dims:
+            variables[name] = var
+        elif name not in dataset.coords:
+            axis = var.get_axis_num(dim)
+            values = np.asarray(var.values)
+            try:
+                data = _resample_values(values, how, axis, starts[nonempty],
+                                        stops[nonempty], skipna)
+            except TypeError:
+                # array (e.g., string) does not support this method, so skip
+                # it, like Dataset.reduce
+                continue
+            if not nonempty.all():
+                if how == 'count':
+                    fill_value, dtype = 0, data.dtype
+                else:
+                    fill_value, dtype = get_fill_value_and_dtype(data.dtype)
+                shape = list(data.shape)
+                shape[axis] = labels.size
+                filled = np.empty(shape, dtype=dtype)
+                filled[...] = fill_value
+                indexer = [slice(None)] * data.ndim
+                indexer[axis] = nonempty
+                filled[tuple(indexer)] = data
+                data = filled
+            attrs = var.attrs if keep_attrs else None
+            variables[name] = Variable(var.dims, data, attrs)
+
+    coord_names = set(k for k in dataset.coords if k in variables)
+    attrs = dataset.attrs if keep_attrs else {}
+    obj = type(dataset)(variables, attrs=attrs)
+    obj._coord_names = coord_names
+    return obj
@@ -0,0 +1,256 @@
+"""Moving window operations for xray objects
+"""
+import numpy as np
+
+from . import utils
+from .pycompat import iteritems
+from .variable import Variable
+
+
+def rolling_window(array, window):
+    """Return a view of `array` with a new last axis of length `window`.
+
+    Along its second to last axis, the view has one item for each window
+    position along the last axis of `array`. No data is copied.
+    """
+    shape = array.shape[:-1] + (array.shape[-1] - window + 1, window)
+    strides = array.strides + (array.strides[-1],)
+    return np.lib.stride_tricks.as_strided(array, shape, strides)
+
+
+def _window_diff(cumsum, window):
+    """Differences of a cumulative sum along the last axis between the ends
+    of each window
+    """
+    result = cumsum[..., window - 1:].copy()
+    result[..., 1:] -= cumsum[..., :-window]
+    return result
+
+
+def _window_count(array, window):
+    return _window_diff(np.cumsum(array, axis=-1, dtype=np.int64), window)
+
+
+def _window_sum(array, window):
+    """Moving sum along the last axis.
+
+    Each sum is the difference of a cumulative sum, so it takes a single pass
+    over the data regardless of the window size. Counts (boolean or integer
+    arrays) are exact. For other values, NaN and infinite values are counted
+    separately in each window and only finite values are summed. The exact
+    rounding errors of the cumulative sum and of the differences are added
+    back (compensated summation), so that an infinite or very large value only
+    affects the windows that contain it.
+    """
+    if array.dtype.kind in 'biu':
+        return _window_count(array, window)
+    if array.dtype.kind == 'c':
+        result = np.empty(array.shape[:-1] + (array.shape[-1] - window + 1,),
+                          dtype=np.complex128)
+        result.real = _window_sum(array.real, window)
+        result.imag = _window_sum(array.imag, window)
+        return result
+
+    array = np.asarray(array, dtype=np.float64)
+    finite = np.isfinite(array)
+    all_finite = finite.all()
+    values = array if all_finite else np.where(finite, array, 0)
+    cumsum = np.cumsum(values, axis=-1)
+    # the exact rounding error of each addition (Knuth's TwoSum)
+    previous, current = cumsum[..., :-1], cumsum[..., 1:]
+    error = np.empty_like(cumsum)
+    error[..., 0] = 0
+    added = current - previous
+    np.subtract(current, added, out=error[..., 1:])
+    np.subtract(previous, error[..., 1:], out=error[..., 1:])
+    np.subtract(values[..., 1:], added, out=added)
+    error[..., 1:] += added
+    result = _window_diff(cumsum, window)
+    correction = _window_diff(np.cumsum(error, axis=-1), window)
+    # add the exact rounding error of the differences themselves
+    total, start = cumsum[..., window:], cumsum[..., :-window]
+    difference = result[..., 1:]
+    start_error = difference - total
+    total_error = total - (difference - start_error)
+    start_error += start
+    total_error -= start_error
+    correction[..., 1:] += total_error
+    result += correction
+
+    if not all_finite:
+        n_nan = _window_count(np.isnan(array), window)
+        n_posinf = _window_count(array == np.inf, window)
+        n_neginf = _window_count(array == -np.inf, window)
+        result[n_posinf > 0] = np.inf
+        result[n_neginf > 0] = -np.inf
+        result[(n_nan > 0) | ((n_posinf > 0) & (n_neginf > 0))] = np.nan
+    return result
+
+
+def _window_extreme(array, window, ufunc, fill_value):
+    """Moving minimum or maximum along the last axis with the van Herk/Gil-Werman
+    algorithm, which needs three comparisons per element regardless of the
+    window size
+    """
+    size = array.shape[-1]
+    n_blocks = -(-size // window)
+    blocks = np.empty(array.shape[:-1] + (n_blocks * window,),
+                      dtype=array.dtype)
+    blocks[..., :size] = array
+    blocks[..., size:] = fill_value
+    blocks = blocks.reshape(array.shape[:-1] + (n_blocks, window))
+
+    # running extremes from the start and from the end of each block
+    flat_shape = array.shape[:-1] + (-1,)
+    prefix = ufunc.accumulate(blocks, axis=-1).reshape(flat_shape)
+    suffix = ufunc.accumulate(blocks[..., ::-1], axis=-1)[..., ::-1]
+    suffix = suffix.reshape(flat_shape)
+    n_windows = size - window + 1
+    return ufunc(suffix[..., :n_windows],
+                 prefix[..., window - 1:window - 1 + n_windows])
+
+
+class Rolling(object):
+    """A object that implements moving window operations along one dimension.
+
+    You should create a Rolling object by using the `DataArray.rolling`
+    method.
+
+    See Also
+    --------
+    DataArray.rolling
+    """
+    def __init__(self, obj, min_periods=None, center=False, **windows):
+        """Create a Rolling object
+
+        Parameters
+        ----------
+        obj : DataArray
+            Object to window.
+        min_periods : int, optional
+            Minimum number of values in a window that must not be missing for
+            the result to be valid. Defaults to the window size.
+        center : bool, optional
+            If True, label each window at its center instead of at its end.
+        **windows : {dim: window}
+            Name of the dimension along which to move the window and the size
+            of the window.
+        """
+        if len(windows) != 1:
+            raise ValueError('exactly one dimension must be given as a '
+                             'keyword argument to rolling')
+        (dim, window), = iteritems(windows)
+        if dim not in obj.dims:
+            raise ValueError('dimension %r not found' % dim)
+        window = int(window)
+        if window < 1:
+            raise ValueError('window must be a positive integer')
+        if min_periods is None:
+            min_periods = window
+        elif not 1 <= min_periods <= window:
+            raise ValueError('min_periods must be between 1 and the window '
+                             'size')
+
+        self.obj = obj
+        self.dim = dim
+        self.window = window
+        self.min_periods = min_periods
+        self.center = center
+
+    def __repr__(self):
+        return ('%s [%s->%s, center=%s]' % (type(self).__name__, self.dim,
+                                             self.window, self.center))
+
+    def _padded_values(self):
+        """Return the values of the windowed array as floats, with the
+        windowed dimension moved to the last axis and padded with NaN, so
+        that window n covers positions n through n + window - 1
+        """
+        values = np.asarray(self.obj.values)
+        axis = self.obj.get_axis_num(self.dim)
+        values = np.rollaxis(values, axis, values.ndim)
+        offset = (self.window - 1) // 2 if self.center else 0
+        before = self.window - 1 - offset
+
+        dtype = values.dtype if values.dtype.kind in 'fc' else float
+        size = values.shape[-1]
+        padded = np.empty(values.shape[:-1] + (size + self.window - 1,),
+                          dtype=dtype)
+        padded.fill(np.nan)
+        padded[..., before:before + size] = values
+        return padded
+
+    def _wrap(self, data):
+        axis = self.obj.get_axis_num(self.dim)
+        data = np.rollaxis(data, data.ndim - 1, axis)
+        ds = self.obj._dataset.copy()
+        ds[self.obj.name] = Variable(self.obj.dims, data)
+        return ds[self.obj.name]
+
+    def _reduce(self, name):
+        padded = self._padded_values()
+        valid = ~utils.isnull(padded)
+        counts = _window_sum(valid, self.window)
+
+        if name == 'count':
+            return self._wrap(counts.astype(int))
+
+        if name in ['sum', 'mean']:
+            result = _window_sum(np.where(valid, padded, 0), self.window)
+            if name == 'mean':
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    result /= counts
+        else:
+            ufunc, fill_value = {'min': (np.minimum, np.inf),
+                                 'max': (np.maximum, -np.inf)}[name]
+            result = _window_extreme(np.where(valid, padded, fill_value),
+                                     self.window, ufunc, fill_value)
+        result = np.where(counts >= self.min_periods, result, np.nan)
+        return self._wrap(result.astype(padded.dtype))
+
+    def reduce(self, func, **kwargs):
+        """Reduce each window by applying `func`.
+
+        Parameters
+        ----------
+        func : function
+            Function which can be called in the form `func(x, axis=-1,
+            **kwargs)` to return the result of reducing an np.ndarray of
+            windows along its last axis. Missing values, including positions
+            beyond the ends of the array, are NaN.
+        **kwargs : dict
+            Additional keyword arguments passed on to `func`.
+
+        Returns
+        -------
+        reduced : DataArray
+            Array with the same dimensions as the windowed array.
+        """
+        padded = self._padded_values()
+        windows = rolling_window(padded, self.window)
+        result = np.asarray(func(windows, axis=-1, **kwargs))
+        counts = _window_sum(~utils.isnull(padded), self.window)
+        if result.dtype.kind not in 'fc':
+            result = result.astype(float)
+        result = np.where(counts >= self.min_periods, result, np.nan)
+        return self._wrap(result)
+
+    def sum(self):
+        """Moving sum of the values in each window that are not missing"""
+        return self._reduce('sum')
+
+    def mean(self):
+        """Moving mean of the values in each window that are not missing"""
+        return self._reduce('mean')
+
+    def min(self):
+        """Moving minimum of the values in each window that are not missing"""
+        return self._reduce('min')
+
+    def max(self):
+        """Moving maximum of the values in each window that are not missing"""
+        return self._reduce('max')
+
+    def count(self):
+        """Number of values in each window that are not missing"""
+        return self._reduce('count')
@@ -0,0 +1,257 @@
+"""Serialization of datasets into a header and raw contiguous buffers
+"""
+import struct
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+import numpy as np
+
+from .pycompat import iteritems, OrderedDict
+from .variable import Variable
+
+# offsets of buffers in packed datasets are multiples of this many bytes, so
+# arrays created over them are aligned
+_ALIGNMENT = 64
+
+_HEADER_LENGTH = struct.Struct('<Q')
+
+
+def to_buffers(dataset):
+    """Split a dataset into a header and raw buffers with the values of its
+    variables.
+
+    Parameters
+    ----------
+    dataset : Dataset
+        Dataset to serialize. Its values are loaded into memory.
+
+    Returns
+    -------
+    header : dict
+        Picklable description of the dataset: attributes, coordinate names
+        and the dimensions, dtype, shape, attributes and encoding of each
+        variable. Values of variables with an object dtype, which cannot be
+        stored in a raw buffer, are also part of the header.
+    buffers : list of np.ndarray
+        Contiguous bytes (as 1-dimensional uint8 arrays) of the values of all
+        other variables. No data is copied for variables with C contiguous
+        values.
+    """
+    variables = []
+    buffers = []
+    for name, var in iteritems(dataset._arrays):
+        values = np.asarray(var.values)
+        info = {'name': name, 'dims': var.dims, 'attrs': var.attrs,
+                'encoding': var.encoding}
+        if values.dtype.kind == 'O':
+            info['values'] = values
+        else:
+            info['dtype'] = values.dtype.str
+            info['shape'] = values.shape
+            info['buffer'] = len(buffers)
+            flat = np.ascontiguousarray(values).reshape(-1)
+            buffers.append(flat.view(np.uint8))
+        variables.append(info)
+    header = {'variables': variables,
+              'coords': list(dataset._coord_names),
+              'attrs': dataset.attrs}
+    return header, buffers
+
+
+def from_buffers(header, buffers):
+    """Reconstruct a dataset from the header and buffers created by
+    `to_buffers`.
+
+    The values of variables are numpy arrays created over the buffers (any
+    objects supporting the buffer protocol, e.g., memory received from
+    another process or a shared memory segment) without copying them. These
+    arrays are read-only if the buffers are.
+    """
+    from .dataset import Dataset
+    variables = OrderedDict()
+    for info in header['variables']:
+        if 'values' in info:
+            values = info['values']
+        else:
+            data = np.frombuffer(buffers[info['buffer']], dtype=np.uint8)
+            values = data.view(info['dtype']).reshape(info['shape'])
+        variables[info['name']] = Variable(info['dims'], values,
+                                           info['attrs'], info['encoding'])
+    obj = Dataset(variables, attrs=header['attrs'])
+    obj._coord_names = set(header['coords'])
+    return obj
+
+
+def _aligned(offset):
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+def _layout(header, buffers):
+    """Return the pickled header, the offset of each buffer and the total
+    size of a packed dataset
+    """
+    header_bytes = pickle.dumps(header, protocol=2)
+    offset = _aligned(_HEADER_LENGTH.size + len(header_bytes))
+    offsets = []
+    for buf in buffers:
+        offsets.append(offset)
+        offset = _aligned(offset + buf.size)
+    return header_bytes, offsets, offset
+
+
+def _pack_into(header, buffers, target):
+    header_bytes, offsets, size = _layout(header, buffers)
+    target = np.frombuffer(target, dtype=np.uint8)
+    if target.size < size:
+        raise ValueError('target buffer has %s bytes, but %s are needed'
+                         % (target.size, size))
+    header = _HEADER_LENGTH.pack(len(header_bytes)) + header_bytes
+    target[:len(header)] = np.frombuffer(header, dtype=np.uint8)
+    for buf, offset in zip(buffers, offsets):
+        target[offset:offset + buf.size] = buf
+    return size
+
+
+def packed_size(dataset):
+    """Number of bytes needed to pack a dataset with `pack_dataset_into`"""
+    return _layout(*to_buffers(dataset))[2]
+
+
+def pack_dataset_into(dataset, target):
+    """Pack a dataset into a writable buffer (e.g., a shared memory segment)
+    of at least `packed_size(dataset)` bytes.
+
+    Returns the number of bytes written.
+    """
+    header, buffers = to_buffers(dataset)
+    return _pack_into(header, buffers, target)
+
+
+def pack_dataset(dataset):
+    """Serialize a dataset into a single bytearray.
+
+    The packed format is the pickled header from `to_buffers` followed by
+    the raw bytes of every buffer. Unlike `Dataset.dumps`, which writes
+    netCDF3, it keeps all dtypes unchanged and is much faster to write and
+    read. Use `unpack_dataset` to read it.
+    """
+    header, buffers = to_buffers(dataset)
+    target = bytearray(_layout(header, buffers)[2])
+    _pack_into(header, buffers, target)
+    return target
+
+
+def unpack_dataset(data):
+    """Read a dataset packed by `pack_dataset` or `pack_dataset_into`.
+
+    Values are numpy arrays over the memory of `data` (e.g., bytes, a
+    bytearray, a mmap or a shared memory segment) without copying it, so
+    `data` must not be modified while the dataset is in use. The header is
+    unpickled, so only unpack data you trust.
+    """
+    data = np.frombuffer(data, dtype=np.uint8)
+    header_length, = _HEADER_LENGTH.unpack(
+        data[:_HEADER_LENGTH.size].tobytes())
+    header_end = _HEADER_LENGTH.size + header_length
+    header = pickle.loads(data[_HEADER_LENGTH.size:header_end].tobytes())
+    buffers = []
+    offset = _aligned(header_end)
+    for info in header['variables']:
+        if 'buffer' in info:
+            nbytes = (int(np.prod(info['shape']))
+                      * np.dtype(info['dtype']).itemsize)
+            buffers.append(data[offset:offset + nbytes])
+            offset = _aligned(offset + nbytes)
+    return from_buffers(header, buffers)
+
+
+def _shared_memory():
+    try:
+        from multiprocessing import shared_memory
+    except ImportError:
+        raise ImportError('shared memory datasets require the '
+                          'multiprocessing.shared_memory module (Python 3.8 '
+                          'or later)')
+    return shared_memory
+
+
+# names of the shared memory segments published by this process
+_PUBLISHED = set()
+
+
+class _SharedMemoryFile(object):
+    """Keeps a shared memory segment attached for as long as a dataset
+    uses it, so it can be released by `Dataset.close`
+    """
+    def __init__(self, segment):
+        self.segment = segment
+
+    def close(self):
+        try:
+            self.segment.close()
+        except BufferError:
+            # arrays over the segment still exist; it is released when the
+            # last of them is deleted
+            pass
+
+
+def publish_dataset(dataset, name=None):
+    """Copy a dataset into a new shared memory segment, so other processes
+    can use it with `attach_dataset` without loading or copying it again.
+
+    Parameters
+    ----------
+    dataset : Dataset
+        Dataset to publish. Its values are loaded into memory.
+    name : str, optional
+        Name of the shared memory segment. By default, a unique name is
+        chosen.
+
+    Returns
+    -------
+    segment : multiprocessing.shared_memory.SharedMemory
+        The shared memory segment holding the packed dataset. Pass its
+        `name` to `attach_dataset` in other processes. The segment exists
+        until its `unlink` method is called, even after this process exits.
+    """
+    shared_memory = _shared_memory()
+    header, buffers = to_buffers(dataset.load_data())
+    size = _layout(header, buffers)[2]
+    segment = shared_memory.SharedMemory(name=name, create=True, size=size)
+    try:
+        _pack_into(header, buffers, segment.buf)
+    except Exception:
+        segment.close()
+        segment.unlink()
+        raise
+    _PUBLISHED.add(segment.name)
+    return segment
+
+
+def attach_dataset(name):
+    """Open a dataset published with `publish_dataset` by any process.
+
+    The values of all variables (except those with an object dtype) are
+    read-only numpy arrays over the shared memory, so no data is copied.
+    Call `close` on the dataset to detach from the segment once it is no
+    longer needed.
+    """
+    shared_memory = _shared_memory()
+    try:
+        segment = shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # before Python 3.13, attaching also registers the segment with the
+        # resource tracker, which would destroy it when this process exits
+        segment = shared_memory.SharedMemory(name=name)
+        if segment.name not in _PUBLISHED:
+            try:
+                from multiprocessing import resource_tracker
+                resource_tracker.unregister(segment._name, 'shared_memory')
+            except (ImportError, AttributeError):
+                pass
+    obj = unpack_dataset(segment.buf.toreadonly())
+    obj._file_obj = _SharedMemoryFile(segment)
+    return obj
@@ -0,0 +1,227 @@
+"""Sparse storage for the data of xray variables
+"""
+import numpy as np
+
+from . import indexing
+from . import ops
+from . import utils
+from .pycompat import range
+
+
+# reductions that can be computed directly from the stored values; the values
+# are the ufuncs used to combine values along the reduced axes
+_REDUCE_UFUNCS = {np.sum: np.add, np.mean: np.add, np.prod: np.multiply,
+                  np.amin: np.minimum, np.amax: np.maximum}
+# functions that always skip missing values
+_SKIPNA_FUNCTIONS = set()
+# nansum, nanmin and nanmax are in numpy 1.7, nanmean only in numpy 1.8
+for _name, _ufunc in [('nansum', np.add), ('nanmean', np.add),
+                      ('nanmin', np.minimum), ('nanmax', np.maximum)]:
+    if hasattr(np, _name):
+        _REDUCE_UFUNCS[getattr(np, _name)] = _ufunc
+        _SKIPNA_FUNCTIONS.add(getattr(np, _name))
+for _name, _ufunc in [('sum', np.add), ('mean', np.add),
+                      ('prod', np.multiply), ('min', np.minimum),
+                      ('max', np.maximum)]:
+    _REDUCE_UFUNCS[ops.REDUCE_FUNCTIONS[_name]] = _ufunc
+# results of reductions over positions without stored values (except means)
+_EMPTY_VALUES = {np.add: 0, np.multiply: 1}
+_MEAN_FUNCTIONS = tuple(f for f in [np.mean, getattr(np, 'nanmean', None),
+                                    ops.REDUCE_FUNCTIONS['mean']]
+                        if f is not None)
+
+
+def _slice_positions(coord, slice_, size):
+    """Given the coordinates of the stored values along one axis, return a
+    mask of values selected by a slice and their new coordinates
+    """
+    start, stop, step = slice_.indices(size)
+    length = len(range(start, stop, step))
+    offset = coord - start
+    new_coord = offset // step
+    mask = (offset % step == 0) & (new_coord >= 0) & (new_coord < length)
+    return mask.nonzero()[0], new_coord[mask]
+
+
+def _array_positions(coord, positions, size):
+    """Given the coordinates of the stored values along one axis, return the
+    stored values selected by an integer array and their new coordinates.
+
+    The array may contain repeated positions, in which case a stored value is
+    selected once for each repeat.
+    """
+    if positions.size and (positions.max() >= size
+                           or positions.min() < -size):
+        raise IndexError('index out of bounds for axis with size %s' % size)
+    positions = positions % size if size else positions
+    order = np.argsort(positions, kind='mergesort')
+    sorted_positions = positions[order]
+    left = np.searchsorted(sorted_positions, coord, side='left')
+    right = np.searchsorted(sorted_positions, coord, side='right')
+    counts = right - left
+    selected = np.repeat(np.arange(coord.size), counts)
+    starts = np.repeat(left, counts)
+    offsets = np.arange(selected.size) - np.repeat(np.cumsum(counts) - counts,
+                                                   counts)
+    return selected, order[starts + offsets]
+
+
+class SparseArray(utils.NDArrayMixin):
+    """An N-dimensional array stored in coordinate (COO) format
+
+    Only the values at the positions given by `coords` are stored; every other
+    position holds `fill_value`. Orthogonal indexing, transposing and
+    reductions are done directly on the stored values, without ever creating a
+    dense numpy.ndarray. Converting into a numpy.ndarray (e.g., by accessing
+    `Variable.values`) creates a dense copy.
+    """
+    def __init__(self, coords, data, shape, fill_value=np.nan, dtype=None):
+        """
+        Parameters
+        ----------
+        coords : sequence of 1d integer arrays
+            Position of each stored value along each axis.
+        data : 1d array_like
+            Stored values.
+        shape : tuple of int
+            Shape of the dense array.
+        fill_value : scalar, optional
+            Value at all positions not found in `coords`.
+        dtype : np.dtype, optional
+            Data type of the dense array. Defaults to the dtype of `data`,
+            but should be able to hold `fill_value`.
+        """
+        self.coords = tuple(np.asarray(c, dtype=np.intp) for c in coords)
+        self.data = np.asarray(data)
+        self._shape = tuple(int(s) for s in shape)
+        self.fill_value = fill_value
+        self._dtype = np.dtype(self.data.dtype if dtype is None else dtype)
+        if len(self.coords) != len(self._shape):
+            raise ValueError('number of coordinate arrays must match the '
+                             'number of dimensions')
+        if self.data.ndim != 1 or any(c.shape != self.data.shape
+                                      for c in self.coords):
+            raise ValueError('coordinate arrays and data must be 1d arrays of '
+                             'the same length')
+
+    @property
+    def dtype(self):
+        return self._dtype
+
+    @property
+    def shape(self):
+        return self._shape
+
+    @property
+    def nnz(self):
+        """Number of stored values"""
+        return self.data.size
+
+    @property
+    def nbytes(self):
+        """Number of bytes used to store the values and their coordinates"""
+        return self.data.nbytes + sum(c.nbytes for c in self.coords)
+
+    def __array__(self, dtype=None):
+        result = np.empty(self.shape, dtype=self.dtype)
+        result[...] = self.fill_value
+        result[self.coords] = self.data
+        return np.asarray(result, dtype=dtype)
+
+    def _empty_like(self, coords, data, shape):
+        return type(self)(coords, data, shape, self.fill_value, self.dtype)
+
+    def __getitem__(self, key):
+        key = indexing.canonicalize_indexer(key, self.ndim)
+        selected = np.arange(self.nnz)
+        coords = []
+        shape = []
+        for k, coord, size in zip(key, self.coords, self.shape):
+            coord = coord[selected]
+            if isinstance(k, (int, np.integer)):
+                if not -size <= k < size:
+                    raise IndexError('index %s is out of bounds for axis '
+                                     'with size %s' % (k, size))
+                subset = (coord == k % size).nonzero()[0]
+                new_coord = None
+            elif isinstance(k, slice):
+                subset, new_coord = _slice_positions(coord, k, size)
+                shape.append(len(range(*k.indices(size))))
+            else:
+                subset, new_coord = _array_positions(coord, k, size)
+                shape.append(k.size)
+            selected = selected[subset]
+            coords = [c[subset] for c in coords]
+            if new_coord is not None:
+                coords.append(new_coord)
+
+        data = self.data[selected]
+        if not shape:
+            # every axis was indexed by an integer
+            value = data[0] if data.size else self.fill_value
+            return np.array(value, dtype=self.dtype)
+        return self._empty_like(coords, data, shape)
+
+    def transpose(self, axes):
+        coords = [self.coords[a] for a in axes]
+        shape = [self.shape[a] for a in axes]
+        return self._empty_like(coords, self.data, shape)
+
+    def can_reduce(self, func, skipna=False):
+        """Can the given reduction be computed directly from the stored
+        values?
+
+        This is only possible if missing values are skipped (by `func` or
+        because `skipna` is True) and `fill_value` is missing, so that
+        positions without stored values do not change the result.
+        """
+        return (func in _REDUCE_UFUNCS and self.data.dtype.kind in 'biuf'
+                and (skipna or func in _SKIPNA_FUNCTIONS)
+                and bool(utils.isnull(self.fill_value)))
+
+    def reduce(self, func, axis=None):
+        """Reduce this array by applying `func` along some axis(es), skipping
+        missing values.
+
+        The result is computed only from the stored values that are not NaN,
+        like numpy's nan-functions applied to the dense array: positions
+        without any such values are 0 for sums, 1 for products and NaN
+        otherwise. The result is always a dense numpy.ndarray.
+        """
+        ufunc = _REDUCE_UFUNCS[func]
+        if axis is None:
+            axis = range(self.ndim)
+        reduced = set(int(a) % self.ndim for a in np.atleast_1d(axis))
+        kept = [n for n in range(self.ndim) if n not in reduced]
+        shape = tuple(self.shape[n] for n in kept)
+        size = int(np.prod(shape))
+
+        valid = ~utils.isnull(self.data)
+        data = self.data[valid]
+        if data.dtype.kind != 'f':
+            data = data.astype(float)
+        if kept:
+            flat = np.ravel_multi_index([self.coords[n][valid] for n in kept],
+                                        shape)
+        else:
+            flat = np.zeros(data.size, dtype=np.intp)
+
+        result = np.empty(size, dtype=data.dtype)
+        if func in _MEAN_FUNCTIONS:
+            result.fill(np.nan)
+        else:
+            result.fill(_EMPTY_VALUES.get(ufunc, np.nan))
+        if data.size:
+            order = np.argsort(flat, kind='mergesort')
+            flat = flat[order]
+            starts = np.concatenate([[0], (flat[1:] != flat[:-1]).nonzero()[0]
+                                     + 1])
+            values = ufunc.reduceat(data[order], starts)
+            if func in _MEAN_FUNCTIONS:
+                values /= np.diff(np.append(starts, flat.size))
+            result[flat[starts]] = values
+        return result.reshape(shape)
+
+    def __repr__(self):
+        return ('%s(shape=%r, nnz=%r, dtype=%r)' %
+                (type(self).__name__, self.shape, self.nnz, self.dtype))
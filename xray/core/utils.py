@@ -93,12 +93,56 @@ def safe_cast_to_index(array):
 
 
 def multi_index_from_product(iterables, names=None):
-    """Like pandas.MultiIndex.from_product, but with a bug fix.
+    """Like pandas.MultiIndex.from_product, but faster and with a bug fix.
+
+    If there are several levels and the values along each level are unique
+    (the usual case for xray indexes), the MultiIndex is constructed directly
+    from integer labels instead of factorizing the values along each level.
+    The original order of each level is preserved.
+    """
+    iterables = list(iterables)
+    levels = [safe_cast_to_index(v) for v in iterables]
+    if len(levels) < 2 or not all(lev.is_unique for lev in levels):
+        # fixed in 0.14: https://github.com/pydata/pandas/issues/6439
+        # note: pd.MultiIndex.from_product is new in pandas-0.13.1
+        coords = [np.asarray(v) for v in iterables]
+        return pd.MultiIndex.from_product(coords, names=names)
+
+    sizes = [lev.size for lev in levels]
+    labels = []
+    for n, size in enumerate(sizes):
+        # the last level varies fastest, like the flattened values of a
+        # C-ordered array
+        repeats = int(np.prod(sizes[n + 1:]))
+        tiles = int(np.prod(sizes[:n]))
+        labels.append(np.tile(np.repeat(np.arange(size), repeats), tiles))
+    return index_from_labels(levels, labels, names)
+
+
+# MultiIndex.labels was renamed to codes in pandas 0.24
+_MULTI_INDEX_HAS_CODES = hasattr(pd.MultiIndex, 'codes')
+
+
+def index_from_labels(levels, labels, names=None):
+    """Return a pandas.Index holding the values of each level at the positions
+    given by arrays of integer labels, as in a pandas.MultiIndex.
+
+    A plain pandas.Index is returned if there is only one level.
     """
-    # fixed in 0.14: https://github.com/pydata/pandas/issues/6439
-    # note: pd.MultiIndex.from_product is new in pandas-0.13.1
-    coords = [np.asarray(v) for v in iterables]
-    return pd.MultiIndex.from_product(coords, names=names)
+    if len(levels) == 1:
+        name = None if names is None else names[0]
+        return pd.Index(safe_cast_to_index(levels[0]).take(labels[0]),
+                        name=name)
+    kwargs = {'codes' if _MULTI_INDEX_HAS_CODES else 'labels': labels}
+    return pd.MultiIndex(levels=levels, names=names, verify_integrity=False,
+                         **kwargs)
+
+
+def multi_index_labels(index):
+    """Return the integer labels (called codes in newer versions of pandas)
+    of each level of a pandas.MultiIndex
+    """
+    return index.codes if _MULTI_INDEX_HAS_CODES else index.labels
 
 
 def equivalent(first, second):
@@ -162,6 +206,22 @@ def remove_incompatible_items(first_dict, second_dict, compat=equivalent):
             del first_dict[k]
 
 
+def worker_pool(n_workers, backend='thread'):
+    """Create a pool of `n_workers` worker threads or processes.
+
+    Threads work best for functions that spend most of their time in code that
+    releases the GIL. Processes can run any code in parallel, but functions
+    and their arguments and results must be picklable.
+    """
+    if backend == 'thread':
+        from multiprocessing.pool import ThreadPool as Pool
+    elif backend == 'process':
+        from multiprocessing import Pool
+    else:
+        raise ValueError("backend must be either 'thread' or 'process'")
+    return Pool(n_workers)
+
+
 def is_dict_like(value):
     return hasattr(value, '__getitem__') and hasattr(value, 'keys')
 
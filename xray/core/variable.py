@@ -6,6 +6,7 @@ import pandas as pd
 from . import common
 from . import indexing
 from . import ops
+from . import sparse
 from . import utils
 from .pycompat import basestring, OrderedDict, zip
 
@@ -62,8 +63,8 @@ def _as_compatible_data(data):
     Wrap it up:
     - Finally, put pandas.Index and numpy.ndarray arguments in adapter objects
       to ensure they can be indexed properly.
-    - NumpyArrayAdapter, PandasIndexAdapter and LazilyIndexedArray should
-      all pass through unmodified.
+    - NumpyArrayAdapter, PandasIndexAdapter, LazilyIndexedArray and
+      SparseArray should all pass through unmodified.
     """
     # don't check for __len__ or __iter__ so as not to cast if data is a numpy
     # numeric type like np.float32
@@ -230,6 +231,11 @@ class Variable(common.AbstractArray):
         self._dims = self._parse_dimensions(dims)
         self._attrs = None
         self._encoding = None
+        # cached first few items of data not in memory, for formatting
+        self._preview = None
+        # cached date/time components of datetime coordinates, for virtual
+        # variables like 'time.month'
+        self._components = None
         if attrs is not None:
             self.attrs = attrs
         if encoding is not None:
@@ -256,11 +262,20 @@ class Variable(common.AbstractArray):
 
     @property
     def _in_memory(self):
-        return isinstance(self._data, (NumpyArrayAdapter, PandasIndexAdapter))
+        return isinstance(self._data, (NumpyArrayAdapter, PandasIndexAdapter,
+                                       sparse.SparseArray))
+
+    @property
+    def _is_sparse(self):
+        return isinstance(self._data, sparse.SparseArray)
 
     _cache_data_class = NumpyArrayAdapter
 
     def _data_cached(self):
+        # sparse data is already in memory, so only convert it into a dense
+        # array for the caller without replacing it
+        if self._is_sparse:
+            return self._data
         if not isinstance(self._data, self._cache_data_class):
             self._data = self._cache_data_class(self._data)
         return self._data
@@ -295,6 +310,8 @@ class Variable(common.AbstractArray):
             raise ValueError(
                 "replacement values must match the Variable's shape")
         self._data = values
+        self._preview = None
+        self._components = None
 
     def to_coord(self):
         """Return this variable as an xray.Coordinate"""
@@ -369,7 +386,12 @@ class Variable(common.AbstractArray):
 
         See __getitem__ for more details.
         """
+        if self._is_sparse:
+            # writing values requires dense data
+            self._data = self._cache_data_class(self._data)
         self._data_cached()[key] = value
+        self._preview = None
+        self._components = None
 
     @property
     def attributes(self):
@@ -411,7 +433,12 @@ class Variable(common.AbstractArray):
         If `deep=True`, the data array is loaded into memory and copied onto
         the new object. Dimensions, attributes and encodings are always copied.
         """
-        data = self.values.copy() if deep else self._data
+        if deep and self._is_sparse:
+            data = sparse.SparseArray(
+                [c.copy() for c in self._data.coords], self._data.data.copy(),
+                self.shape, self._data.fill_value, self.dtype)
+        else:
+            data = self.values.copy() if deep else self._data
         # note:
         # dims is already an immutable tuple
         # attributes and encoding will be copied when the new Array is created
@@ -474,8 +501,9 @@ class Variable(common.AbstractArray):
 
         Notes
         -----
-        Although this operation returns a view of this variable's data, it is
-        not lazy -- the data will be fully loaded.
+        This operation returns a view of this variable's data. It is lazy for
+        data that has not yet been loaded from disk: the permutation of axes
+        is only applied when the values are accessed.
 
         See Also
         --------
@@ -484,7 +512,15 @@ class Variable(common.AbstractArray):
         if len(dims) == 0:
             dims = self.dims[::-1]
         axes = self.get_axis_num(dims)
-        data = self.values.transpose(axes)
+        if len(dims) < 2 or axes == tuple(range(self.ndim)):
+            # no need to wrap the data if the order of dimensions is unchanged
+            data = self._data
+        elif self._is_sparse:
+            data = self._data.transpose(axes)
+        elif self._in_memory:
+            data = self.values.transpose(axes)
+        else:
+            data = indexing.LazilyTransposedArray(self._data, axes)
         return type(self)(dims, data, self.attrs, self.encoding)
 
     def squeeze(self, dim=None):
@@ -505,8 +541,8 @@ class Variable(common.AbstractArray):
 
         Notes
         -----
-        Although this operation returns a view of this variable's data, it is
-        not lazy -- the data will be fully loaded.
+        This operation returns a view of this variable's data. It is lazy for
+        data that has not yet been loaded from disk.
 
         See Also
         --------
@@ -544,6 +580,12 @@ class Variable(common.AbstractArray):
         reduced : Array
             Array with summarized data and the indicated dimension(s)
             removed.
+
+        Notes
+        -----
+        For variables with sparse data, sums, means, products, minima and
+        maxima that skip missing values are calculated from the stored values
+        only. Other reductions convert the data into a dense array first.
         """
         if 'dimension' in kwargs and dim is None:
             dim = kwargs.pop('dimension')
@@ -554,7 +596,12 @@ class Variable(common.AbstractArray):
 
         if dim is not None:
             axis = self.get_axis_num(dim)
-        data = func(self.values, axis=axis, **kwargs)
+        if (self._is_sparse
+                and self._data.can_reduce(func, kwargs.get('skipna', False))
+                and all(k == 'skipna' for k in kwargs)):
+            data = self._data.reduce(func, axis=axis)
+        else:
+            data = func(self.values, axis=axis, **kwargs)
 
         removed_axes = (range(self.ndim) if axis is None
                         else np.atleast_1d(axis) % self.ndim)
@@ -667,7 +714,9 @@ class Variable(common.AbstractArray):
                 utils.remove_incompatible_items(attrs, var.attrs)
 
             key[axis] = indexer
-            data[key] = var.values
+            # with slice indexers (e.g., for groups of sorted values), this
+            # copies a contiguous block instead of scattering values
+            data[tuple(key)] = var.values
 
         return cls(dims, data, attrs)
 
@@ -759,6 +808,9 @@ class Coordinate(Variable):
         if self.ndim != 1:
             raise ValueError('%s objects must be 1-dimensional' %
                              type(self).__name__)
+        # values read by position while the data is not in memory, for
+        # label based indexing without loading the entire index
+        self._probes = {}
 
     def __getitem__(self, key):
         values = self._data[key]
@@ -825,6 +877,22 @@ class Coordinate(Variable):
         return self.to_index().is_numeric()
 
 
+def validate_broadcast(first, second):
+    """Raise ValueError if two objects with `dims` and `shape` (e.g.,
+    Variables) cannot be broadcast against each other
+    """
+    dim_lengths = dict(zip(first.dims, first.shape))
+    for k, v in zip(second.dims, second.shape):
+        if k in dim_lengths and dim_lengths[k] != v:
+            raise ValueError('operands could not be broadcast together '
+                             'with mismatched lengths for dimension %r: %s'
+                             % (k, (dim_lengths[k], v)))
+    for dims in [first.dims, second.dims]:
+        if len(set(dims)) < len(dims):
+            raise ValueError('broadcasting requires that neither operand '
+                             'has duplicate dimensions: %r' % list(dims))
+
+
 def broadcast_variables(first, second):
     """Given two Variables, return two Variables with matching dimensions and
     numpy broadcast compatible data.
@@ -845,17 +913,7 @@ def broadcast_variables(first, second):
         dimensions.
     """
     # TODO: add unit tests specifically for this function
-    # validate dimensions
-    dim_lengths = dict(zip(first.dims, first.shape))
-    for k, v in zip(second.dims, second.shape):
-        if k in dim_lengths and dim_lengths[k] != v:
-            raise ValueError('operands could not be broadcast together '
-                             'with mismatched lengths for dimension %r: %s'
-                             % (k, (dim_lengths[k], v)))
-    for dims in [first.dims, second.dims]:
-        if len(set(dims)) < len(dims):
-            raise ValueError('broadcasting requires that neither operand '
-                             'has duplicate dimensions: %r' % list(dims))
+    validate_broadcast(first, second)
 
     # build dimensions for new Array
     second_only_dims = [d for d in second.dims
@@ -876,7 +934,15 @@ def broadcast_variables(first, second):
 
 
 def _broadcast_variable_data(self, other):
-    if all(hasattr(other, attr) for attr
+    if (isinstance(other, Variable) and other.dims == self.dims
+            and other.shape == self.shape):
+        # shortcut for the common case of matching variables: no need to
+        # build broadcast variables
+        validate_broadcast(self, other)
+        self_data = self.values
+        other_data = other.values
+        dims = self.dims
+    elif all(hasattr(other, attr) for attr
              in ['dims', 'values', 'shape', 'encoding']):
         # `other` satisfies the necessary Variable API for broadcast_variables
         new_self, new_other = broadcast_variables(self, other)
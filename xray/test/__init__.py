@@ -28,6 +28,24 @@ try:
 except ImportError:
     has_netCDF4 = False
 
+try:
+    import numexpr
+    has_numexpr = True
+except ImportError:
+    has_numexpr = False
+
+try:
+    import bottleneck
+    has_bottleneck = True
+except ImportError:
+    has_bottleneck = False
+
+try:
+    from multiprocessing import shared_memory
+    has_shared_memory = True
+except ImportError:
+    has_shared_memory = False
+
 
 def requires_scipy(test):
     return test if has_scipy else unittest.skip('requires scipy')(test)
@@ -41,6 +59,20 @@ def requires_netCDF4(test):
     return test if has_netCDF4 else unittest.skip('requires netCDF4')(test)
 
 
+def requires_numexpr(test):
+    return test if has_numexpr else unittest.skip('requires numexpr')(test)
+
+
+def requires_bottleneck(test):
+    return (test if has_bottleneck
+            else unittest.skip('requires bottleneck')(test))
+
+
+def requires_shared_memory(test):
+    return (test if has_shared_memory
+            else unittest.skip('requires multiprocessing.shared_memory')(test))
+
+
 def decode_string_data(data):
     if data.dtype.kind == 'S':
         return np.core.defchararray.decode(data, 'utf-8', 'replace')
@@ -12,7 +12,9 @@ import sys
 import numpy as np
 import pandas as pd
 
-from xray import Dataset, open_dataset, backends
+from xray import Dataset, Variable, open_dataset, save_mfdataset, backends
+from xray.backends.netCDF4_ import (NetCDF4ArrayWrapper, _chunk_aligned_reads,
+                                   chunk_shape)
 from xray.core.pycompat import iteritems, PY3
 
 from . import TestCase, requires_scipy, requires_netCDF4, requires_pydap
@@ -99,6 +101,78 @@ class DatasetIOTestCases(object):
         with assert_loads(['var1', 'dim1', 'dim2']) as ds:
             ds['var1'].load_data()
 
+    def test_load_variables_subset(self):
+        expected = create_test_data()
+        with self.create_store() as store:
+            expected.dump_to_store(store)
+            opened = []
+            open_store_variable = store.open_store_variable
+
+            def counting_open(var):
+                opened.append(var)
+                return open_store_variable(var)
+            store.open_store_variable = counting_open
+
+            actual = Dataset.load_store(store, variables=['var1'])
+            self.assertDatasetAllClose(expected[['var1']], actual)
+            # unrequested variables are never opened
+            self.assertEqual(3, len(opened))
+
+            actual = Dataset.load_store(store, drop_variables=['var1',
+                                                               'time'])
+            self.assertDatasetAllClose(expected.drop_vars('var1', 'time'),
+                                       actual)
+            with self.assertRaisesRegexp(ValueError, 'not found'):
+                Dataset.load_store(store, variables=['foo'])
+
+    def test_roundtrip_variables_subset(self):
+        expected = create_test_data()
+        with self.roundtrip(expected, variables=['var3']) as actual:
+            self.assertEqual(set(['var3', 'dim1', 'dim3']), set(actual))
+            self.assertDatasetAllClose(
+                expected[['var3']].drop_vars('numbers'), actual)
+        # variables listed in the 'coordinates' attribute are also loaded
+        expected['var3'].attrs['coordinates'] = 'numbers'
+        with self.roundtrip(expected, variables=['var3']) as actual:
+            self.assertEqual(set(['var3', 'dim1', 'dim3', 'numbers']),
+                             set(actual))
+
+    def test_sel_lazy_coordinate(self):
+        times = pd.date_range('2000-01-01', periods=1000, freq='6H')
+        expected = Dataset({'foo': ('time', np.arange(1000.0)),
+                            'bar': ('x', np.arange(5))},
+                           {'time': times, 'x': [4, 3, 2, 1, 0]})
+        with self.roundtrip(expected) as actual:
+            for label in [slice('2000-02-01', '2000-02-10'),
+                          slice('2000-02', None), slice(None, times[10]),
+                          slice('2000-01-01 07:00', '2000-01-02')]:
+                self.assertDatasetIdentical(expected.sel(time=label),
+                                            actual.sel(time=label))
+            # only a few values of the coordinate were read
+            time = actual._arrays['time']
+            self.assertFalse(time._in_memory)
+            self.assertLess(len(time._probes), 100)
+            # decreasing coordinates use the full index
+            self.assertDatasetIdentical(expected.sel(x=slice(3, 1)),
+                                        actual.sel(x=slice(3, 1)))
+
+    def test_sel_lazy_coordinate_not_monotonic(self):
+        expected = Dataset({'foo': ('x', np.arange(9)),
+                            'bar': ('y', np.arange(9))},
+                           {'x': [0, 50, 10, 60, 20, 70, 30, 80, 90],
+                            'y': [0, 1, 2, 2, 2, 2, 2, 3, 4]})
+        with self.roundtrip(expected) as actual:
+            # the loaded coordinate raises, so the lazy search must not
+            # silently find a slice
+            with self.assertRaises(KeyError):
+                expected.sel(x=slice(15, 65))
+            with self.assertRaises(KeyError):
+                actual.sel(x=slice(15, 65))
+            # repeated labels
+            for label in [slice(2, 3), slice(1, 2), slice(2, None)]:
+                self.assertDatasetIdentical(expected.sel(y=label),
+                                            actual.sel(y=label))
+
     def test_roundtrip_None_variable(self):
         expected = Dataset({None: (('x', 'y'), [[0, 1], [2, 3]])})
         with self.roundtrip(expected) as actual:
@@ -227,6 +301,19 @@ class NetCDF4DataTest(DatasetIOTestCases, TestCase):
             with open_dataset(tmp_file, **kwargs) as ds:
                 yield ds
 
+    def test_open_positional_store_arguments(self):
+        expected = create_test_data()
+        with create_tmp_file() as tmp_file:
+            expected.dump(tmp_file)
+            # extra positional arguments are still passed on to the store
+            with open_dataset(tmp_file, True, True, True, True, 'r') as actual:
+                self.assertDatasetAllClose(expected, actual)
+            with open_dataset(tmp_file, True, True, True, True, 'r',
+                              variables=['var1']) as actual:
+                self.assertDatasetAllClose(expected[['var1']], actual)
+            with self.assertRaisesRegexp(ValueError, 'mode'):
+                open_dataset(tmp_file, True, True, True, True, 'x')
+
     def test_open_encodings(self):
         # Create a netCDF file with explicit time units
         # and make sure it makes it into the encodings
@@ -251,6 +338,168 @@ class NetCDF4DataTest(DatasetIOTestCases, TestCase):
                                        if k in expected['time'].encoding)
                 self.assertDictEqual(actual_encoding, expected['time'].encoding)
 
+    def test_chunk_aligned_reads(self):
+        reads = _chunk_aligned_reads(np.array([9, 1, 2, 25, 9]), 30, 4)
+        self.assertEqual([slice(0, 4), slice(8, 12), slice(24, 28)],
+                         [read for read, _, _ in reads])
+        for (_, local, out), expected_local, expected_out in zip(
+                reads, [[1, 2], [1, 1], [1]], [[1, 2], [0, 4], [3]]):
+            self.assertArrayEqual(expected_local, local)
+            self.assertArrayEqual(expected_out, out)
+        reads = _chunk_aligned_reads(slice(None, None, -10), 25, 10)
+        self.assertEqual([slice(0, 10), slice(10, 20), slice(20, 25)],
+                         [read for read, _, _ in reads])
+        self.assertArrayEqual([4, 4, 4], [local[0] for _, local, _ in reads])
+        self.assertArrayEqual([2, 1, 0], [out[0] for _, _, out in reads])
+        # whole chunks are read without gathering values from them
+        reads = _chunk_aligned_reads(slice(2, 10), 30, 4)
+        self.assertEqual([slice(0, 4), slice(4, 8), slice(8, 12)],
+                         [read for read, _, _ in reads])
+        self.assertIsNone(reads[1][1])
+        self.assertEqual([], _chunk_aligned_reads([], 30, 4))
+
+    def test_chunked_getitem_memory(self):
+        values = np.random.randn(40, 10, 10)
+        read_shapes = []
+
+        class RecordingArray(object):
+            shape = values.shape
+            dtype = values.dtype
+            ndim = values.ndim
+
+            def __getitem__(self, key):
+                result = values[key]
+                read_shapes.append(result.shape)
+                return result
+
+        array = NetCDF4ArrayWrapper(RecordingArray(), chunksizes=(40, 2, 2))
+        key = (slice(None, None, 10), slice(None), slice(None))
+        self.assertArrayEqual(values[key], array[key])
+        # each read is a single chunk, not the whole span of chunks
+        self.assertEqual(25, len(read_shapes))
+        self.assertEqual(set([(40, 2, 2)]), set(read_shapes))
+
+        del read_shapes[:]
+        key = (np.array([30, 1]), 3, slice(1, 6, 2))
+        self.assertArrayEqual(values[30, 3, 1:6:2], array[key][0])
+        self.assertArrayEqual(values[1, 3, 1:6:2], array[key][1])
+        self.assertLessEqual(max(np.prod(s) for s in read_shapes), 80)
+
+    def test_read_chunked(self):
+        expected = Dataset({'foo': (('x', 'y'), np.random.randn(20, 30))})
+        expected['foo'].encoding['chunksizes'] = (4, 7)
+        with self.roundtrip(expected) as actual:
+            self.assertEqual((4, 7), actual['foo'].encoding['chunksizes'])
+            for indexers in [{'x': [15, 0, 3, 3], 'y': [29, 8]},
+                             {'x': slice(None, None, 5), 'y': 7},
+                             {'x': slice(1, None, 3), 'y': [0, 1, 2]}]:
+                self.assertDatasetIdentical(expected.isel(**indexers),
+                                            actual.isel(**indexers))
+
+    def test_chunk_shape(self):
+        shape = (3650, 180, 360)
+        self.assertEqual((3650, 8, 8), chunk_shape(shape, 4, 'timeseries'))
+        self.assertEqual((4, 180, 360), chunk_shape(shape, 4, 'spatial'))
+        self.assertEqual((64, 64, 64), chunk_shape(shape, 4, 'balanced'))
+        self.assertEqual((10,), chunk_shape((10,), 8, 'spatial'))
+        self.assertEqual((1, 1, 40, 50),
+                         chunk_shape((20, 5, 40, 50), 4, 'spatial', 10000))
+        with self.assertRaisesRegexp(ValueError, 'chunking must be'):
+            chunk_shape(shape, 4, 'foo')
+
+    def test_write_chunking_and_encoding(self):
+        expected = create_test_data()
+        with create_tmp_file() as tmp_file:
+            expected.to_netcdf(tmp_file, chunking='timeseries',
+                               target_chunk_bytes=80,
+                               encoding={'var2': {'zlib': True,
+                                                  'complevel': 7,
+                                                  'chunksizes': (2, 3)}})
+            with open_dataset(tmp_file) as actual:
+                self.assertDatasetAllClose(expected, actual)
+                self.assertEqual((8, 1), actual['var1'].encoding['chunksizes'])
+                self.assertFalse(actual['var1'].encoding['zlib'])
+                encoding = actual['var2'].encoding
+                self.assertEqual((2, 3), encoding['chunksizes'])
+                self.assertTrue(encoding['zlib'])
+                self.assertEqual(7, encoding['complevel'])
+        with create_tmp_file() as tmp_file:
+            with self.assertRaisesRegexp(ValueError, 'chunking must be'):
+                expected.to_netcdf(tmp_file, chunking='foo')
+            with self.assertRaisesRegexp(ValueError, 'invalid encoding'):
+                expected.to_netcdf(tmp_file, encoding={'var1': {'foo': 1}})
+
+    def test_append_and_region(self):
+        times = pd.date_range('2000-01-01', periods=6, freq='H')
+        expected = Dataset({'foo': (('time', 'x'),
+                                    np.arange(18.0).reshape(6, 3)),
+                            'lat': ('x', [10.0, 20.0, 30.0])},
+                           {'time': times})
+        with create_tmp_file() as tmp_file:
+            expected.isel(time=slice(2)).to_netcdf(tmp_file,
+                                                   append_dim='time')
+            for indexer in [slice(2, 3), slice(3, None)]:
+                expected.isel(time=indexer).to_netcdf(
+                    tmp_file, mode='a', append_dim='time')
+            with open_dataset(tmp_file) as actual:
+                self.assertDatasetIdentical(expected, actual)
+
+            updated = expected.isel(time=slice(1, 3))
+            updated['foo'] = -updated['foo']
+            updated.to_netcdf(tmp_file, mode='a',
+                              region={'time': slice(1, 3)})
+            expected['foo'][1:3] = -expected['foo'][1:3]
+            with open_dataset(tmp_file) as actual:
+                self.assertDatasetIdentical(expected, actual)
+
+            with self.assertRaisesRegexp(ValueError, 'has length'):
+                updated.to_netcdf(tmp_file, mode='a',
+                                  region={'time': slice(0, 3)})
+            with self.assertRaisesRegexp(ValueError, 'not unlimited'):
+                expected.to_netcdf(tmp_file, mode='a', append_dim='x')
+            with self.assertRaisesRegexp(ValueError, 'exactly one'):
+                expected.to_netcdf(tmp_file, mode='a')
+            with self.assertRaisesRegexp(ValueError, "mode='a'"):
+                expected.to_netcdf(tmp_file, region={'time': slice(0, 1)})
+
+            store = backends.NetCDF4DataStore(tmp_file, mode='a')
+            try:
+                variables = {'foo': Variable(('time', 'x'), np.zeros((2, 3))),
+                             'time': Variable('time', [100])}
+                with self.assertRaisesRegexp(ValueError,
+                                             'different lengths'):
+                    store.append(variables, 'time')
+            finally:
+                store.close()
+            with open_dataset(tmp_file) as actual:
+                self.assertDatasetIdentical(expected, actual)
+
+    def test_save_mfdataset(self):
+        original = create_test_data()
+        datasets = [original.isel(dim1=slice(n, n + 2)) for n in [0, 2, 4]]
+        for kwargs in [{}, {'n_workers': 2},
+                       {'n_workers': 2, 'backend': 'process'}]:
+            with create_tmp_file() as tmp1:
+                with create_tmp_file() as tmp2:
+                    with create_tmp_file() as tmp3:
+                        paths = [tmp1, tmp2, tmp3]
+                        reported = []
+                        save_mfdataset(datasets, paths,
+                                       progress=lambda *args:
+                                       reported.append(args), **kwargs)
+                        for expected, path in zip(datasets, paths):
+                            with open_dataset(path) as actual:
+                                self.assertDatasetAllClose(expected, actual)
+                        self.assertEqual(set(paths),
+                                         set(p for p, _, _ in reported))
+                        self.assertEqual([(1, 3), (2, 3), (3, 3)],
+                                         [r[1:] for r in reported])
+
+        with self.assertRaisesRegexp(ValueError, 'but 1 paths'):
+            save_mfdataset(datasets, ['foo.nc'])
+        with self.assertRaisesRegexp(ValueError, 'unique'):
+            save_mfdataset(datasets[:2], ['foo.nc', 'foo.nc'])
+
     def test_open_group(self):
         # Create a netCDF file with a dataset stored within a group
         with create_tmp_file() as tmp_file:
@@ -417,6 +666,14 @@ class ScipyDataTest(DatasetIOTestCases, TestCase):
         with open_dataset(BytesIO(serialized), **kwargs) as ds:
             yield ds
 
+    def test_open_bytes(self):
+        expected = create_test_data()
+        # netCDF3 contents are a byte string, which is a str on Python 2
+        serialized = expected.dumps()
+        self.assertTrue(serialized.startswith(b'CDF'))
+        with open_dataset(serialized) as actual:
+            self.assertDatasetAllClose(expected, actual)
+
 
 @requires_netCDF4
 class NetCDF3ViaNetCDF4DataTest(DatasetIOTestCases, TestCase):
@@ -0,0 +1,92 @@
+import contextlib
+import os.path
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from xray import Dataset, build_catalog, open_catalog, open_dataset, concat
+
+from . import TestCase, requires_netCDF4
+
+
+@contextlib.contextmanager
+def create_tmp_dir():
+    path = tempfile.mkdtemp()
+    try:
+        yield path
+    finally:
+        shutil.rmtree(path)
+
+
+def create_monthly_files(directory, n_files=4):
+    times = pd.date_range('2000-01-01', periods=31 * n_files)
+    datasets = []
+    for n in range(n_files):
+        sub_times = times[31 * n:31 * (n + 1)]
+        ds = Dataset({'foo': (('time', 'x'), np.random.randn(31, 3)),
+                      'bar': ('x', [1, 2, 3])},
+                     {'time': sub_times, 'x': [10, 20, 30]},
+                     attrs={'part': n})
+        ds.dump(os.path.join(directory, 'part%s.nc' % n))
+        datasets.append(ds)
+    return datasets
+
+
+@requires_netCDF4
+class TestCatalog(TestCase):
+    def test_build_catalog(self):
+        with create_tmp_dir() as directory:
+            datasets = create_monthly_files(directory)
+            for n_workers in [None, 2]:
+                catalog = build_catalog(directory, n_workers=n_workers)
+                self.assertEqual(4, len(catalog))
+                self.assertEqual(
+                    [os.path.join(directory, 'part%s.nc' % n)
+                     for n in range(4)], catalog.paths)
+
+            summary = catalog.files[1]
+            self.assertEqual({'time': 31, 'x': 3}, dict(summary.dims))
+            self.assertTrue(datasets[1].indexes['time'].equals(
+                summary.coords['time']))
+            self.assertEqual((('time', 'x'), np.dtype(float)),
+                             summary.variables['foo'])
+            self.assertEqual(1, summary.attrs['part'])
+
+            # save and load the catalog
+            index_path = os.path.join(directory, 'catalog.idx')
+            catalog.save(index_path)
+            loaded = open_catalog(index_path)
+            self.assertEqual(catalog.paths, loaded.paths)
+            self.assertTrue(loaded.files[1].coords['time'].equals(
+                summary.coords['time']))
+
+            # unmodified files are not scanned again
+            updated = build_catalog(directory, previous=loaded)
+            self.assertIs(loaded.files[0], updated.files[0])
+
+    def test_plan_and_open(self):
+        with create_tmp_dir() as directory:
+            datasets = create_monthly_files(directory)
+            catalog = build_catalog(directory)
+            plan = catalog.plan(time=slice('2000-02-15', '2000-03-05'))
+            self.assertEqual([os.path.join(directory, 'part%s.nc' % n)
+                              for n in [1, 2]], list(plan))
+            self.assertEqual({'time': slice(14, 31)},
+                             list(plan.values())[0])
+
+            actual = catalog.open('time', time=slice('2000-02-15',
+                                                     '2000-03-05'))
+            expected = concat(datasets, 'time').sel(
+                time=slice('2000-02-15', '2000-03-05'))
+            self.assertDatasetAllClose(expected, actual)
+
+            actual = catalog.open(time='2000-04-01', x=[20, 30])
+            self.assertDatasetAllClose(
+                datasets[2].sel(time='2000-04-01', x=[20, 30]), actual)
+
+            with self.assertRaisesRegexp(ValueError, 'concat_dim'):
+                catalog.open()
+            with self.assertRaisesRegexp(ValueError, 'no files'):
+                catalog.open(time='2010-01-01')
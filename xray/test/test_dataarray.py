@@ -8,6 +8,12 @@ from xray.core.pycompat import iteritems, OrderedDict
 from . import TestCase, ReturnItem, source_ndarray, unittest
 
 
+def _center(x):
+    if (x.values > 10).any():
+        raise ValueError('too large')
+    return x - x.mean()
+
+
 class TestDataArray(TestCase):
     def setUp(self):
         self.attrs = {'attr1': 'value1', 'attr2': 2929}
@@ -679,6 +685,17 @@ class TestDataArray(TestCase):
         self.assertVariableEqual(self.dv.reduce(np.mean, 'x'),
                                  self.v.reduce(np.mean, 'x'))
 
+    def test_reduce_skipna(self):
+        orig = DataArray([[1, np.nan, 3], [np.nan, np.nan, 6]],
+                         {'x': ['a', 'b']}, dims=['x', 'y'])
+        actual = orig.mean('y', skipna=True)
+        expected = DataArray([2.0, 6.0], {'x': ['a', 'b']}, dims='x')
+        self.assertDataArrayIdentical(expected, actual)
+
+        actual = orig.groupby('x').sum(skipna=True)
+        expected = DataArray([4.0, 6.0], {'x': ['a', 'b']}, dims='x')
+        self.assertDataArrayIdentical(expected, actual)
+
     def test_reduce_keep_attrs(self):
         # Test dropped attrs
         vm = self.va.mean()
@@ -710,6 +727,38 @@ class TestDataArray(TestCase):
         self.assertVariableEqual(expected_unique, grouped.unique_coord)
         self.assertEqual(3, len(grouped))
 
+    def test_groupby_sorted(self):
+        array = self.make_groupby_example_array()
+        array.coords['sorted'] = ('y', np.array(['a'] * 5 + ['b'] * 15))
+        grouped = array.groupby('sorted')
+        self.assertEqual([slice(0, 5), slice(5, 20)], grouped.group_indices)
+        self.assertVariableEqual(Variable('sorted', ['a', 'b']),
+                                 grouped.unique_coord)
+        # groups are views of the original data
+        for _, group in grouped:
+            self.assertIs(source_ndarray(group.values),
+                          source_ndarray(array.values))
+
+        expected = DataArray(np.array([self.x[:, :5].sum(1),
+                                       self.x[:, 5:].sum(1)]).T,
+                             {'x': array['x'], 'sorted': ['a', 'b']},
+                             ['x', 'sorted'])
+        for shortcut in [False, True]:
+            actual = grouped.apply(lambda x: x.sum('y'), shortcut=shortcut)
+            self.assertDataArrayAllClose(expected, actual)
+            actual = grouped.apply(lambda x: x, shortcut=shortcut)
+            self.assertDataArrayIdentical(array, actual)
+
+        times = pd.date_range('2000-01-01', periods=20, freq='6M')
+        array.coords['y'] = times
+        grouped = array.groupby('y.year')
+        self.assertEqual(10, len(grouped))
+        self.assertTrue(all(isinstance(g, slice)
+                            for g in grouped.group_indices))
+        expected = [self.x[:, times.year == year].sum()
+                    for year in range(2000, 2010)]
+        self.assertTrue(np.allclose(expected, grouped.sum()))
+
     def test_groupby_apply_identity(self):
         expected = self.make_groupby_example_array()
         idx = expected.coords['y']
@@ -781,6 +830,24 @@ class TestDataArray(TestCase):
         expected_centered = expected_ds['foo']
         self.assertDataArrayAllClose(expected_centered, grouped.apply(center))
 
+    def test_groupby_apply_parallel(self):
+        array = self.make_groupby_example_array()
+        grouped = array.groupby('abc')
+        for shortcut in [False, True]:
+            expected = grouped.apply(_center, shortcut=shortcut)
+            for backend in ['thread', 'process']:
+                actual = grouped.apply(_center, shortcut=shortcut,
+                                       n_workers=2, backend=backend)
+                self.assertDataArrayIdentical(expected, actual)
+
+        array[0, 10] = 100
+        for backend in ['thread', 'process']:
+            with self.assertRaisesRegexp(ValueError,
+                                         "group 'b': too large"):
+                grouped.apply(_center, n_workers=2, backend=backend)
+        with self.assertRaisesRegexp(ValueError, 'backend must be'):
+            grouped.apply(_center, n_workers=2, backend='foo')
+
     def test_groupby_math(self):
         array = self.make_groupby_example_array()
         for squeeze in [True, False]:
@@ -812,6 +879,264 @@ class TestDataArray(TestCase):
         with self.assertRaisesRegexp(TypeError, 'only support arithmetic'):
             grouped + grouped
 
+    def test_groupby_math_climatology(self):
+        times = pd.date_range('2000-01-01', periods=100, freq='5D')
+        array = DataArray(np.random.randn(100, 3),
+                          {'time': times, 'x': ['a', 'b', 'c']},
+                          ['time', 'x'], name='foo')
+        array.coords['month_start'] = ('time', times.month == 1)
+        grouped = array.groupby('time.month')
+        clim = grouped.mean('time')
+        clim.coords['season'] = ('time.month', ['DJF'] * 2 + ['MAM'] * 3
+                                 + ['JJA'] * 3 + ['SON'] * 3 + ['DJF'])
+
+        actual = grouped - clim
+        self.assertIsNotNone(grouped._expand_other(clim))
+        # compare to applying the operation group by group
+        expected = grouped._concat(grouped._iter_binary_applied(
+            lambda x, y: x - y, clim))
+        self.assertDataArrayIdentical(expected, actual)
+        self.assertTrue(np.allclose(
+            array.values[:7] - clim.sel(**{'time.month': 1}).values,
+            actual.values[:7]))
+
+        ds = array.to_dataset()
+        actual = ds.groupby('time.month') - clim.to_dataset()
+        self.assertDatasetIdentical(expected.to_dataset(), actual)
+
+        # months missing from the climatology
+        grouped = array.groupby('time.month')
+        with self.assertRaises(KeyError):
+            grouped - clim.isel(**{'time.month': slice(6)})
+
+    def test_groupby_multi(self):
+        array = DataArray(np.arange(24.0).reshape(4, 6),
+                          {'x': range(4), 'y': range(6)}, ['x', 'y'],
+                          name='foo')
+        array.coords['kind'] = ('x', ['a', 'b', 'a', 'b'])
+        array.coords['wet'] = ('y', [True, False] * 3)
+        grouped = array.groupby(['kind', 'wet'])
+        self.assertEqual(4, len(grouped))
+
+        expected = DataArray(
+            [[array.values[[0, 2]][:, 1::2].mean(),
+              array.values[[0, 2]][:, ::2].mean()],
+             [array.values[[1, 3]][:, 1::2].mean(),
+              array.values[[1, 3]][:, ::2].mean()]],
+            {'kind': ['a', 'b'], 'wet': [False, True]}, ['kind', 'wet'],
+            name='foo')
+        for actual in [grouped.mean(), grouped.reduce(np.mean),
+                       array.groupby([array['kind'], 'wet']).mean()]:
+            self.assertDataArrayAllClose(expected, actual)
+            self.assertEqual(expected.dims, actual.dims)
+
+        # both groups along one dimension, with a missing combination
+        array.coords['big'] = ('x', [False, True, True, True])
+        grouped = array.groupby(['kind', 'big'])
+        for func in [np.sum, np.max, np.median]:
+            actual = grouped.reduce(func, 'x')
+            self.assertEqual(('y', 'kind', 'big'), actual.dims)
+            self.assertArrayEqual(func(array.values[[0]], 0),
+                                  actual.sel(kind='a', big=False))
+            self.assertArrayEqual(func(array.values[[1, 3]], 0),
+                                  actual.sel(kind='b', big=True))
+            self.assertTrue(actual.sel(kind='b', big=False).isnull().all())
+
+        for (kind, x), sub in array.groupby(['kind', 'x']):
+            self.assertEqual(array['kind'].values[x], kind)
+            self.assertDataArrayIdentical(array.isel(x=[x]), sub)
+
+        grouped = array.groupby(['kind', 'wet'])
+        with self.assertRaisesRegexp(ValueError, 'dim argument'):
+            grouped.mean(axis=0)
+        with self.assertRaisesRegexp(ValueError, 'dimensions'):
+            grouped.mean('z')
+        with self.assertRaises(NotImplementedError):
+            list(grouped)
+
+    def test_groupby_bins(self):
+        array = DataArray(np.arange(12.0).reshape(3, 4),
+                          {'x': [1, 2, 3], 'y': [5, 25, 15, np.nan]},
+                          ['x', 'y'], name='foo')
+        grouped = array.groupby_bins('y', [0, 10, 20, 30])
+        self.assertVariableEqual(
+            Variable('y_bins', ['(0, 10]', '(10, 20]', '(20, 30]']),
+            grouped.unique_coord)
+        # the value outside of all bins is left out
+        expected = DataArray(array.values[:, [0, 2, 1]].sum(0),
+                             {'y_bins': ['(0, 10]', '(10, 20]', '(20, 30]']},
+                             'y_bins', name='foo')
+        self.assertDataArrayIdentical(expected, grouped.sum())
+
+        actual = grouped.apply(lambda x: x)
+        self.assertDataArrayEqual(array.isel(y=[0, 1, 2]),
+                                  actual.reset_coords('y_bins', drop=True))
+        self.assertArrayEqual(['(0, 10]', '(20, 30]', '(10, 20]'],
+                              actual['y_bins'])
+
+        grouped = array.groupby_bins(array['y'], [5, 15, 25], right=False,
+                                     labels=['low', 'high'])
+        self.assertArrayEqual(['low', 'high'], grouped.unique_coord)
+        self.assertEqual([slice(0, 1), slice(1, 2)], grouped.group_indices)
+
+        with self.assertRaisesRegexp(ValueError, 'monotonically increasing'):
+            array.groupby_bins('y', [10, 0])
+        with self.assertRaisesRegexp(ValueError, 'one fewer label'):
+            array.groupby_bins('y', [0, 10], labels=['a', 'b'])
+
+    def test_histogram(self):
+        values = np.random.RandomState(0).randn(3, 50)
+        values[0, 0] = np.nan
+        array = DataArray(values, {'x': ['a', 'b', 'c']}, ['x', 'y'],
+                          name='foo')
+        bins = [-2, -1, 0, 1, 2]
+        actual = array.histogram(bins, dim='y')
+        expected = DataArray(
+            [np.histogram(v[~np.isnan(v) & (v > -2)], bins)[0]
+             for v in values],
+            {'x': ['a', 'b', 'c'],
+             'foo_bins': ['(-2, -1]', '(-1, 0]', '(0, 1]', '(1, 2]']},
+            ['x', 'foo_bins'], name='foo')
+        self.assertDataArrayIdentical(expected, actual)
+        self.assertDataArrayIdentical(expected.sum('x'),
+                                      array.histogram(bins))
+
+        # the same counts as grouping by bins
+        array.coords['z'] = ('y', values[1])
+        grouped = array.groupby_bins('z', bins)
+        self.assertArrayEqual(actual.sel(x='b'),
+                              [len(i) for i in grouped.group_indices])
+
+        with self.assertRaisesRegexp(ValueError, 'dimensions'):
+            array.histogram(bins, dim='z')
+
+    def test_groupby_multidim(self):
+        array = DataArray(np.arange(12.0).reshape(3, 4),
+                          {'x': range(3), 'y': range(4)}, ['x', 'y'])
+        array.coords['mask'] = (('x', 'y'), array.values % 3 == 0)
+        actual = array.groupby('mask').sum()
+        expected = DataArray([array.values[~array['mask'].values].sum(),
+                              array.values[array['mask'].values].sum()],
+                             {'mask': [False, True]}, 'mask')
+        self.assertDataArrayIdentical(expected, actual)
+
+        # the group dimensions may be in a different order
+        mask = array['mask'].T
+        self.assertDataArrayIdentical(expected, array.groupby(mask).sum())
+        self.assertDataArrayIdentical(expected,
+                                      array.T.groupby(mask.T).sum())
+
+    def test_rolling(self):
+        rs = np.random.RandomState(0)
+        values = rs.randn(4, 20)
+        values[values < -1] = np.nan
+        orig = DataArray(values, {'x': range(4), 'y': range(20)},
+                         dims=['x', 'y'], name='foo')
+
+        def brute_force(func, window, min_periods, center):
+            offset = (window - 1) // 2 if center else 0
+            result = np.empty_like(values)
+            for n in range(values.shape[1]):
+                start = max(n + offset - window + 1, 0)
+                x = values[:, start:n + offset + 1]
+                valid = (~np.isnan(x)).sum(axis=1) >= min_periods
+                with np.errstate(invalid='ignore'):
+                    result[:, n] = np.where(valid, func(x, axis=1), np.nan)
+            return result
+
+        for window, min_periods, center in [(1, None, False), (3, None, False),
+                                            (4, 2, True), (5, 1, True),
+                                            (20, 1, False), (25, 5, True)]:
+            if window > 20:
+                with self.assertRaisesRegexp(ValueError, 'min_periods'):
+                    orig.rolling(y=window, min_periods=26)
+            rolling = orig.rolling(y=window, min_periods=min_periods,
+                                   center=center)
+            min_periods = window if min_periods is None else min_periods
+            for name, func in [('sum', np.nansum), ('mean', np.nanmean),
+                               ('min', np.nanmin), ('max', np.nanmax)]:
+                expected = orig.copy()
+                expected.values = brute_force(func, window, min_periods,
+                                              center)
+                actual = getattr(rolling, name)()
+                self.assertDataArrayAllClose(expected, actual)
+
+        actual = orig.rolling(x=2).reduce(np.max)
+        self.assertArrayEqual(np.maximum(values[:-1], values[1:]),
+                              actual.values[1:])
+        self.assertArrayEqual(orig.rolling(y=3).count().values,
+                              brute_force(lambda x, axis: (~np.isnan(x)).sum(
+                                  axis), 3, 0, False))
+
+        with self.assertRaisesRegexp(ValueError, 'exactly one dimension'):
+            orig.rolling(x=2, y=2)
+        with self.assertRaisesRegexp(ValueError, 'not found'):
+            orig.rolling(z=2)
+        with self.assertRaisesRegexp(ValueError, 'positive'):
+            orig.rolling(x=0)
+
+    def test_rolling_inf_and_large_values(self):
+        # a value only affects the windows that contain it
+        array = DataArray([1, np.inf, 1, 1, 1, 1], dims='x')
+        self.assertArrayEqual([np.nan, np.inf, np.inf, 2, 2, 2],
+                              array.rolling(x=2).sum().values)
+        self.assertArrayEqual([np.nan, np.inf, np.inf, 1, 1, 1],
+                              array.rolling(x=2).mean().values)
+
+        array = DataArray([1e16, 1, 1, 1, 1], dims='x')
+        self.assertArrayEqual([np.nan, 1e16, 2, 2, 2],
+                              array.rolling(x=2).sum().values)
+        self.assertArrayEqual([np.nan, 5e15, 1, 1, 1],
+                              array.rolling(x=2).mean().values)
+
+        array = DataArray([1, -np.inf, 2, np.inf, 3, 4], dims='x')
+        self.assertArrayEqual([np.nan, np.nan, -np.inf, np.nan, np.inf, np.inf],
+                              array.rolling(x=3).sum().values)
+        array = DataArray([0.1, 1e20, -1e20, 0.1, 0.1], dims='x')
+        self.assertArrayEqual([np.nan, 1e20, 0, -1e20, 0.2],
+                              array.rolling(x=2).sum().values)
+
+        array = DataArray([1, 2, np.nan, 4, 1e16, 6], dims='x')
+        self.assertArrayEqual([1, 3, 2, 4, 1e16 + 4, 1e16 + 6],
+                              array.rolling(x=2, min_periods=1).sum().values)
+
+    def test_resample(self):
+        times = pd.date_range('2000-01-01', freq='6H', periods=10)
+        array = DataArray(np.arange(10.0), [('time', times)])
+        array[3] = np.nan
+
+        actual = array.resample('1D')
+        expected = DataArray([np.nan, 5.5, 8.5],
+                             [('time', pd.date_range('2000-01-01', freq='D',
+                                                     periods=3))])
+        self.assertDataArrayIdentical(expected, actual)
+
+        series = array.to_series()
+        for how in ['sum', 'mean', 'min', 'max', 'count']:
+            actual = array.resample('12H', how=how, skipna=True,
+                                    closed='right', label='right')
+            expected = series.resample('12H', how=how, closed='right',
+                                       label='right')
+            self.assertDataArrayAllClose(DataArray.from_series(expected),
+                                         actual)
+
+        actual = array.resample('12H', how='std', skipna=True)
+        expected = [0.5, 0, 0.5, 0.5, 0.5]
+        self.assertArrayEqual(expected, actual)
+        actual = array.resample('1D', how='first')
+        self.assertArrayEqual([0, 4, 8], actual)
+        actual = array.resample('1D', how='last')
+        self.assertArrayEqual([np.nan, 7, 9], actual)
+        actual = array.resample('6H', how=lambda x, axis: x.sum(axis=axis) + 1)
+        self.assertDataArrayIdentical(array + 1, actual)
+
+        array = DataArray(np.arange(10), [('time', times[::-1])])
+        with self.assertRaisesRegexp(ValueError, 'monotonically'):
+            array.resample('1D')
+        array = DataArray(np.arange(10), [('time', np.arange(10))])
+        with self.assertRaisesRegexp(TypeError, 'datetime'):
+            array.resample('1D')
+
     def test_concat(self):
         self.ds['bar'] = Variable(['x', 'y'], np.random.randn(10, 20))
         foo = self.ds['foo']
@@ -862,6 +1187,18 @@ class TestDataArray(TestCase):
         self.assertDataArrayIdentical(expected_da,
                                       DataArray.from_series(actual))
 
+    def test_from_series_sparse(self):
+        index = pd.MultiIndex.from_arrays([[1, 0, 1], list('bab')],
+                                          names=['x', 'y'])
+        series = pd.Series([1.0, 2.0, 3.0], index=index, name='foo')
+        with self.assertRaisesRegexp(ValueError, 'non-unique'):
+            DataArray.from_series(series, sparse=True)
+        series = series.iloc[:2]
+        actual = DataArray.from_series(series, sparse=True)
+        self.assertTrue(actual.variable._is_sparse)
+        self.assertDataArrayIdentical(DataArray.from_series(series), actual)
+        self.assertTrue(series.equals(actual.to_series()))
+
     def test_to_dataset(self):
         unnamed = DataArray([1, 2], dims='x')
         actual = unnamed.to_dataset()
@@ -1,5 +1,6 @@
 from copy import copy, deepcopy
 from textwrap import dedent
+import warnings
 try:
     import cPickle as pickle
 except ImportError:
@@ -8,7 +9,8 @@ except ImportError:
 import numpy as np
 import pandas as pd
 
-from xray import align, concat, backends, Dataset, DataArray, Variable
+from xray import (align, concat, backends, set_options, Dataset, DataArray,
+                  Variable)
 from xray.core import indexing, utils
 from xray.core.pycompat import iteritems, OrderedDict
 
@@ -712,6 +714,45 @@ class TestDataset(TestCase):
         actual = data[['time.dayofyear']]
         self.assertDatasetEqual(expected, actual)
 
+    def test_virtual_variables_cached(self):
+        data = create_test_data()
+        expected = data['time.month'].values.copy()
+        cache = data._arrays['time']._components['month']
+        data['time.month']
+        self.assertIs(cache, data._arrays['time']._components['month'])
+        # the cache is shared by shallow copies
+        copied = data.copy()
+        copied['time.month']
+        self.assertIs(cache, copied._arrays['time']._components['month'])
+
+        # virtual variables can be modified without changing the cache
+        month = data['time.month']
+        month += 1
+        self.assertArrayEqual(month.values, expected + 1)
+        data['month'] = data['time.month']
+        data['month'][0] = 7
+        self.assertEqual(7, data['month'].values[0])
+        self.assertArrayEqual(cache, expected)
+        self.assertArrayEqual(data['time.month'].values, expected)
+
+        # replacing the time coordinate invalidates the cache
+        data['time'] = pd.date_range('2000-06-01', periods=20)
+        self.assertArrayEqual(data['time.month'].values, 6)
+        data._arrays['time'].values = pd.date_range('2000-12-01', periods=20)
+        self.assertArrayEqual(data['time.month'].values, 12)
+
+        # virtual variables are listed based on dtypes
+        data['t0'] = ((), np.datetime64('2000-01-01'))
+        data['n0'] = ((), 0)
+        self.assertIn('t0.year', data.virtual_variables)
+        self.assertNotIn('n0.year', data.virtual_variables)
+        self.assertNotIn('dim1.year', data.virtual_variables)
+        self.assertEqual(2000, data['t0.year'])
+        with self.assertRaises(KeyError):
+            data['dim1.year']
+        with self.assertRaises(KeyError):
+            data['time.foo']
+
     def test_slice_virtual_variable(self):
         data = create_test_data()
         self.assertVariableEqual(data['time.dayofyear'][:10],
@@ -816,10 +857,20 @@ class TestDataset(TestCase):
             self.assertVariableEqual(data['var2'][n], sub['var2'])
             self.assertVariableEqual(data['var3'][:, n], sub['var3'])
 
+    def test_groupby_apply_parallel(self):
+        data = create_test_data()
+        grouped = data.groupby('dim1')
+        func = lambda ds: ds.mean('dim2')
+        expected = grouped.apply(func)
+        actual = grouped.apply(func, n_workers=3)
+        self.assertDatasetIdentical(expected, actual)
+
     def test_groupby_errors(self):
         data = create_test_data()
-        with self.assertRaisesRegexp(ValueError, 'must be 1 dimensional'):
-            data.groupby('var1')
+        with self.assertRaisesRegexp(ValueError, 'do not match'):
+            data.groupby(['dim1', data['dim2'][:3]])
+        with self.assertRaisesRegexp(ValueError, 'must be unique'):
+            data.groupby(['dim1', 'dim1'])
         with self.assertRaisesRegexp(ValueError, 'must have a name'):
             data.groupby(np.arange(10))
         with self.assertRaisesRegexp(ValueError, 'length does not match'):
@@ -827,6 +878,52 @@ class TestDataset(TestCase):
         with self.assertRaisesRegexp(ValueError, "must have a 'dims'"):
             data.groupby(data.coords['dim1'].to_index())
 
+    def test_groupby_bins(self):
+        data = Dataset({'a': (('x', 'y'), np.random.randn(4, 3)),
+                        'b': ('y', [1, 2, 3])},
+                       {'elevation': ('x', [120, 40, 310, 90])})
+        grouped = data.groupby_bins('elevation', [0, 100, 200, 300])
+        self.assertEqual(2, len(grouped))
+        # positions are counted after leaving out values outside of all bins
+        self.assertArrayEqual([1, 2], grouped.groups['(0, 100]'])
+        self.assertArrayEqual([0], grouped.groups['(100, 200]'])
+        actual = grouped.mean()
+        expected = Dataset({'a': ('elevation_bins',
+                                  [data['a'].values[[1, 3]].mean(),
+                                   data['a'].values[0].mean()]),
+                            'b': 2.0},
+                           {'elevation_bins': ['(0, 100]', '(100, 200]']})
+        self.assertDatasetAllClose(expected, actual)
+
+    def test_groupby_multi(self):
+        data = Dataset({'a': (('x', 'y'), np.random.randn(4, 3)),
+                        'b': ('x', np.random.randn(4)),
+                        'c': ('y', [1, 2, 3]),
+                        'd': ('y', ['e', 'f', 'g'])},
+                       {'x': range(4), 'y': range(3),
+                        'kind': ('x', ['p', 'q', 'p', 'q'])})
+        data.coords['odd'] = data['x'] % 2
+        actual = data.groupby(['kind', 'odd']).mean('x')
+        a = np.empty((3, 2, 2))
+        a.fill(np.nan)
+        a[:, 0, 0] = data['a'].values[[0, 2]].mean(0)
+        a[:, 1, 1] = data['a'].values[[1, 3]].mean(0)
+        b = np.array([[data['b'].values[[0, 2]].mean(), np.nan],
+                      [np.nan, data['b'].values[[1, 3]].mean()]])
+        expected = Dataset({'a': (('y', 'kind', 'odd'), a),
+                            'b': (('kind', 'odd'), b),
+                            'c': ('y', [1, 2, 3]),
+                            'd': ('y', ['e', 'f', 'g'])},
+                           {'y': range(3), 'kind': ['p', 'q'],
+                            'odd': [0, 1]})
+        self.assertDatasetAllClose(expected, actual)
+
+        # variables without the grouped dimension are reduced as usual
+        actual = data.groupby(['kind', 'odd']).mean()
+        self.assertEqual(data['c'].mean(), actual['c'])
+        self.assertNotIn('d', actual)
+        self.assertEqual(('kind', 'odd'), actual['a'].dims)
+
     def test_groupby_reduce(self):
         data = Dataset({'xy': (['x', 'y'], np.random.randn(3, 4)),
                         'xonly': ('x', np.random.randn(3)),
@@ -847,6 +944,41 @@ class TestDataset(TestCase):
         actual = data.groupby('letters').mean()
         self.assertDatasetAllClose(expected, actual)
 
+    def test_resample(self):
+        times = pd.date_range('2000-01-01', freq='6H', periods=10)
+        ds = Dataset({'foo': (['time', 'x'], np.random.randn(10, 3)),
+                      'bar': ('time', np.arange(10), {'units': 'm'}),
+                      'baz': ('x', np.arange(3)),
+                      'strings': ('time', list('abcdefghij')),
+                      'time': times})
+        ds.coords['numbers'] = ('time', np.arange(10))
+
+        actual = ds.resample('1D', dim='time')
+        expected = Dataset({'foo': (['time', 'x'],
+                                    [ds['foo'][:4].mean('time').values,
+                                     ds['foo'][4:8].mean('time').values,
+                                     ds['foo'][8:].mean('time').values]),
+                            'bar': ('time', [1.5, 5.5, 8.5]),
+                            'baz': ds['baz'],
+                            'time': pd.date_range('2000-01-01', freq='D',
+                                                  periods=3)})
+        self.assertDatasetAllClose(expected, actual)
+
+        actual = ds.resample('1D', how='max', keep_attrs=True)
+        self.assertArrayEqual([3, 7, 9], actual['bar'])
+        self.assertEqual(actual['bar'].attrs, {'units': 'm'})
+
+        # empty bins are filled with missing values
+        actual = ds.isel(time=[0, 9]).resample('1D', how='sum')
+        self.assertArrayEqual([0, np.nan, 9], actual['bar'])
+        actual = ds.isel(time=[0, 9]).resample('1D', how='count')
+        self.assertArrayEqual([1, 0, 1], actual['bar'])
+
+        with self.assertRaisesRegexp(ValueError, 'not found'):
+            ds.resample('1D', dim='foo')
+        with self.assertRaisesRegexp(ValueError, 'invalid resampling'):
+            ds.resample('1D', how='foo')
+
     def test_groupby_math(self):
         reorder_dims = lambda x: x.transpose('dim1', 'dim2', 'dim3', 'time')
 
@@ -1019,6 +1151,118 @@ class TestDataset(TestCase):
         expected = Dataset()
         self.assertDatasetIdentical(expected, actual)
 
+    def test_from_dataframe_sparse_multiindex(self):
+        # rows are out of order and some combinations of labels are missing
+        index = pd.MultiIndex.from_arrays([[1, 0, 0, 1], ['b', 'a', 'c', 'a']],
+                                          names=['x', 'y'])
+        df = pd.DataFrame({'i': [1, 2, 3, 4], 'f': [0.5, 1.5, 2.5, 3.5],
+                           'o': list('wxyz')}, index=index)
+        actual = Dataset.from_dataframe(df)
+        expected = Dataset({'i': (('x', 'y'), [[2, np.nan, 3],
+                                               [4, 1, np.nan]]),
+                            'f': (('x', 'y'), [[1.5, np.nan, 2.5],
+                                               [3.5, 0.5, np.nan]]),
+                            'o': (('x', 'y'), np.array([['x', np.nan, 'y'],
+                                                        ['z', 'w', np.nan]],
+                                                       dtype=object)),
+                            'x': [0, 1], 'y': list('abc')})
+        self.assertDatasetIdentical(expected, actual)
+        self.assertEqual(actual['i'].dtype, float)
+        self.assertEqual(actual['o'].dtype, object)
+
+        # a complete index doesn't need to promote dtypes
+        index = pd.MultiIndex.from_arrays([[1, 0, 1, 0], ['b', 'a', 'a', 'b']],
+                                          names=['x', 'y'])
+        df = pd.DataFrame({'i': [1, 2, 3, 4]}, index=index)
+        actual = Dataset.from_dataframe(df)
+        self.assertEqual(actual['i'].dtype, df['i'].dtype)
+        self.assertArrayEqual(actual['i'], [[2, 4], [3, 1]])
+
+        df = pd.DataFrame({'i': [1, 2]}, index=pd.MultiIndex.from_arrays(
+            [[0, 0], [1, 1]], names=['x', 'y']))
+        with self.assertRaisesRegexp(ValueError, 'non-unique MultiIndex'):
+            Dataset.from_dataframe(df)
+
+    def test_from_dataframe_sparse(self):
+        index = pd.MultiIndex.from_arrays([[1, 0, 0, 1, 2], list('bacac')],
+                                          names=['x', 'y'])
+        df = pd.DataFrame(OrderedDict([('i', [1, 2, 3, 4, 5]),
+                                       ('f', [0.5, 1.5, np.nan, 3.5, 4.0])]),
+                          index=index)
+        dense = Dataset.from_dataframe(df)
+        actual = Dataset.from_dataframe(df, sparse=True)
+        self.assertTrue(all(actual[k].variable._is_sparse for k in ['i', 'f']))
+        self.assertDatasetIdentical(dense, actual)
+
+        # indexing and reductions don't need to convert the data
+        selected = actual.isel(x=[2, 0])
+        self.assertTrue(selected['i'].variable._is_sparse)
+        self.assertDatasetIdentical(dense.isel(x=[2, 0]), selected)
+        self.assertDatasetIdentical(dense.sel(y='a'), actual.sel(y='a'))
+        self.assertDataArrayIdentical(dense['f'].transpose(),
+                                      actual['f'].transpose())
+        self.assertDataArrayIdentical(
+            DataArray([5, 0.5, 4], [('y', list('abc'))], name='f'),
+            actual['f'].sum('x', skipna=True))
+        self.assertEqual(actual['f'].mean(skipna=True), 2.375)
+
+        # reductions give the same results as for dense data
+        for name in ['sum', 'mean', 'prod', 'min', 'max']:
+            for dim in [None, 'x', 'y']:
+                for skipna in [True, False]:
+                    with warnings.catch_warnings():
+                        warnings.simplefilter('ignore', RuntimeWarning)
+                        expected = getattr(dense, name)(dim, skipna=skipna)
+                        result = getattr(actual, name)(dim, skipna=skipna)
+                    self.assertDatasetAllClose(expected, result)
+
+        # only stored values are included when converting back
+        actual_df = actual.to_dataframe()
+        self.assertEqual(len(actual_df), 5)
+        self.assertTrue(df.equals(actual_df))
+        self.assertTrue(df['i'].equals(actual['i'].to_series()))
+
+        # variables without sparse data are broadcast against the full index
+        actual['z'] = ('x', [1, 2, 3])
+        self.assertEqual(len(actual.to_dataframe()), 9)
+
+    def test_to_dataframe_broadcast(self):
+        ds = Dataset({'a': (('x', 'y'), np.arange(6).reshape(2, 3)),
+                      'b': ('y', [10, 20, 30]),
+                      'c': ('x', [0.5, 1.5]),
+                      'd': ((), 'scalar')})
+        ds = ds.transpose('y', 'x')
+        actual = ds.to_dataframe()
+        exp_index = pd.MultiIndex.from_arrays(
+            [[0, 0, 0, 1, 1, 1], [0, 1, 2, 0, 1, 2]], names=['x', 'y'])
+        expected = pd.DataFrame(
+            OrderedDict([('a', np.arange(6)),
+                         ('b', [10, 20, 30] * 2),
+                         ('c', [0.5] * 3 + [1.5] * 3),
+                         ('d', ['scalar'] * 6)]),
+            index=exp_index)
+        self.assertArrayEqual(expected.index.values, actual.index.values)
+        for k in expected:
+            self.assertArrayEqual(expected[k].values, actual[k].values)
+
+    def test_iter_dataframes(self):
+        ds = create_test_data().drop_vars('time')
+        expected = ds.to_dataframe()
+        for chunksize in [1, 3, 8, 100]:
+            chunks = list(ds.iter_dataframes(chunksize))
+            self.assertEqual(len(chunks), int(np.ceil(8.0 / chunksize)))
+            actual = pd.concat(chunks)
+            self.assertArrayEqual(expected.index.values, actual.index.values)
+            self.assertArrayEqual(expected.values, actual.values)
+        chunks = list(ds.iter_dataframes(5, dim='dim3'))
+        self.assertEqual(len(chunks), 2)
+        self.assertEqual(len(expected), sum(len(df) for df in chunks))
+        # invalid arguments raise when called, not when iterated over
+        with self.assertRaisesRegexp(ValueError, 'positive integer'):
+            ds.iter_dataframes(0)
+        with self.assertRaisesRegexp(ValueError, 'not found'):
+            ds.iter_dataframes(5, dim='foo')
+
     def test_pickle(self):
         data = create_test_data()
         roundtripped = pickle.loads(pickle.dumps(data))
@@ -1040,6 +1284,12 @@ class TestDataset(TestCase):
             # these should not raise UnexpectedDataAccess:
             ds.isel(time=10)
             ds.isel(time=slice(10), dim1=[0]).isel(dim1=0, dim2=-1)
+            ds.transpose()
+            ds.isel(time=slice(1)).squeeze()
+            ds.transpose().isel(dim1=0, dim2=[0, 1])
+            with set_options(display_values=False):
+                self.assertIn('var1     (dim1, dim2) float64 ...', repr(ds))
+                self.assertIn('values with dtype=float64', repr(ds['var1']))
 
     def test_reduce(self):
         data = create_test_data()
@@ -1064,6 +1314,14 @@ class TestDataset(TestCase):
 
         self.assertDatasetEqual(data.mean(dim=[]), data)
 
+    def test_reduce_skipna(self):
+        data = Dataset({'a': ('x', [1.0, np.nan, 3.0]), 'b': ('x', [1, 2, 3]),
+                        'c': ('y', ['a', 'b'])})
+        actual = data.max(skipna=True)
+        expected = Dataset({'a': 3.0, 'b': 3})
+        self.assertDatasetIdentical(expected, actual)
+        self.assertTrue(np.isnan(data.max()['a'].values))
+
     def test_reduce_bad_dim(self):
         data = create_test_data()
         with self.assertRaisesRegexp(ValueError, 'Dataset does not contain'):
@@ -1228,6 +1486,23 @@ class TestDataset(TestCase):
 
         self.assertDatasetIdentical(ds == ds, ds.notnull())
 
+    def test_dataset_math_shared_coords(self):
+        ds = Dataset({'foo': ('x', [1.0, 2.0])}, {'x': [0, 1]})
+        ds.coords['lazy'] = ('x', indexing.LazilyIndexedArray(
+            InaccessibleArray(np.array([10, 20]))))
+        # coordinates shared by both operands are never compared
+        actual = (ds - ds) / (ds + 1)
+        self.assertIs(actual._arrays['lazy'], ds._arrays['lazy'])
+        actual = ds['foo'] * ds['foo']
+        self.assertIs(actual._dataset._arrays['lazy'], ds._arrays['lazy'])
+        ds += ds
+        self.assertArrayEqual(ds['foo'], [2, 4])
+        # but different coordinates are still compared
+        other = ds.copy()
+        other.coords['lazy'] = ('x', [10, 20])
+        with self.assertRaises(UnexpectedDataAccess):
+            ds + other
+
     def test_dataset_math_errors(self):
         ds = self.make_example_math_dataset()
 
@@ -1247,6 +1522,55 @@ class TestDataset(TestCase):
             actual += other
         self.assertDatasetIdentical(actual, ds)
 
+    def test_dataset_inplace_math(self):
+        ds = Dataset(OrderedDict([('a', ('x', np.arange(3.0))),
+                                  ('b', ('x', np.arange(3)))]))
+        a_data = ds['a'].values
+        ds += 1
+        # data is modified in-place, without copies
+        self.assertIs(a_data, ds['a'].values)
+        self.assertArrayEqual(a_data, [1, 2, 3])
+
+        # all variables are checked before any data is modified
+        expected = ds.copy(deep=True)
+        with self.assertRaises(TypeError):
+            ds += 0.5
+        self.assertDatasetIdentical(expected, ds)
+        with self.assertRaises(ValueError):
+            ds += np.ones(2)
+        with self.assertRaises(ValueError):
+            ds += Dataset({'a': ('y', [0.5]), 'b': ('x', [1, 2, 3])})
+        self.assertDatasetIdentical(expected, ds)
+
+        with set_options(transactional_inplace=True):
+            ds += ds
+        self.assertIsNot(a_data, ds['a'].values)
+        self.assertDatasetIdentical(2 * expected, ds)
+
+    def test_dataset_inplace_math_aliasing(self):
+        ds = Dataset({'a': ('x', np.arange(3.0))})
+        array = ds['a']
+        copied = ds.copy()
+        # DataArrays and shallow copies share the data that is modified
+        ds += 1
+        self.assertArrayEqual(array.values, [1, 2, 3])
+        self.assertArrayEqual(copied['a'].values, [1, 2, 3])
+        with set_options(transactional_inplace=True):
+            ds += 1
+        self.assertArrayEqual(ds['a'].values, [2, 3, 4])
+        self.assertArrayEqual(array.values, [1, 2, 3])
+
+    def test_dataset_inplace_math_duplicate_dims(self):
+        ds = Dataset({'a': (('x', 'x'), np.eye(3))})
+        expected = ds.copy(deep=True)
+        for transactional in [False, True]:
+            with set_options(transactional_inplace=transactional):
+                with self.assertRaisesRegexp(ValueError, 'duplicate'):
+                    ds += ds
+            self.assertDatasetIdentical(expected, ds)
+        with self.assertRaisesRegexp(ValueError, 'duplicate'):
+            ds + ds
+
     def test_dataset_transpose(self):
         ds = Dataset({'a': (('x', 'y'), np.random.randn(3, 4)),
                       'b': (('y', 'x'), np.random.randn(4, 3))})
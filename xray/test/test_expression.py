@@ -0,0 +1,63 @@
+import numpy as np
+
+from xray import evaluate, Dataset
+from . import TestCase, requires_numexpr
+
+
+class TestEvaluate(TestCase):
+    def setUp(self):
+        self.ds = Dataset({'a': (('x', 'y'), np.random.randn(30, 40)),
+                           'b': ('y', np.random.randn(40)),
+                           'c': ('x', np.arange(30)),
+                           'd': (('y', 'x'), np.random.randn(40, 30))},
+                          {'x': np.arange(30), 'y': np.arange(40) * 0.5,
+                           'z': ('x', np.arange(30) ** 2)})
+
+    def check_engine(self, engine, **kwargs):
+        ds = self.ds
+        actual = evaluate('a * b + c - d / 2', ds, engine=engine, **kwargs)
+        expected = ds['a'] * ds['b'] + ds['c'] - ds['d'] / 2
+        self.assertDataArrayAllClose(expected.rename(None), actual)
+
+        # dimensions are ordered by appearance in the expression
+        actual = evaluate('b * c', ds, engine=engine, **kwargs)
+        expected = ds['b'] * ds['c']
+        self.assertEqual(('y', 'x'), actual.dims)
+        self.assertDataArrayAllClose(expected.rename(None), actual)
+
+        actual = evaluate('-c ** 2 + 0.5 * z', ds, engine=engine, **kwargs)
+        self.assertArrayEqual(-ds['c'].values ** 2 + 0.5 * ds['z'].values,
+                              actual.values)
+        self.assertEqual(['x', 'z'], sorted(actual.coords))
+
+        # true division and comparisons
+        actual = evaluate('c / 2', ds, engine=engine, **kwargs)
+        self.assertArrayEqual(np.arange(30) / 2.0, actual.values)
+        actual = evaluate('(c > 5) & (c <= 10)', ds, engine=engine, **kwargs)
+        self.assertArrayEqual((ds['c'] > 5) & (ds['c'] <= 10), actual)
+
+        # a DataArray has its coordinates available
+        actual = evaluate('a * z', ds['a'], engine=engine, **kwargs)
+        self.assertArrayEqual(ds['a'] * ds['z'], actual)
+
+    def test_numpy(self):
+        for block_size in [1, 100, 65536]:
+            self.check_engine('numpy', block_size=block_size)
+
+    @requires_numexpr
+    def test_numexpr(self):
+        self.check_engine('numexpr')
+
+    def test_errors(self):
+        with self.assertRaisesRegexp(ValueError, 'unsupported syntax'):
+            evaluate('abs(a)', self.ds)
+        with self.assertRaisesRegexp(ValueError, 'unsupported syntax'):
+            evaluate('a.T', self.ds)
+        with self.assertRaisesRegexp(ValueError, 'unsupported'):
+            evaluate('a + "foo"', self.ds)
+        with self.assertRaisesRegexp(ValueError, 'invalid expression'):
+            evaluate('a +', self.ds)
+        with self.assertRaisesRegexp(ValueError, 'not found'):
+            evaluate('a + e', self.ds)
+        with self.assertRaisesRegexp(ValueError, 'engine must be'):
+            evaluate('a', self.ds, engine='foo')
@@ -1,7 +1,8 @@
 import numpy as np
 import pandas as pd
 
-from xray.core import formatting
+from xray import set_options, Variable
+from xray.core import formatting, indexing, utils
 from xray.core.pycompat import PY3
 
 from . import TestCase
@@ -36,6 +37,37 @@ class TestFormatting(TestCase):
         with self.assertRaisesRegexp(ValueError, 'at least one item'):
             formatting.first_n_items(array, 0)
 
+    def test_preview_items(self):
+        class CountingArray(utils.NDArrayMixin):
+            def __init__(self, array):
+                self.array = array
+                self.count = 0
+
+            def __getitem__(self, key):
+                self.count += 1
+                return self.array[key]
+
+        counting = CountingArray(np.arange(100).reshape(10, 10))
+        var = Variable(('x', 'y'), indexing.LazilyIndexedArray(counting))
+        for n in [10, 3, 10, 13]:
+            actual = formatting.preview_items(var, n)
+            self.assertArrayEqual(np.arange(n), actual)
+        # the second and third calls used the cached preview
+        self.assertEqual(counting.count, 2)
+
+        var[0, 0] = -1
+        self.assertArrayEqual([-1, 1, 2], formatting.preview_items(var, 3))
+
+    def test_set_options(self):
+        var = Variable('x', indexing.LazilyIndexedArray(np.arange(3)))
+        with set_options(display_values=False):
+            actual = formatting.summarize_var('foo', var, 10)
+            self.assertEqual('    foo   (x) int64 ...', actual)
+        actual = formatting.summarize_var('foo', var, 10)
+        self.assertEqual('    foo   (x) int64 0 1 2', actual)
+        with self.assertRaisesRegexp(ValueError, 'invalid options'):
+            set_options(not_an_option=True)
+
     def test_format_item(self):
         cases = [
             (pd.Timestamp('2000-01-01T12'), '2000-01-01T12:00:00'),
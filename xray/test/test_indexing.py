@@ -118,3 +118,29 @@ class TestLazyArray(TestCase):
             actual = lazy[i][j]
             self.assertEqual(expected.shape, actual.shape)
             self.assertArrayEqual(expected, actual)
+
+    def test_lazily_transposed_array(self):
+        x = variable.NumpyArrayAdapter(np.random.rand(10, 20, 30))
+        lazy = indexing.LazilyIndexedArray(x)
+        I = ReturnItem()
+        indexers = [I[:], 0, -2, I[:3], [0, 1, 2, 3], np.arange(10) < 5]
+        for axes in [(0, 1, 2), (2, 0, 1), (1, 2, 0), (2, 1, 0)]:
+            transposed = indexing.LazilyTransposedArray(lazy, axes)
+            expected_all = np.asarray(x).transpose(axes)
+            self.assertEqual(expected_all.shape, transposed.shape)
+            self.assertArrayEqual(expected_all, transposed)
+            for i in indexers:
+                for j in indexers:
+                    expected = variable.NumpyArrayAdapter(expected_all)[i, j]
+                    actual = transposed[i, j]
+                    self.assertEqual(expected.shape, actual.shape)
+                    self.assertArrayEqual(expected, actual)
+            # indexing should not trigger loading the source data
+            self.assertIsInstance(transposed[0, :3],
+                                  (indexing.LazilyIndexedArray,
+                                   indexing.LazilyTransposedArray))
+        # transposing twice should compose the permutations
+        twice = indexing.LazilyTransposedArray(
+            indexing.LazilyTransposedArray(lazy, (2, 0, 1)), (2, 0, 1))
+        self.assertIs(twice.array, lazy)
+        self.assertArrayEqual(np.asarray(x).transpose(1, 2, 0), twice)
@@ -0,0 +1,130 @@
+import multiprocessing
+import pickle
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from xray import (Dataset, pack_dataset, unpack_dataset, publish_dataset,
+                  attach_dataset)
+from xray.core.serialization import (to_buffers, from_buffers, packed_size,
+                                     pack_dataset_into)
+
+from . import TestCase, requires_shared_memory
+from .test_dataset import create_test_data
+
+
+def create_mixed_data():
+    ds = Dataset({'foo': (('x', 'y'), np.random.randn(4, 5)),
+                  'ints': ('x', np.arange(4, dtype=np.int64)),
+                  'objects': ('x', np.array(['a', 'bc', None, 'd'],
+                                            dtype=object)),
+                  'scalar': ((), 3.5)},
+                 {'x': [10, 20, 30, 40],
+                  'y': pd.date_range('2000-01-01', periods=5),
+                  'letters': ('x', list('abcd'))},
+                 attrs={'title': 'test data'})
+    ds['foo'].attrs['units'] = 'meters'
+    ds['foo'].encoding['zlib'] = True
+    return ds
+
+
+def _sum_shared(name):
+    ds = attach_dataset(name)
+    try:
+        return float(ds['foo'].sum()), ds['foo'].values.flags.writeable
+    finally:
+        ds.close()
+
+
+class TestSerialization(TestCase):
+    def test_buffers_roundtrip(self):
+        for expected in [create_test_data(), create_mixed_data()]:
+            header, buffers = to_buffers(expected)
+            actual = from_buffers(header, buffers)
+            self.assertDatasetIdentical(expected, actual)
+            for k, v in expected.items():
+                self.assertEqual(v.encoding, actual[k].encoding)
+
+    def test_buffers_zero_copy(self):
+        original = create_mixed_data()
+        header, buffers = to_buffers(original)
+        # only the object array is in the header
+        self.assertEqual(len(original) - 1, len(buffers))
+        self.assertTrue(all(b.dtype == np.uint8 and b.ndim == 1
+                            for b in buffers))
+        for info in header['variables']:
+            if info['name'] in ['foo', 'ints']:
+                self.assertTrue(np.may_share_memory(
+                    buffers[info['buffer']], original[info['name']].values))
+
+        actual = from_buffers(header, buffers)
+        actual['foo'].values[0, 0] = 1000
+        self.assertEqual(1000, original['foo'].values[0, 0])
+
+    def test_pack_unpack(self):
+        expected = create_mixed_data()
+        packed = pack_dataset(expected)
+        self.assertIsInstance(packed, bytearray)
+        self.assertEqual(packed_size(expected), len(packed))
+        actual = unpack_dataset(packed)
+        self.assertDatasetIdentical(expected, actual)
+        self.assertEqual(np.int64, actual['ints'].dtype)
+        # values are views of the packed data
+        actual['foo'].values[0, 0] = 1000
+        self.assertEqual(1000, unpack_dataset(packed)['foo'].values[0, 0])
+
+        actual = unpack_dataset(bytes(packed))
+        self.assertDatasetIdentical(unpack_dataset(packed), actual)
+        self.assertFalse(actual['foo'].values.flags.writeable)
+
+    def test_pack_into(self):
+        expected = create_test_data()
+        size = packed_size(expected)
+        target = bytearray(size + 100)
+        self.assertEqual(size, pack_dataset_into(expected, target))
+        self.assertDatasetIdentical(expected, unpack_dataset(target))
+        with self.assertRaisesRegexp(ValueError, 'are needed'):
+            pack_dataset_into(expected, bytearray(size - 1))
+
+    def test_pickle_protocol_5(self):
+        if not hasattr(pickle, 'PickleBuffer'):
+            raise unittest.SkipTest('requires pickle protocol 5')
+        expected = create_mixed_data()
+        buffers = []
+        pickled = pickle.dumps(expected, protocol=5,
+                               buffer_callback=buffers.append)
+        self.assertEqual(len(expected) - 1, len(buffers))
+        actual = pickle.loads(pickled, buffers=buffers)
+        self.assertDatasetIdentical(expected, actual)
+        # in-band pickling still works
+        actual = pickle.loads(pickle.dumps(expected, protocol=5))
+        self.assertDatasetIdentical(expected, actual)
+
+
+    @requires_shared_memory
+    def test_shared_memory(self):
+        expected = create_mixed_data()
+        segment = publish_dataset(expected)
+        try:
+            actual = attach_dataset(segment.name)
+            self.assertDatasetIdentical(expected, actual)
+            self.assertFalse(actual['foo'].values.flags.writeable)
+            with self.assertRaises(ValueError):
+                actual['foo'].values[0, 0] = 0
+            actual.close()
+
+            pool = multiprocessing.Pool(2)
+            try:
+                results = pool.map(_sum_shared, [segment.name] * 2)
+            finally:
+                pool.terminate()
+                pool.join()
+            self.assertEqual([(float(expected['foo'].sum()), False)] * 2,
+                             results)
+            # the segment outlives the processes attached to it
+            self.assertDatasetIdentical(expected,
+                                        attach_dataset(segment.name))
+        finally:
+            segment.close()
+            segment.unlink()
@@ -0,0 +1,102 @@
+import subprocess
+import sys
+import warnings
+
+import numpy as np
+
+from xray.core import utils, variable
+from xray.core.sparse import SparseArray
+from . import TestCase, ReturnItem
+
+
+def create_sparse_array(shape=(10, 20, 30), density=0.05, seed=0):
+    rs = np.random.RandomState(seed)
+    size = int(np.prod(shape))
+    flat = np.sort(rs.choice(size, int(density * size), replace=False))
+    coords = np.unravel_index(flat, shape)
+    data = rs.randn(flat.size)
+    return SparseArray(coords, data, shape)
+
+
+class TestSparseArray(TestCase):
+    def test_init(self):
+        with self.assertRaisesRegexp(ValueError, 'number of coordinate'):
+            SparseArray([[0]], [1.0], (2, 2))
+        with self.assertRaisesRegexp(ValueError, 'same length'):
+            SparseArray([[0], [0, 1]], [1.0], (2, 2))
+
+    def test_array(self):
+        array = SparseArray([[0, 1], [2, 0]], [1, 2], (2, 3), np.nan, float)
+        self.assertEqual(array.shape, (2, 3))
+        self.assertEqual(array.dtype, float)
+        self.assertEqual(array.nnz, 2)
+        expected = [[np.nan, np.nan, 1], [2, np.nan, np.nan]]
+        self.assertArrayEqual(expected, np.asarray(array))
+
+    def test_nbytes(self):
+        array = create_sparse_array()
+        dense = np.asarray(array)
+        self.assertLess(array.nbytes, dense.nbytes / 4)
+
+    def test_getitem(self):
+        array = create_sparse_array()
+        dense = variable.NumpyArrayAdapter(np.asarray(array))
+        I = ReturnItem()
+        indexers = [I[:], 0, -2, I[:3], I[1:8:3], [0, 1, 2, 3],
+                    [3, 1, 1], np.arange(10) < 5]
+        for i in indexers:
+            for j in indexers:
+                for k in indexers:
+                    expected = np.asarray(dense[i, j, k])
+                    actual = array[i, j, k]
+                    if expected.ndim:
+                        self.assertIsInstance(actual, SparseArray)
+                    self.assertEqual(expected.shape, actual.shape)
+                    self.assertArrayEqual(expected, actual)
+        self.assertArrayEqual(np.asarray(dense[:4][2, ::2]), array[:4][2, ::2])
+        self.assertArrayEqual(np.asarray(array)[::-2, 3], array[::-2, 3])
+        with self.assertRaises(IndexError):
+            array[10]
+        with self.assertRaises(IndexError):
+            array[:, [0, 20]]
+
+    def test_transpose(self):
+        array = create_sparse_array()
+        dense = np.asarray(array)
+        for axes in [(0, 1, 2), (2, 0, 1), (1, 0, 2)]:
+            actual = array.transpose(axes)
+            self.assertIsInstance(actual, SparseArray)
+            self.assertArrayEqual(dense.transpose(axes), actual)
+
+    def test_reduce(self):
+        array = create_sparse_array()
+        # missing values in the stored data are skipped, too
+        array.data[::7] = np.nan
+        dense = np.asarray(array)
+        for func, nanfunc in [(np.sum, np.nansum), (np.mean, np.nanmean),
+                              (np.amin, np.nanmin), (np.amax, np.nanmax)]:
+            # only reductions that skip missing values use the stored values
+            self.assertFalse(array.can_reduce(func))
+            self.assertTrue(array.can_reduce(func, skipna=True))
+            self.assertTrue(array.can_reduce(nanfunc))
+            for axis in [None, 0, 2, (0, 1), (1, 2), -1]:
+                with warnings.catch_warnings():
+                    warnings.simplefilter('ignore', RuntimeWarning)
+                    expected = nanfunc(dense, axis=axis)
+                actual = array.reduce(func, axis=axis)
+                self.assertEqual(np.shape(expected), actual.shape)
+                self.assertTrue(utils.allclose_or_equiv(expected, actual))
+        self.assertFalse(array.can_reduce(np.std, skipna=True))
+        strings = SparseArray([[0]], ['a'], (2,), np.nan, object)
+        self.assertFalse(strings.can_reduce(np.sum, skipna=True))
+        zeros = SparseArray([[0]], [1.0], (2,), 0.0)
+        self.assertFalse(zeros.can_reduce(np.sum, skipna=True))
+        empty = SparseArray([[]], [], (3,), np.nan, float)
+        self.assertEqual(0, empty.reduce(np.sum))
+        self.assertTrue(np.isnan(empty.reduce(np.mean)))
+
+    def test_import_without_nanmean(self):
+        # np.nanmean is new in numpy 1.8
+        code = ('import numpy as np; del np.nanmean; '
+                'import xray.core.sparse as s; assert s._MEAN_FUNCTIONS')
+        subprocess.check_call([sys.executable, '-c', code])
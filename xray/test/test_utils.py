@@ -21,6 +21,23 @@ class TestSafeCastToIndex(TestCase):
             self.assertEqual(expected.dtype, actual.dtype)
 
 
+class TestMultiIndexFromProduct(TestCase):
+    def test(self):
+        levels = [[3, 1, 2], list('ab'), pd.date_range('2000-01-01', periods=2)]
+        expected = pd.MultiIndex.from_product(levels, names=['x', 'y', 't'])
+        actual = utils.multi_index_from_product(levels, names=['x', 'y', 't'])
+        self.assertArrayEqual(expected.values, actual.values)
+        self.assertEqual(expected.names, actual.names)
+        # the order of each level is preserved
+        self.assertArrayEqual([3, 1, 2], actual.levels[0])
+
+    def test_non_unique(self):
+        levels = [[1, 1], list('ab')]
+        expected = pd.MultiIndex.from_product(levels)
+        actual = utils.multi_index_from_product(levels)
+        self.assertArrayEqual(expected.values, actual.values)
+
+
 class TestArrayEquiv(TestCase):
     def test_0d(self):
         # verify our work around for pd.isnull not working for 0-dimensional
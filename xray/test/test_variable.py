@@ -2,17 +2,18 @@ from collections import namedtuple
 from copy import copy, deepcopy
 from datetime import datetime
 from textwrap import dedent
+import warnings
 
 import numpy as np
 import pandas as pd
 
 from xray import Variable, Dataset, DataArray
-from xray.core import indexing
+from xray.core import indexing, ops
 from xray.core.variable import (Coordinate, as_variable, NumpyArrayAdapter,
                                 PandasIndexAdapter, _as_compatible_data)
 from xray.core.pycompat import PY3, OrderedDict
 
-from . import TestCase, source_ndarray
+from . import TestCase, source_ndarray, requires_bottleneck
 
 
 class VariableSubclassTestCases(object):
@@ -480,6 +481,19 @@ class TestVariable(TestCase, VariableSubclassTestCases):
         w3 = Variable(['b', 'c', 'd', 'a'], np.einsum('abcd->bcda', x))
         self.assertVariableIdentical(w, w3.transpose('a', 'b', 'c', 'd'))
 
+    def test_transpose_lazy(self):
+        x = np.random.randn(2, 3, 4)
+        lazy = indexing.LazilyIndexedArray(NumpyArrayAdapter(x))
+        v = Variable(['a', 'b', 'c'], lazy)
+        actual = v.transpose('c', 'a', 'b')
+        self.assertIsInstance(actual._data, indexing.LazilyTransposedArray)
+        self.assertFalse(actual._in_memory)
+        expected = Variable(['c', 'a', 'b'], x.transpose(2, 0, 1))
+        self.assertVariableIdentical(expected, actual)
+        self.assertVariableIdentical(expected[0, :, [1, 2]],
+                                     actual[0, :, [1, 2]])
+        self.assertVariableIdentical(v, actual.transpose('a', 'b', 'c'))
+
     def test_squeeze(self):
         v = Variable(['x', 'y'], [[1]])
         self.assertVariableIdentical(Variable([], 1), v.squeeze())
@@ -572,6 +586,92 @@ class TestVariable(TestCase, VariableSubclassTestCases):
         with self.assertRaisesRegexp(ValueError, 'cannot supply both'):
             v.mean(dim='x', axis=0)
 
+    def test_reduce_skipna(self):
+        x = np.array([[1, np.nan, 3], [np.nan, np.nan, 6]])
+        v = Variable(['x', 'y'], x)
+        for name in ['sum', 'mean', 'std', 'var', 'min', 'max', 'argmin',
+                     'argmax']:
+            nanfunc = getattr(np, 'nan' + name)
+            if not name.startswith('arg'):
+                self.assertTrue(np.isnan(getattr(v, name)().values))
+            self.assertVariableAllClose(getattr(v, name)(skipna=True),
+                                        Variable([], nanfunc(x)))
+            self.assertVariableAllClose(getattr(v, name)('y', skipna=True),
+                                        Variable(['x'], nanfunc(x, axis=1)))
+        expected = Variable(['y'], [np.nan, np.nan, np.std([3, 6], ddof=1)])
+        self.assertVariableAllClose(v.std('x', skipna=True, ddof=1), expected)
+        self.assertVariableIdentical(v.prod(skipna=True), Variable([], 18.0))
+        self.assertVariableIdentical(v.ptp('y', skipna=True),
+                                     Variable(['x'], [2.0, 0.0]))
+        self.assertVariableIdentical(v.notnull().any('x', skipna=True),
+                                     Variable(['y'], [True, False, True]))
+        # skipna has no effect for dtypes that can't hold NaN
+        v = Variable(['x'], np.arange(5))
+        self.assertVariableIdentical(v.sum(skipna=True), v.sum())
+
+    @requires_bottleneck
+    def test_reduce_bottleneck(self):
+        x = np.random.RandomState(0).randn(10, 20)
+        x[x < -1] = np.nan
+        v = Variable(['x', 'y'], x)
+        results = []
+        bottleneck = ops.bn
+        try:
+            # compare with the results of numpy's nan-skipping functions
+            for module in [bottleneck, None]:
+                ops.bn = module
+                results.append([v.std(dim, skipna=True, ddof=1)
+                                for dim in ['x', 'y', None]] +
+                               [getattr(v, name)('y', skipna=True)
+                                for name in ops.BOTTLENECK_REDUCE_METHODS])
+        finally:
+            ops.bn = bottleneck
+        for actual, expected in zip(*results):
+            self.assertVariableAllClose(actual, expected)
+
+    def test_nan_function_fallbacks(self):
+        # fallbacks for numpy < 1.8, which does not have these functions
+        x = np.random.RandomState(0).randn(10, 20)
+        x[x < -1] = np.nan
+        x[:, 0] = np.nan
+        fallbacks = [(ops._nansum, np.nansum), (ops._nanmean, np.nanmean),
+                     (ops._nanvar, np.nanvar), (ops._nanstd, np.nanstd)]
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            for fallback, numpy_func in fallbacks:
+                for axis in [None, 0, 1]:
+                    self.assertArrayEqual(
+                        np.round(numpy_func(x, axis=axis), 10),
+                        np.round(fallback(x, axis=axis), 10))
+            self.assertAlmostEqual(np.nanstd(x, ddof=1),
+                                   ops._nanstd(x, ddof=1))
+            self.assertEqual(np.float64, ops._nanmean(
+                x.astype(np.float32), dtype=np.float64).dtype)
+
+    def test_reduce_skipna_object(self):
+        v = Variable(('x', 'y'), np.array([[1.0, np.nan, 3.0],
+                                           [2.0, 4.0, np.nan]], dtype=object))
+        expected = Variable(('x', 'y'), [[1.0, np.nan, 3.0],
+                                         [2.0, 4.0, np.nan]])
+        for name in ['sum', 'mean', 'std', 'var']:
+            for dim in [None, 'y']:
+                actual = getattr(v, name)(dim, skipna=True)
+                self.assertVariableAllClose(
+                    getattr(expected, name)(dim, skipna=True),
+                    actual.astype(float))
+
+    def test_reduce_low_precision(self):
+        x = np.ones(10 ** 6, dtype=np.float32) * np.float32(0.1)
+        v = Variable(['x'], x)
+        for name in ['sum', 'mean']:
+            actual = getattr(v, name)()
+            self.assertEqual(actual.dtype, np.float32)
+            expected = getattr(x.astype(np.float64), name)()
+            self.assertAlmostEqual(float(actual.values) / expected, 1, 6)
+            actual = getattr(v, name)(skipna=True)
+            self.assertEqual(actual.dtype, np.float32)
+            self.assertAlmostEqual(float(actual.values) / expected, 1, 6)
+
     def test_reduce_keep_attrs(self):
         _attrs = {'units': 'test', 'long_name': 'testing'}
 